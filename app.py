@@ -1,10 +1,20 @@
 import os
+import re
+import time
+import collections
 import webbrowser
 import threading
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 import streamlit as st
-from core.linux_tools import bash_runner
-from core.docker_automation import docker_runner
+from core.linux_tools import (
+    bash_runner, drift, file_browser, file_sync, fleet, history, idempotency, log_search, metrics_collector,
+    parsers, ssh_orchestrator, system_info,
+)
+from core.docker_automation import (
+    bulk_ops, container_monitor, docker_api, docker_inventory, docker_runner, image_analyzer, image_distribution,
+    log_store, remote_docker, rightsizing,
+)
+from core.agents_gradio import docker_generator_agent
 from core.burnout_assistant import show_burnout_assistant
 
 # Dictionary to hold HTTP server instances by port
@@ -61,6 +71,56 @@ def start_http_server(port=8000, directory=None):
 from core.agentic_ai.streamlit_agentic_assistant import show_agentic_assistant
 from core.ui.email_server_ui import show_email_server_page
 
+
+def render_remote_stream(stream, key, max_lines=500):
+    """Render a RemoteStream progressively, keeping only the last ``max_lines`` lines on screen."""
+    # Any click reruns the script, which abandons the loop below and cancels the stream.
+    st.button("⏹️ Stop", key=key)
+    placeholder = st.empty()
+    lines = collections.deque(maxlen=max_lines)
+    last_render = 0.0
+    try:
+        for name, line in stream:
+            lines.append(line if name == "stdout" else f"[stderr] {line}")
+            if time.monotonic() - last_render > 0.2:
+                placeholder.code("\n".join(lines))
+                last_render = time.monotonic()
+    finally:
+        if stream.exit_status is None:
+            stream.cancel()
+    placeholder.code("\n".join(lines) or "(no output)")
+    return stream.exit_status
+
+
+def docker_connection(section, targets, label="🔌 Connect"):
+    """
+    Connect/Disconnect control of a Docker page section that keeps live inventories.
+
+    Nothing is opened until the user clicks Connect; the ``(user, host)`` targets a
+    section connected to are kept in session state, so later reruns reuse them.
+    Changing the targets disconnects the section, and inventories that no section
+    uses any more are stopped. Returns the connected targets, or None.
+    """
+    connections = st.session_state.setdefault("docker_connections", {})
+    targets = list(targets)
+
+    def disconnect():
+        connections.pop(section, None)
+        docker_inventory.stop_unused(target for used in connections.values() for target in used)
+
+    connected = connections.get(section)
+    if connected is not None and connected != targets:
+        connected = None
+        disconnect()
+    if connected is None:
+        if st.button(label, key=f"{section}_connect", disabled=not targets):
+            connected = connections[section] = targets
+    elif st.button("⏏️ Disconnect", key=f"{section}_disconnect"):
+        connected = None
+        disconnect()
+    return connected
+
+
 # ⚙️ Initial Config
 st.set_page_config(
     page_title="CommandHub - Menu-Based Automation Dashboard",
@@ -206,22 +266,486 @@ if st.session_state.selected_tool == "Linux Automation":
 
     if st.session_state.selected_command:
         st.info(f"🧠 Selected command: `{st.session_state.selected_command}`")
+        stream_output = st.checkbox("📡 Stream output live", key="linux_stream")
         if st.button("🚀 Run Selected Command"):
             user = st.session_state.get("username")
             ip = st.session_state.get("ip")
             if not user or not ip:
                 st.warning("Please enter both username and IP address.")
+            elif stream_output:
+                try:
+                    stream = bash_runner.stream_linux_task(st.session_state.selected_command, user, ip)
+                    exit_status = render_remote_stream(stream, key="stop_linux_stream")
+                    if exit_status == 0:
+                        st.success("✅ Command finished")
+                    elif stream.cancelled:
+                        st.info("⏹️ Command stopped")
+                    else:
+                        st.error(f"❌ Command failed with status {exit_status}")
+                except Exception as e:
+                    st.error(f"❌ Error executing command: {str(e)}")
             else:
                 with st.spinner(f"Executing `{st.session_state.selected_command}` on {ip}..."):
-                    output = bash_runner.run_linux_task(st.session_state.selected_command, user, ip)
+                    choice = st.session_state.selected_command
+                    duplicate = False
+                    try:
+                        if choice in bash_runner.MUTATING_COMMANDS:
+                            # A double click reruns this handler; reuse the in-flight or just-finished run.
+                            result, duplicate = idempotency.GUARD.run(
+                                idempotency.action_key("linux", choice, user, ip),
+                                lambda: bash_runner.execute_linux_task(choice, user, ip))
+                        else:
+                            result = bash_runner.execute_linux_task(choice, user, ip)
+                        output = bash_runner.format_result(result)
+                    except Exception as e:
+                        result, output = None, f"❌ Error executing command: {str(e)}"
                     if output.strip():
                         st.success("✅ Command executed successfully")
+                        if duplicate:
+                            st.info(f"↩️ Identical request within {idempotency.GUARD.window}s; "
+                                    f"showing that result instead of running it again.")
                         st.text_area("📄 Output", output, height=300)
+                        if result:
+                            connection = "reused pooled connection" if result.reused else "new connection"
+                            st.caption(
+                                f"⏱️ Handshake: {result.handshake_time * 1000:.0f} ms · "
+                                f"Execution: {result.exec_time * 1000:.0f} ms ({connection})"
+                            )
                     else:
                         st.error("❌ No output returned or command failed.")
     else:
         st.info("Select a command above to activate the Run button.")
 
+    selected = st.session_state.selected_command
+    if selected and system_info.is_parseable(selected) and st.checkbox("📊 Show structured view", key="show_system_info"):
+        user = st.session_state.get("username")
+        ip = st.session_state.get("ip")
+        if not user or not ip:
+            st.warning("Please enter both username and IP address.")
+        else:
+            info_cols = st.columns(2)
+            refresh_info = info_cols[0].button("♻️ Refresh", key="refresh_system_info")
+            if info_cols[1].button("🧹 Clear Cache for Host", key="clear_system_info"):
+                system_info.invalidate(user=user, ip=ip)
+            try:
+                info, cached = system_info.get_system_info(selected, user, ip, refresh=refresh_info)
+                if info.result.ok:
+                    st.dataframe(parsers.as_rows(info.records), use_container_width=True)
+                    source = "served from cache" if cached else "fetched via SSH"
+                    st.caption(f"🕒 {source} · {time.time() - info.fetched_at:.0f}s old · "
+                               f"TTL {system_info.INFO_CACHE.ttl}s")
+                else:
+                    st.error(bash_runner.format_result(info.result))
+            except Exception as e:
+                st.error(f"❌ Error executing command: {str(e)}")
+
+    with st.expander("📸 Host Snapshot - Several Commands, One Round Trip"):
+        snapshot_choices = st.multiselect(
+            "Commands",
+            commands,
+            default=["System Uptime", "Memory Usage", "Disk Usage", "Top Processes"],
+            key="snapshot_commands",
+        )
+        if st.button("📸 Take Snapshot"):
+            user = st.session_state.get("username")
+            ip = st.session_state.get("ip")
+            if not user or not ip:
+                st.warning("Please enter both username and IP address.")
+            elif not snapshot_choices:
+                st.warning("Select at least one command.")
+            else:
+                with st.spinner(f"Collecting {len(snapshot_choices)} commands from {ip}..."):
+                    try:
+                        batch = bash_runner.run_linux_batch(snapshot_choices, user, ip)
+                    except Exception as e:
+                        batch = None
+                        st.error(f"❌ Error executing command: {str(e)}")
+                if batch:
+                    st.caption(f"⏱️ Handshake: {batch.handshake_time * 1000:.0f} ms · "
+                               f"Execution: {batch.exec_time * 1000:.0f} ms for {len(snapshot_choices)} commands")
+                    for tab, choice in zip(st.tabs(snapshot_choices), snapshot_choices):
+                        with tab:
+                            st.code(bash_runner.format_result(batch.results[choice]))
+
+    with st.expander("🗂️ Remote File Browser"):
+        st.caption("Lists one directory level at a time; listings are cached until the directory changes.")
+        browse_user = st.session_state.get("username")
+        browse_ip = st.session_state.get("ip")
+        if "browser_path" not in st.session_state:
+            st.session_state.browser_path = "."
+            st.session_state.browser_offset = 0
+        path_cols = st.columns([4, 1, 1])
+        typed_path = path_cols[0].text_input("Path", value=st.session_state.browser_path)
+        if typed_path != st.session_state.browser_path:
+            st.session_state.browser_path, st.session_state.browser_offset = typed_path, 0
+        if path_cols[1].button("⬆️ Up"):
+            st.session_state.browser_path = file_browser.parent_path(st.session_state.browser_path)
+            st.session_state.browser_offset = 0
+            st.rerun()
+        browse_refresh = path_cols[2].button("🔄 Refresh", key="browser_refresh")
+
+        if not browse_user or not browse_ip:
+            st.info("Enter a username and IP address above to browse.")
+        else:
+            try:
+                listing, cached = file_browser.list_directory(browse_user, browse_ip, st.session_state.browser_path,
+                                                              refresh=browse_refresh)
+            except (OSError, ConnectionError) as e:
+                st.error(f"❌ {e}")
+                listing = None
+            if listing:
+                offset = st.session_state.browser_offset
+                page = listing.page(offset, file_browser.DEFAULT_PAGE_SIZE)
+                st.caption(f"{listing.path} · entries {offset + 1 if page else 0}-{offset + len(page)} of "
+                           f"{len(listing.entries)}{'+' if listing.truncated else ''}"
+                           f"{' · cached' if cached else ''}")
+                st.dataframe([entry.as_row() for entry in page], use_container_width=True)
+                page_cols = st.columns(2)
+                if offset > 0 and page_cols[0].button("⬅️ Previous", key="browser_prev"):
+                    st.session_state.browser_offset = max(0, offset - file_browser.DEFAULT_PAGE_SIZE)
+                    st.rerun()
+                if offset + len(page) < len(listing.entries) and page_cols[1].button("➡️ Next", key="browser_next"):
+                    st.session_state.browser_offset = offset + file_browser.DEFAULT_PAGE_SIZE
+                    st.rerun()
+
+                open_cols = st.columns(2)
+                subdirs = [entry.name for entry in page if entry.is_dir]
+                files = [entry.name for entry in page if entry.target_type == "file"]
+                chosen_dir = open_cols[0].selectbox("Directory", subdirs, key="browser_dir")
+                if chosen_dir and open_cols[0].button("📂 Open"):
+                    st.session_state.browser_path = file_browser.normalize_path(f"{listing.path}/{chosen_dir}")
+                    st.session_state.browser_offset = 0
+                    st.rerun()
+                chosen_file = open_cols[1].selectbox("File", files, key="browser_file")
+                if chosen_file and open_cols[1].button("👁️ Preview"):
+                    st.session_state.browser_preview = (f"{listing.path}/{chosen_file}", 0)
+
+                if st.session_state.get("browser_preview"):
+                    preview_path, preview_offset = st.session_state.browser_preview
+                    try:
+                        preview = file_browser.read_range(browse_user, browse_ip, preview_path, preview_offset)
+                        st.caption(f"{preview.path} · bytes {preview.offset}-{preview.end} of {preview.size}")
+                        if preview.binary:
+                            st.warning("Binary file; showing a lossy text rendering.")
+                        st.code(preview.data or "(empty)")
+                        if not preview.eof and st.button("⏬ Next Chunk"):
+                            st.session_state.browser_preview = (preview_path, preview.end)
+                            st.rerun()
+                    except (OSError, ConnectionError) as e:
+                        st.error(f"❌ {e}")
+
+    with st.expander("🛰️ Fleet Mode - Run on Many Hosts"):
+        inventory_text = st.text_area(
+            "Host Inventory (one `user@host` or `host` per line)",
+            key="fleet_inventory",
+            height=150,
+        )
+        fleet_command = st.selectbox("Command", commands, key="fleet_command")
+        fleet_cols = st.columns(2)
+        fleet_workers = fleet_cols[0].number_input("Parallel Hosts", min_value=1, max_value=128, value=16)
+        fleet_timeout = fleet_cols[1].number_input("Per-Host Timeout (s)", min_value=1, max_value=600, value=30)
+
+        if st.button("🚀 Run on Fleet"):
+            try:
+                inventory = fleet.parse_inventory(inventory_text, default_user=st.session_state.get("username"))
+            except ValueError as e:
+                st.warning(str(e))
+                inventory = []
+
+            if not inventory:
+                st.warning("Please enter at least one host.")
+            else:
+                progress = st.progress(0.0, text=f"0/{len(inventory)} hosts finished")
+                table = st.empty()
+                fleet_results = []
+                for host_result in fleet.run_fleet(inventory, fleet_command,
+                                                   max_workers=int(fleet_workers),
+                                                   timeout=float(fleet_timeout)):
+                    fleet_results.append(host_result)
+                    progress.progress(len(fleet_results) / len(inventory),
+                                      text=f"{len(fleet_results)}/{len(inventory)} hosts finished")
+                    table.dataframe([r.as_row() for r in fleet_results], use_container_width=True)
+
+                summary = fleet.summarize(fleet_results)
+                st.success(f"✅ ok: {summary['ok']} · ❌ failed: {summary['failed']} · ⏱️ timeout: {summary['timeout']}")
+                st.session_state.fleet_results = fleet_results
+
+        if st.session_state.get("fleet_results"):
+            outputs = {f"{r.user}@{r.host} ({r.status})": r.output for r in st.session_state.fleet_results}
+            shown = st.selectbox("Host Output", list(outputs), key="fleet_output_host")
+            st.code(outputs[shown] or "(no output)")
+
+    with st.expander("📤 Push Files to Hosts"):
+        st.caption("Only changed 64 KiB chunks are sent (compressed). Requires `python3` on the targets.")
+        sync_cols = st.columns(2)
+        sync_local = sync_cols[0].text_input("Local Directory", key="sync_local_dir")
+        sync_remote = sync_cols[1].text_input("Remote Directory", key="sync_remote_dir")
+        sync_inventory = st.text_area(
+            "Host Inventory (one `user@host` or `host` per line)",
+            value=st.session_state.get("fleet_inventory", ""),
+            key="sync_inventory",
+            height=120,
+        )
+        sync_dry_run = st.checkbox("Dry run (only report what would change)", key="sync_dry_run")
+        if st.button("📤 Push"):
+            try:
+                inventory = fleet.parse_inventory(sync_inventory, default_user=st.session_state.get("username"))
+            except ValueError as e:
+                st.warning(str(e))
+                inventory = []
+            if not sync_local or not os.path.isdir(sync_local):
+                st.warning("Please enter an existing local directory.")
+            elif not sync_remote or not inventory:
+                st.warning("Please enter a remote directory and at least one host.")
+            else:
+                bars = {f"{u}@{h}": st.progress(0.0, text=f"{u}@{h}: comparing...") for u, h in inventory}
+                sync_results = []
+                for event in file_sync.sync_to_hosts(inventory, sync_local, sync_remote, dry_run=sync_dry_run):
+                    if isinstance(event, file_sync.SyncProgress):
+                        fraction = event.done_bytes / event.total_bytes if event.total_bytes else 1.0
+                        bars[event.host].progress(fraction, text=f"{event.host}: {event.done_bytes // 1024} / "
+                                                                 f"{event.total_bytes // 1024} KiB")
+                    else:
+                        sync_results.append(event)
+                        label = "❌ " + event.error if event.status == "failed" else (
+                            f"✅ {event.files_changed} of {event.files_total} files changed")
+                        bars[event.host].progress(1.0, text=f"{event.host}: {label}")
+                st.dataframe([r.as_row() for r in sync_results], use_container_width=True)
+
+    with st.expander("🧬 Configuration Drift"):
+        st.caption("Hosts only send a hash of their output; full content is fetched once per distinct variant.")
+        drift_inventory = st.text_area(
+            "Host Inventory (one `user@host` or `host` per line)",
+            value=st.session_state.get("fleet_inventory", ""),
+            key="drift_inventory",
+            height=120,
+        )
+        drift_cols = st.columns(2)
+        drift_source = drift_cols[0].selectbox("Compare", ["Custom command"] + commands, key="drift_source")
+        drift_command = drift_cols[1].text_input("Read-only Command", value="cat /etc/resolv.conf",
+                                                 key="drift_command", disabled=drift_source != "Custom command")
+        drift_sort = st.checkbox("Ignore line order", key="drift_sort")
+        if st.button("🧬 Check Drift"):
+            try:
+                inventory = fleet.parse_inventory(drift_inventory, default_user=st.session_state.get("username"))
+            except ValueError as e:
+                st.warning(str(e))
+                inventory = []
+            command = drift_command if drift_source == "Custom command" else drift_source
+            if not inventory or not command.strip():
+                st.warning("Please enter a command and at least one host.")
+            else:
+                with st.spinner(f"Hashing output on {len(inventory)} hosts..."):
+                    report = drift.detect_drift(inventory, command, sort_lines=drift_sort)
+                if not report.groups:
+                    st.error("❌ No host returned a result.")
+                elif report.drifted:
+                    st.warning(f"⚠️ {len(report.groups)} variants across {sum(len(g.hosts) for g in report.groups)} hosts")
+                else:
+                    st.success(f"✅ All {len(report.groups[0].hosts)} hosts are identical")
+                if report.groups:
+                    st.dataframe(report.as_rows(), use_container_width=True)
+                for index, group in enumerate(report.groups[1:], start=2):
+                    st.markdown(f"**Group {index}** vs. baseline ({len(group.hosts)} hosts)")
+                    st.code(group.diff or "(differs only in normalization)", language="diff")
+                for host, error in report.failed.items():
+                    st.warning(f"{host}: {error}")
+
+    with st.expander("🧩 Task Orchestrator (DAG)"):
+        plan_text = st.text_area("Plan (JSON list of tasks)", value=ssh_orchestrator.EXAMPLE_PLAN,
+                                 key="orchestrator_plan", height=260)
+        plan_inventory = st.text_area(
+            "Default Host Inventory (one `user@host` or `host` per line)",
+            value=st.session_state.get("fleet_inventory", ""),
+            key="orchestrator_inventory",
+            height=120,
+        )
+        plan_concurrency = st.number_input("Max Concurrent Commands", min_value=1, max_value=512,
+                                           value=ssh_orchestrator.DEFAULT_MAX_CONCURRENCY)
+        if st.button("▶️ Run Plan"):
+            try:
+                inventory = fleet.parse_inventory(plan_inventory, default_user=st.session_state.get("username"))
+                orchestrator = ssh_orchestrator.Orchestrator(ssh_orchestrator.load_plan(plan_text), inventory,
+                                                             max_concurrency=int(plan_concurrency))
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                orchestrator = None
+            if orchestrator:
+                with st.spinner(f"Running {len(orchestrator.tasks)} tasks..."):
+                    runs = orchestrator.run()
+                path, path_seconds = orchestrator.critical_path()
+                total = orchestrator.finished_at - orchestrator.started_at
+                st.success(f"✅ Finished in {total:.2f}s · critical path: {' → '.join(path)} ({path_seconds:.2f}s)")
+                st.dataframe(orchestrator.report(), use_container_width=True)
+                task_tabs = st.tabs([f"{name} ({run.status})" for name, run in runs.items()])
+                for tab, run in zip(task_tabs, runs.values()):
+                    with tab:
+                        st.dataframe(
+                            [{"host": node.host, "status": node.status, "exit_status": node.exit_status,
+                              "duration_s": round(node.duration, 2)} for node in run.nodes],
+                            use_container_width=True,
+                        )
+                        for node in run.nodes:
+                            if node.output:
+                                st.code(f"# {node.host}\n{node.output}")
+
+    with st.expander("🔎 Log Search Across Hosts"):
+        log_inventory = st.text_area(
+            "Host Inventory (one `user@host` or `host` per line)",
+            value=st.session_state.get("fleet_inventory", ""),
+            key="log_inventory",
+            height=120,
+        )
+        log_cols = st.columns(3)
+        log_pattern = log_cols[0].text_input("Pattern (regex, case-insensitive)", key="log_pattern")
+        log_unit = log_cols[1].text_input("Systemd Unit (optional)", key="log_unit")
+        log_since = log_cols[2].text_input("Since", value=log_search.DEFAULT_SINCE, key="log_since")
+        log_page_size = st.number_input("Entries per Page", min_value=10, max_value=1000,
+                                        value=log_search.DEFAULT_PAGE_SIZE, key="log_page_size")
+
+        log_request = None
+        if st.button("🔎 Search Logs"):
+            # A new search pins a fresh cursor; paging below reuses it and the query it was made with.
+            st.session_state.log_query = {"inventory": log_inventory, "pattern": log_pattern or None,
+                                          "unit": log_unit or None, "since": log_since or None,
+                                          "limit": int(log_page_size)}
+            log_request = log_search.LogCursor()
+        elif st.session_state.get("log_goto") is not None:
+            log_request = st.session_state.pop("log_goto")
+
+        # Only a search or a paging click queries the hosts; other reruns show the stored page.
+        if log_request is not None:
+            query = st.session_state.log_query
+            try:
+                inventory = fleet.parse_inventory(query["inventory"], default_user=st.session_state.get("username"))
+            except ValueError as e:
+                st.warning(str(e))
+                inventory = []
+            if not inventory:
+                st.warning("Please enter at least one host.")
+                st.session_state.pop("log_page", None)
+            else:
+                search = log_search.LogSearch(inventory, pattern=query["pattern"], unit=query["unit"],
+                                              since=query["since"])
+                with st.spinner(f"Searching logs on {len(inventory)} hosts..."):
+                    entries, cursor, has_more = search.page(log_request, limit=query["limit"])
+                st.session_state.log_page = {"entries": entries, "cursor": cursor, "has_more": has_more,
+                                             "errors": dict(search.errors)}
+
+        log_page = st.session_state.get("log_page")
+        if log_page:
+            cursor, limit = log_page["cursor"], st.session_state.log_query["limit"]
+            st.caption(f"Entries {cursor.offset + 1}-{cursor.offset + len(log_page['entries'])}")
+            st.dataframe([entry.as_row() for entry in log_page["entries"]], use_container_width=True)
+            for host, error in log_page["errors"].items():
+                st.warning(f"{host}: {error.strip()}")
+            page_cols = st.columns(2)
+            if cursor.offset > 0 and page_cols[0].button("⬅️ Previous Page"):
+                st.session_state.log_goto = cursor.previous(limit)
+                st.rerun()
+            if log_page["has_more"] and page_cols[1].button("➡️ Next Page"):
+                st.session_state.log_goto = cursor.next(limit)
+                st.rerun()
+
+    with st.expander("📈 Fleet Metrics"):
+        collector = metrics_collector.get_collector()
+        if collector is None:
+            st.caption("Samples load, CPU, memory, disk and network of every inventory host in the background.")
+            metrics_inventory = st.text_area(
+                "Host Inventory (one `user@host` or `host` per line)",
+                value=st.session_state.get("fleet_inventory", ""),
+                key="metrics_inventory",
+                height=120,
+            )
+            metrics_cols = st.columns(3)
+            metrics_interval = metrics_cols[0].number_input("Interval (s)", min_value=1, max_value=3600, value=15)
+            metrics_capacity = metrics_cols[1].number_input("Samples Kept per Host", min_value=10, max_value=100000, value=720)
+            metrics_spill = metrics_cols[2].checkbox("Spill older samples to SQLite", key="metrics_spill")
+            if st.button("▶️ Start Collector"):
+                try:
+                    inventory = fleet.parse_inventory(metrics_inventory, default_user=st.session_state.get("username"))
+                except ValueError as e:
+                    st.warning(str(e))
+                    inventory = []
+                if not inventory:
+                    st.warning("Please enter at least one host.")
+                else:
+                    metrics_collector.start_collector(
+                        inventory,
+                        interval=float(metrics_interval),
+                        capacity=int(metrics_capacity),
+                        spill_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "metrics.db") if metrics_spill else None,
+                    )
+                    st.rerun()
+        else:
+            st.success(f"🟢 Collecting from {len(collector.inventory)} hosts every {collector.interval:g}s")
+            metric = st.selectbox("Metric", metrics_collector.NUMERIC_FIELDS, key="metrics_field")
+            window = st.selectbox("Window", ["15 min", "1 hour", "3 hours", "All"], key="metrics_window")
+            window_seconds = {"15 min": 900, "1 hour": 3600, "3 hours": 10800}.get(window)
+            since = time.time() - window_seconds if window_seconds else None
+            frame = collector.series_frame(metric, since=since, include_spilled=collector.spill is not None)
+            if frame.empty:
+                st.info("Waiting for the first samples...")
+            else:
+                st.line_chart(frame)
+            for host, error in list(collector.errors.items()):
+                st.warning(f"{host}: {error}")
+            metrics_buttons = st.columns(2)
+            if metrics_buttons[0].button("🔄 Refresh Chart"):
+                st.rerun()
+            if metrics_buttons[1].button("⏹️ Stop Collector"):
+                metrics_collector.stop_collector()
+                st.rerun()
+
+    with st.expander("🔌 SSH Connection Pool"):
+        pool_stats = bash_runner.POOL.stats()
+        if pool_stats:
+            st.table(pool_stats)
+        else:
+            st.caption("No open connections.")
+        if st.button("🧹 Close All Connections"):
+            bash_runner.POOL.close_all()
+            st.success("All pooled SSH connections closed.")
+
+    with st.expander("🕓 Command History"):
+        st.caption("Every remote command run from this dashboard, with its latency breakdown.")
+        history_cols = st.columns(2)
+        history_group = history_cols[0].radio("Latency by", ["both", "label", "host"], horizontal=True,
+                                               format_func={"both": "command & host", "label": "command",
+                                                            "host": "host"}.get)
+        history_window = history_cols[1].selectbox("Window", ["Last hour", "Last day", "Last week", "All time"],
+                                                   index=1)
+        window_seconds = {"Last hour": 3600, "Last day": 86400, "Last week": 7 * 86400}.get(history_window)
+        latency = history.JOURNAL.latency_stats(since=time.time() - window_seconds if window_seconds else None,
+                                                by=history_group)
+        if latency:
+            st.dataframe([s.as_row() for s in latency], use_container_width=True)
+        else:
+            st.caption("No commands recorded yet.")
+
+        recent_entries = history.JOURNAL.recent(limit=200)
+        if recent_entries:
+            st.dataframe([e.as_row() for e in recent_entries], use_container_width=True)
+            replay_id = st.selectbox(
+                "Replay Entry", [e.id for e in recent_entries],
+                format_func=lambda entry_id: next(
+                    f"#{e.id} {e.label} on {e.user}@{e.host}" for e in recent_entries if e.id == entry_id),
+            )
+            if st.button("🔁 Replay"):
+                entry = history.JOURNAL.get(replay_id)
+                try:
+                    with st.spinner(f"Replaying {entry.label} on {entry.host}..."):
+                        result = history.replay(entry)
+                except (ConnectionError, KeyError) as e:
+                    st.error(f"❌ Error executing command: {str(e)}")
+                    result = None
+                if result is None:
+                    st.warning("This entry can no longer be replayed.")
+                else:
+                    st.caption(f"⏱️ Handshake: {result.handshake_time * 1000:.0f} ms · "
+                               f"Execution: {result.exec_time * 1000:.0f} ms")
+                    st.code(bash_runner.format_result(result))
+
 # 🐳 Docker Automation Module
 elif st.session_state.selected_tool == "Docker Automation":
     st.markdown("## 🐳 Docker Automation Toolkit")
@@ -256,7 +780,9 @@ elif st.session_state.selected_tool == "Docker Automation":
             input_labels = {
                 "name": "🪪 Container Name",
                 "image": "📦 Image Name",
-                "repo_tag": "🔖 Repo:Tag (e.g., user/app:latest)"
+                "repo_tag": "🔖 Repo:Tag (e.g., user/app:latest)",
+                "cpus": "🧮 CPUs (e.g., 0.5)",
+                "memory": "💾 Memory Limit (e.g., 256m)",
             }
 
             for arg in required_args:
@@ -264,21 +790,535 @@ elif st.session_state.selected_tool == "Docker Automation":
                 if not args[arg]:
                     missing_inputs.append(arg)
 
+        stream_output = st.checkbox("📡 Stream output live", key="docker_stream")
+        follow_output = False
+        if stream_output and selected_label in docker_runner.DOCKER_FOLLOW_COMMANDS:
+            follow_output = st.checkbox("🔁 Follow (keep streaming new output)", key="docker_follow")
+
         # 🧨 Run button toggles only after command selection
         if st.button("🚀 Run Docker Command"):
             if not user or not ip:
                 st.warning("Please enter SSH username and IP address.")
             elif missing_inputs:
                 st.warning(f"Missing required input(s): {', '.join(missing_inputs)}")
+            elif stream_output:
+                try:
+                    stream = docker_runner.stream_docker_command(selected_label, args, user, ip, follow=follow_output)
+                    exit_status = render_remote_stream(stream, key="stop_docker_stream")
+                    if exit_status == 0:
+                        st.success("✅ Command finished")
+                    elif stream.cancelled:
+                        st.info("⏹️ Command stopped")
+                    else:
+                        st.error(f"❌ Docker command failed with status {exit_status}")
+                except Exception as e:
+                    st.error(f"❌ Error executing Docker command: {str(e)}")
             else:
                 with st.spinner(f"Running `{selected_label}` remotely via SSH..."):
-                    output = docker_runner.run_docker_command(selected_label, args, user, ip)
+                    duplicate = False
+                    try:
+                        if selected_label in docker_runner.DOCKER_MUTATING_COMMANDS:
+                            # Guards side effects such as launching the same container twice on a double click;
+                            # another action on the same container or image is never absorbed.
+                            result, duplicate = idempotency.GUARD.run(
+                                idempotency.action_key("docker", selected_label, args, user, ip),
+                                lambda: docker_runner.execute_docker_command(selected_label, args, user, ip),
+                                target=idempotency.action_key(user, ip, args.get("name") or args.get("image")),
+                            )
+                        else:
+                            result = docker_runner.execute_docker_command(selected_label, args, user, ip)
+                        output = (docker_runner.format_docker_result(result) if result
+                                  else "❌ Invalid Docker command")
+                    except KeyError as ke:
+                        output = f"❌ Missing required argument: {ke}"
+                    except Exception as e:
+                        output = f"❌ Error executing Docker command: {str(e)}"
                     if output.strip():
                         st.success("✅ Command executed successfully")
+                        if duplicate:
+                            st.info(f"↩️ Identical request within {idempotency.GUARD.window}s; "
+                                    f"showing that result instead of running it again.")
                         st.text_area("📄 Output", output, height=300)
                     else:
                         st.error("❌ No output or command failed.")
 
+    with st.expander("🔌 Docker Engine API"):
+        st.caption("Talks to the remote /var/run/docker.sock through the pooled SSH connection "
+                   "(one keep-alive HTTP connection, structured results).")
+        api_user = st.session_state.get("username")
+        api_ip = st.session_state.get("ip")
+        if not api_user or not api_ip:
+            st.info("Enter a username and IP address to query the Docker Engine API.")
+        elif docker_connection("docker_api", [(api_user, api_ip)]):
+            api_view = st.radio("Show", ["Containers", "Images"], horizontal=True, key="docker_api_view")
+            try:
+                client = docker_api.get_client(api_user, api_ip)
+                # Seeded once, then kept current by the host's event stream: reads never hit the daemon.
+                inventory = docker_inventory.get_inventory(api_user, api_ip)
+                inventory.wait_ready(timeout=client.timeout)
+                if inventory.error:
+                    st.warning(f"⚠️ Event stream interrupted, re-syncing: {inventory.error}")
+                if api_view == "Containers":
+                    rows = docker_api.container_rows(inventory.containers())
+                else:
+                    rows = docker_api.image_rows(inventory.images())
+                if inventory.updated_at:
+                    st.caption(f"🕒 In memory · updated {time.time() - inventory.updated_at:.0f}s ago · "
+                               f"{inventory.events_seen} events applied")
+                st.dataframe(rows, use_container_width=True)
+                running = [row["name"] for row in rows if row.get("state") == "running"]
+                if api_view == "Containers" and running:
+                    stats_target = st.selectbox("Stats for", running, key="docker_api_stats")
+                    if st.button("📊 Get Stats"):
+                        st.json(client.stats(stats_target))
+            except (docker_api.DockerAPIError, ConnectionError) as e:
+                st.error(f"❌ {e}")
+
+    with st.expander("🌐 Multi-Host Control Plane"):
+        st.caption("One persistent API channel per Docker host: containers and images of every host in one "
+                   "searchable view, and new containers placed on the least-loaded host.")
+        default_target = (f"{st.session_state.get('username')}@{st.session_state.get('ip')}"
+                          if st.session_state.get("username") and st.session_state.get("ip") else "")
+        plane_inventory_text = st.text_area(
+            "Host Inventory (one `user@host` or `host` per line)",
+            value=st.session_state.get("fleet_inventory") or default_target,
+            key="plane_inventory",
+            height=100,
+        )
+        try:
+            plane_inventory = fleet.parse_inventory(plane_inventory_text, default_user=st.session_state.get("username"))
+        except ValueError as e:
+            st.warning(str(e))
+            plane_inventory = []
+        plane_targets = docker_connection("plane", plane_inventory, label="🔌 Connect to Hosts")
+        if not plane_inventory:
+            st.info("Enter at least one Docker host.")
+        elif plane_targets:
+            # Built once per connect; later reruns read the already running inventories.
+            docker_fleet = st.session_state.get("plane_fleet")
+            if docker_fleet is None or docker_fleet.inventory != plane_targets:
+                docker_fleet = st.session_state.plane_fleet = remote_docker.DockerFleet(plane_targets)
+                with st.spinner(f"Listing containers and images on {len(plane_targets)} hosts..."):
+                    docker_fleet.wait_ready(timeout=docker_api.DEFAULT_API_TIMEOUT)
+            for host, error in docker_fleet.errors().items():
+                st.warning(f"{host}: {error}")
+            plane_cols = st.columns([1, 2])
+            plane_view = plane_cols[0].radio("Show", ["Containers", "Images", "Host Load"], horizontal=True,
+                                             key="plane_view")
+            plane_query = plane_cols[1].text_input("Search (name, image, tag, label, host)", key="plane_query")
+            if plane_view == "Containers":
+                plane_rows = docker_fleet.containers(plane_query)
+                st.caption(f"{len(plane_rows)} containers on {len(plane_inventory)} hosts")
+                st.dataframe(plane_rows, use_container_width=True)
+            elif plane_view == "Images":
+                plane_rows = docker_fleet.images(plane_query)
+                st.caption(f"{len(plane_rows)} distinct images on {len(plane_inventory)} hosts")
+                st.dataframe(plane_rows, use_container_width=True)
+            else:
+                refresh_load = st.button("🔄 Measure Again")
+                with st.spinner(f"Measuring load on {len(plane_inventory)} hosts..."):
+                    loads = docker_fleet.loads(refresh=refresh_load)
+                st.dataframe([load.as_row() for load in sorted(loads, key=lambda load: load.score)],
+                             use_container_width=True)
+
+            st.markdown("**🚀 Launch on the Least-Loaded Host**")
+            launch_cols = st.columns(2)
+            launch_name = launch_cols[0].text_input("Container Name", key="plane_launch_name")
+            launch_image = launch_cols[1].text_input("Image", key="plane_launch_image")
+            if st.button("🚀 Schedule Container", disabled=not launch_name or not launch_image):
+                try:
+                    with st.spinner("Picking a host..."):
+                        chosen, result = docker_fleet.launch({"name": launch_name, "image": launch_image})
+                    if chosen is None:
+                        st.error("❌ No reachable Docker host in the inventory.")
+                    else:
+                        st.info(f"📍 Placed on {chosen.user}@{chosen.host} (load score {chosen.score:.2f}, "
+                                f"{chosen.running} running)")
+                        output = docker_runner.format_docker_result(result)
+                        if result.exit_status == 0:
+                            st.success(f"✅ {output.strip()}")
+                        else:
+                            st.error(output)
+                except ConnectionError as e:
+                    st.error(f"❌ {e}")
+
+    with st.expander("🚚 Image Distribution"):
+        st.caption("Pulls an image onto many hosts at once with per-layer progress; hosts that already hold the "
+                   "exact digest are skipped.")
+        default_target = (f"{st.session_state.get('username')}@{st.session_state.get('ip')}"
+                          if st.session_state.get("username") and st.session_state.get("ip") else "")
+        dist_inventory_text = st.text_area(
+            "Host Inventory (one `user@host` or `host` per line)",
+            value=st.session_state.get("fleet_inventory") or default_target,
+            key="dist_inventory",
+            height=100,
+        )
+        dist_cols = st.columns([2, 2, 1])
+        dist_image = dist_cols[0].text_input("Image (e.g. `nginx:1.27` or `repo@sha256:...`)", key="dist_image")
+        dist_mode = dist_cols[1].radio(
+            "Source", image_distribution.DISTRIBUTION_MODES, horizontal=True, key="dist_mode",
+            format_func=lambda mode: "Registry on every host" if mode == "registry" else "Pull once, copy host-to-host",
+        )
+        dist_parallel = dist_cols[2].number_input("Parallel", min_value=1, max_value=32,
+                                                  value=docker_api.DEFAULT_MAX_CONNECTIONS, key="dist_parallel")
+        auth_cols = st.columns(2)
+        dist_registry_user = auth_cols[0].text_input("Registry Username (optional)", key="dist_registry_user")
+        dist_registry_password = auth_cols[1].text_input("Registry Password / Token", type="password",
+                                                         key="dist_registry_password")
+        dist_auth = ({"username": dist_registry_user, "password": dist_registry_password}
+                     if dist_registry_user else None)
+        dist_buttons = st.columns(2)
+        if dist_buttons[0].button("🚚 Distribute", disabled=not dist_image):
+            try:
+                inventory = fleet.parse_inventory(dist_inventory_text, default_user=st.session_state.get("username"))
+            except ValueError as e:
+                st.warning(str(e))
+                inventory = []
+            if not inventory:
+                st.warning("Please enter at least one host.")
+            else:
+                distribution = image_distribution.ImageDistribution(inventory, dist_image, mode=dist_mode,
+                                                                    max_concurrency=int(dist_parallel), auth=dist_auth)
+                progress = st.progress(0.0)
+                table = st.empty()
+                start, last_render = time.perf_counter(), 0.0
+                for _ in distribution.run():
+                    if time.perf_counter() - last_render >= image_distribution.UPDATE_INTERVAL:
+                        last_render = time.perf_counter()
+                        transfers = list(distribution.transfers.values())
+                        progress.progress(sum(t.progress for t in transfers) / len(transfers))
+                        table.dataframe([t.as_row() for t in transfers], use_container_width=True)
+                transfers = list(distribution.transfers.values())
+                progress.progress(1.0)
+                table.dataframe([t.as_row() for t in transfers], use_container_width=True)
+                counts = collections.Counter(t.state for t in transfers)
+                message = (f"{counts['done']} updated, {counts['skipped']} already current, {counts['failed']} failed "
+                           f"in {time.perf_counter() - start:.1f}s")
+                if counts["failed"]:
+                    st.error(f"❌ {message}")
+                else:
+                    st.success(f"✅ {message}")
+        push_user, push_ip = st.session_state.get("username"), st.session_state.get("ip")
+        if dist_buttons[1].button("⬆️ Push from Target Host",
+                                  disabled=not dist_image or not push_user or not push_ip):
+            status = st.empty()
+            for transfer in image_distribution.push_image(push_user, push_ip, dist_image, auth=dist_auth):
+                status.progress(transfer.progress, text=f"{transfer.state} · {len(transfer.layers)} layers · "
+                                                        f"{transfer.note}")
+            if transfer.state == "failed":
+                st.error(f"❌ {transfer.error}")
+            else:
+                st.success(f"✅ Pushed in {transfer.duration:.1f}s · {transfer.note}")
+            st.dataframe([vars(layer) for layer in transfer.layers.values()], use_container_width=True)
+
+    with st.expander("🧱 Image Layer Analyzer"):
+        layers_user = st.session_state.get("username")
+        layers_ip = st.session_state.get("ip")
+        if not layers_user or not layers_ip:
+            st.info("Enter a username and IP address to analyze the host's images.")
+        else:
+            st.caption("Attributes image size to layers and Dockerfile instructions; layers shared by several "
+                       "images are stored once and counted once.")
+            if st.button("🧱 Analyze Images"):
+                try:
+                    with st.spinner("Reading image history..."):
+                        st.session_state.layer_report = image_analyzer.analyze_host(
+                            docker_api.get_client(layers_user, layers_ip))
+                except (docker_api.DockerAPIError, ConnectionError) as e:
+                    st.error(f"❌ {e}")
+            report = st.session_state.get("layer_report")
+            if report is not None and report.host == layers_ip:
+                metric_cols = st.columns(4)
+                metric_cols[0].metric("Images", len(report.images))
+                metric_cols[1].metric("Apparent Size", f"{report.apparent_size / 1e9:.2f} GB")
+                metric_cols[2].metric("Stored Once", f"{report.stored_size / 1e9:.2f} GB")
+                metric_cols[3].metric("Saved by Sharing", f"{report.shared_savings / 1e9:.2f} GB")
+                report_view = st.radio("Show", ["Biggest Layers", "Biggest Images", "By Instruction", "Hints"],
+                                       horizontal=True, key="layer_report_view")
+                if report_view == "Biggest Layers":
+                    st.dataframe([layer.as_row() for layer in report.biggest_layers(50)], use_container_width=True)
+                elif report_view == "Biggest Images":
+                    st.dataframe([image.as_row() for image in report.biggest_images(50)], use_container_width=True)
+                    layer_image = st.selectbox("Layers of", [image.name for image in report.biggest_images(50)],
+                                               key="layer_report_image")
+                    chosen_image = next(image for image in report.images if image.name == layer_image)
+                    st.dataframe([layer.as_row() for layer in chosen_image.layers], use_container_width=True)
+                elif report_view == "By Instruction":
+                    st.dataframe(report.instruction_totals(), use_container_width=True)
+                else:
+                    hints = report.hints()
+                    if hints:
+                        st.dataframe(hints, use_container_width=True)
+                    else:
+                        st.success("✅ No layer matched a size hint.")
+                for image_name, error in report.errors.items():
+                    st.warning(f"{image_name}: {error}")
+
+    with st.expander("🧾 Dockerfile Generator"):
+        st.caption("Builds a multi-stage, cache-friendly Dockerfile for a local project: dependency manifests are "
+                   "installed before the source is copied, on a slim base.")
+        gen_cols = st.columns([2, 1])
+        gen_path = gen_cols[0].text_input("Project Directory", value=os.getcwd(), key="gen_path")
+        gen_entry = gen_cols[1].text_input("Entry File (Python, optional)", placeholder="e.g. src/main.py",
+                                           key="gen_entry")
+        gen_buttons = st.columns(3)
+        if gen_buttons[0].button("🧾 Generate"):
+            try:
+                st.session_state.gen_profile = docker_generator_agent.detect_project(gen_path, gen_entry.strip())
+            except ValueError as e:
+                st.session_state.pop("gen_profile", None)
+                st.warning(str(e))
+        profile = st.session_state.get("gen_profile")
+        if profile is not None:
+            st.caption(f"✅ {profile.summary()}")
+            st.code(docker_generator_agent.generate_dockerfile(profile), language="dockerfile")
+            gen_overwrite = st.checkbox("Overwrite an existing Dockerfile / .dockerignore", key="gen_overwrite")
+            if gen_buttons[1].button("💾 Write Files"):
+                written = docker_generator_agent.write_files(profile, overwrite=gen_overwrite)
+                if written:
+                    st.success(f"✅ Wrote {', '.join(written)}")
+                else:
+                    st.info("Files already exist; tick overwrite to replace them.")
+            if gen_buttons[2].button("⏱️ Benchmark Rebuild"):
+                with st.spinner("Building twice (cold, then after a one-line source change)..."):
+                    bench = docker_generator_agent.benchmark(profile)
+                if bench.succeeded:
+                    st.success(f"✅ Cold build {bench.cold_time:.1f}s · rebuild after editing `{bench.edited_file}` "
+                               f"{bench.rebuild_time:.1f}s · {bench.cached_steps}/{bench.steps} steps cached")
+                else:
+                    st.error(f"❌ {bench.error}")
+                if bench.log_tail:
+                    st.text_area("Build Log (tail)", bench.log_tail, height=200)
+
+    with st.expander("📦 Bulk Container Actions"):
+        bulk_user = st.session_state.get("username")
+        bulk_ip = st.session_state.get("ip")
+        if not bulk_user or not bulk_ip:
+            st.info("Enter a username and IP address to manage containers in bulk.")
+        elif docker_connection("bulk", [(bulk_user, bulk_ip)], label="📥 Load Containers"):
+            bulk_inventory = docker_inventory.get_inventory(bulk_user, bulk_ip)
+            bulk_inventory.wait_ready(timeout=docker_api.DEFAULT_API_TIMEOUT)
+            all_containers = bulk_inventory.containers()
+            bulk_mode = st.radio("Select by", ["Names", "Name pattern", "Labels"], horizontal=True, key="bulk_mode")
+            try:
+                if bulk_mode == "Names":
+                    chosen = st.multiselect("Containers", [bulk_ops.container_name(c) for c in all_containers],
+                                            key="bulk_names")
+                    targets = bulk_ops.select_containers(all_containers, names=chosen)
+                elif bulk_mode == "Name pattern":
+                    pattern = st.text_input("Glob (e.g. `web-*`)", key="bulk_pattern")
+                    targets = bulk_ops.select_containers(all_containers, pattern=pattern) if pattern else []
+                else:
+                    selector = st.text_input("Labels (e.g. `app=web, tier`)", key="bulk_labels")
+                    labels = bulk_ops.parse_label_selector(selector)
+                    targets = bulk_ops.select_containers(all_containers, labels=labels) if labels else []
+            except ValueError as e:
+                st.warning(str(e))
+                targets = []
+            bulk_cols = st.columns(3)
+            bulk_action = bulk_cols[0].selectbox("Action", bulk_ops.BULK_ACTIONS, key="bulk_action")
+            bulk_parallel = bulk_cols[1].number_input("Parallel", min_value=1, max_value=docker_api.DEFAULT_MAX_CONNECTIONS,
+                                                      value=docker_api.DEFAULT_MAX_CONNECTIONS)
+            bulk_stop_timeout = bulk_cols[2].number_input("Graceful Stop Timeout (s)", min_value=0, max_value=600,
+                                                          value=docker_api.DEFAULT_STOP_TIMEOUT)
+            st.caption(f"{len(targets)} container(s) selected: "
+                       f"{', '.join(bulk_ops.container_name(c) for c in targets[:20])}"
+                       f"{' ...' if len(targets) > 20 else ''}")
+            confirmed = True
+            if bulk_action == "remove":
+                confirmed = st.checkbox(f"⚠️ Yes, remove {len(targets)} container(s) (running ones are force-removed)",
+                                        key="bulk_confirm")
+            if st.button("🚀 Apply to Selection", disabled=not targets or not confirmed):
+                client = docker_api.get_client(bulk_user, bulk_ip)
+                progress = st.progress(0.0)
+                outcomes = []
+                start = time.perf_counter()
+                for outcome in bulk_ops.run_bulk(client, bulk_action, targets, max_concurrency=int(bulk_parallel),
+                                                 stop_timeout=int(bulk_stop_timeout), force=bulk_action == "remove"):
+                    outcomes.append(outcome)
+                    progress.progress(len(outcomes) / len(targets),
+                                      text=f"{len(outcomes)}/{len(targets)} containers done")
+                failed = sum(1 for o in outcomes if o.status == "failed")
+                message = f"{bulk_action} on {len(outcomes)} containers in {time.perf_counter() - start:.1f}s"
+                if failed:
+                    st.error(f"❌ {failed} failed · {message}")
+                else:
+                    st.success(f"✅ {message}")
+                st.dataframe([o.as_row() for o in outcomes], use_container_width=True)
+
+    with st.expander("📜 Container Logs (incremental)"):
+        logs_user = st.session_state.get("username")
+        logs_ip = st.session_state.get("ip")
+        st.caption("Only lines newer than the last fetched one are transferred; fetched lines are kept "
+                   "in a compressed local store and searched there.")
+        if not logs_user or not logs_ip:
+            st.info("Enter a username and IP address to view container logs.")
+        elif docker_connection("logs", [(logs_user, logs_ip)], label="📥 Load Containers"):
+            logs_inventory = docker_inventory.get_inventory(logs_user, logs_ip)
+            logs_inventory.wait_ready(timeout=docker_api.DEFAULT_API_TIMEOUT)
+            logs_names = [bulk_ops.container_name(c) for c in logs_inventory.containers()]
+            if not logs_names:
+                st.info("No containers found on this host.")
+            else:
+                logs_container = st.selectbox("Container", logs_names, key="logs_container")
+                store = log_store.get_store(logs_ip, logs_container)
+                logs_cols = st.columns(3)
+                logs_initial = logs_cols[0].number_input("Lines on First Fetch (0 = all)", min_value=0,
+                                                         value=5000, key="logs_initial_tail")
+                logs_window = logs_cols[1].number_input("Search Last N Minutes (0 = all)", min_value=0,
+                                                        value=0, key="logs_window")
+                logs_tail = logs_cols[2].number_input("Tail Lines", min_value=10, max_value=5000, value=200,
+                                                      key="logs_tail")
+                if st.button("⬇️ Fetch New Lines"):
+                    try:
+                        result = log_store.sync_logs(docker_api.get_client(logs_user, logs_ip), logs_container, store,
+                                                     initial_tail=int(logs_initial) or None)
+                        st.success(f"✅ {result.new_lines} new lines · {result.bytes_transferred / 1024:.1f} KiB "
+                                   f"transferred in {result.duration:.2f}s"
+                                   f"{' (first fetch)' if result.first_sync else ''}")
+                    except (docker_api.DockerAPIError, ConnectionError) as e:
+                        st.error(f"❌ {e}")
+                stored = store.stats()
+                if stored["lines"]:
+                    st.caption(f"🗄️ {stored['lines']} lines in {stored['chunks']} chunks · "
+                               f"{stored['stored_bytes'] / 1024:.1f} KiB on disk · up to "
+                               f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stored['last']))}")
+                search_cols = st.columns([3, 1])
+                logs_query = search_cols[0].text_input("Search Stored Lines", key="logs_query")
+                logs_regex = search_cols[1].checkbox("Regex", key="logs_regex")
+                if logs_query:
+                    try:
+                        matches = store.search(logs_query, regex=logs_regex,
+                                               since=time.time() - logs_window * 60 if logs_window else None)
+                        st.caption(f"{len(matches)} matching lines (newest 500 at most)")
+                        st.dataframe([line.as_row() for line in matches], use_container_width=True)
+                    except re.error as e:
+                        st.warning(f"Invalid regular expression: {e}")
+                else:
+                    st.dataframe([line.as_row() for line in store.tail(int(logs_tail))], use_container_width=True)
+                if stored["lines"] and st.button("🗑️ Clear Local Copy"):
+                    store.clear()
+                    st.rerun()
+
+    with st.expander("📈 Live Container Monitor"):
+        monitor = container_monitor.get_monitor()
+        if monitor is None:
+            st.caption("Streams CPU, memory, network and block I/O of every running container "
+                       "through the Docker Engine API.")
+            default_target = (f"{st.session_state.get('username')}@{st.session_state.get('ip')}"
+                              if st.session_state.get("username") and st.session_state.get("ip") else "")
+            monitor_inventory = st.text_area(
+                "Host Inventory (one `user@host` or `host` per line)",
+                value=st.session_state.get("fleet_inventory") or default_target,
+                key="monitor_inventory",
+                height=100,
+            )
+            monitor_cols = st.columns(4)
+            cpu_threshold = monitor_cols[0].number_input("CPU Alert (%)", min_value=1.0, max_value=6400.0,
+                                                         value=container_monitor.DEFAULT_THRESHOLDS["cpu_percent"])
+            mem_threshold = monitor_cols[1].number_input("Memory Alert (% of limit)", min_value=1.0, max_value=100.0,
+                                                         value=container_monitor.DEFAULT_THRESHOLDS["mem_percent"])
+            alert_window = monitor_cols[2].number_input("Sustained for (s)", min_value=5, max_value=3600,
+                                                        value=container_monitor.DEFAULT_ALERT_WINDOW)
+            # Right-sizing can only look back as far as the monitor keeps samples.
+            history_minutes = monitor_cols[3].selectbox("Keep History", [20, 60, 240],
+                                                        format_func=lambda minutes: f"{minutes} min")
+            if st.button("▶️ Start Monitor"):
+                try:
+                    inventory = fleet.parse_inventory(monitor_inventory, default_user=st.session_state.get("username"))
+                except ValueError as e:
+                    st.warning(str(e))
+                    inventory = []
+                if not inventory:
+                    st.warning("Please enter at least one host.")
+                else:
+                    container_monitor.start_monitor(
+                        inventory,
+                        capacity=int(history_minutes * 60 / container_monitor.DEFAULT_SAMPLE_INTERVAL),
+                        thresholds={"cpu_percent": cpu_threshold, "mem_percent": mem_threshold},
+                        alert_window=float(alert_window),
+                    )
+                    st.rerun()
+        else:
+            st.success(f"🟢 Monitoring containers on {len(monitor.inventory)} hosts")
+            for alert in [a for a in monitor.alerts if not a.resolved][-5:]:
+                st.error(f"🚨 {alert.host}/{alert.container}: {alert.field} averaged {alert.value:.1f} "
+                         f"(threshold {alert.threshold:g}) over {monitor.alert_window:g}s")
+            summary = monitor.summary()
+            if summary:
+                st.dataframe(summary, use_container_width=True)
+                monitor_metric = st.selectbox("Metric", container_monitor.NUMERIC_FIELDS, key="monitor_field")
+                frame = monitor.series_frame(monitor_metric, since=time.time() - 900)
+                if not frame.empty:
+                    st.line_chart(frame)
+            else:
+                st.info("Waiting for the first samples...")
+            if monitor.alerts:
+                st.dataframe([a.as_row() for a in reversed(monitor.alerts)], use_container_width=True)
+            for host, error in list(monitor.errors.items()):
+                st.warning(f"{host}: {error}")
+            monitor_buttons = st.columns(2)
+            if monitor_buttons[0].button("🔄 Refresh"):
+                st.rerun()
+            if monitor_buttons[1].button("⏹️ Stop Monitor"):
+                container_monitor.stop_monitor()
+                st.rerun()
+
+    with st.expander("📐 Right-Sizing Recommendations"):
+        monitor = container_monitor.get_monitor()
+        if monitor is None or not monitor.containers():
+            st.info("Start the Live Container Monitor above; recommendations are computed from its samples.")
+        else:
+            retention_minutes = max(1, int(monitor.capacity * monitor.sample_interval // 60))
+            st.caption(f"--cpus from the 95th percentile of CPU, --memory from peak memory, both with headroom. "
+                       f"The monitor keeps {monitor.capacity} samples per container "
+                       f"(~{retention_minutes} min); longer windows need a longer history when it is started.")
+            # Windows beyond the retained history would silently cover the same samples.
+            sizing_windows = sorted({m for m in (5, 15, 60, 240) if m < retention_minutes} | {retention_minutes})
+            sizing_cols = st.columns(3)
+            sizing_window = sizing_cols[0].selectbox("Window", sizing_windows, index=min(1, len(sizing_windows) - 1),
+                                                     format_func=lambda minutes: f"Last {minutes} min",
+                                                     key="sizing_window")
+            cpu_headroom = sizing_cols[1].number_input("CPU Headroom (x p95)", min_value=1.0, max_value=4.0,
+                                                       value=rightsizing.CPU_HEADROOM, step=0.05)
+            memory_headroom = sizing_cols[2].number_input("Memory Headroom (x peak)", min_value=1.0, max_value=4.0,
+                                                          value=rightsizing.MEMORY_HEADROOM, step=0.05)
+            recommendations = rightsizing.recommend_all(monitor, window=sizing_window * 60,
+                                                        cpu_headroom=cpu_headroom, memory_headroom=memory_headroom)
+            if not recommendations:
+                st.info(f"No samples in the last {sizing_window} min (stopped containers or a short window); "
+                        f"choose a longer window or let the monitor collect more.")
+            else:
+                st.dataframe([r.as_row() for r in recommendations], use_container_width=True)
+
+                st.markdown("**🚀 Launch with Recommended Limits**")
+                chosen = recommendations[st.selectbox(
+                    "Based on", range(len(recommendations)), key="sizing_target",
+                    format_func=lambda i: f"{recommendations[i].usage.host}/{recommendations[i].usage.container}")]
+                sizing_user = next((user for user, host in monitor.inventory if host == chosen.usage.host), None)
+                launch_cols = st.columns(2)
+                sizing_name = launch_cols[0].text_input("New Container Name", key="sizing_name")
+                sizing_image = launch_cols[1].text_input("Image", key="sizing_image")
+                st.code(f"docker run -d --name {sizing_name or '<name>'} {chosen.docker_flags} "
+                        f"{sizing_image or '<image>'}", language="bash")
+                if not chosen.confident:
+                    st.warning("⚠️ Few samples in this window; the limits may be too tight.")
+                if st.button("🚀 Launch on " + chosen.usage.host, disabled=not sizing_name or not sizing_image):
+                    try:
+                        result = docker_runner.execute_docker_command(
+                            "Launch New Container with Limits",
+                            {"name": sizing_name, "image": sizing_image, "cpus": f"{chosen.cpus:g}",
+                             "memory": chosen.memory_flag},
+                            sizing_user, chosen.usage.host,
+                        )
+                        output = docker_runner.format_docker_result(result)
+                        if result.exit_status == 0:
+                            st.success(f"✅ {output.strip()}")
+                        else:
+                            st.error(output)
+                    except ConnectionError as e:
+                        st.error(f"❌ {e}")
+
 
 # 🐍 Python Automation Module
 elif st.session_state.selected_tool == "Python Automation":
@@ -0,0 +1,452 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+DEFAULT_PYTHON_VERSION = "3.11"
+DEFAULT_NODE_VERSION = "20"
+DEFAULT_GO_VERSION = "1.22"
+BUILD_TIMEOUT = 1800    # seconds per docker build in benchmark mode
+PYTHON_ENTRY_FILES = ["app.py", "main.py", "streamlit_app.py", "server.py", "manage.py", "wsgi.py"]
+
+DOCKERIGNORE = {
+    "common": [".git", ".gitignore", ".dockerignore", "Dockerfile", "**/.DS_Store", ".env", "*.log",
+               ".idea", ".vscode"],
+    "python": ["__pycache__", "**/*.py[cod]", ".venv", "venv", ".pytest_cache", ".mypy_cache", ".ruff_cache",
+               "*.egg-info", "build", "dist"],
+    "node": ["node_modules", "npm-debug.log*", "coverage", ".next/cache"],
+    "go": ["bin", "vendor"],
+}
+
+SOURCE_EXTENSIONS = {"python": (".py",), "node": (".js", ".mjs", ".cjs", ".ts"), "go": (".go",)}
+
+# Copied into the benchmark build directory without the heavy, rebuildable parts.
+_BENCHMARK_IGNORE = shutil.ignore_patterns(".git", "node_modules", ".venv", "venv", "__pycache__")
+
+
+@dataclass
+class ProjectProfile:
+    path: str
+    language: str                   # "python", "node" or "go"
+    manifests: list[str]            # dependency files copied before the source (cache key of the deps layer)
+    version: str                    # language/runtime version for the base image
+    package_manager: str = ""       # pip, poetry, npm, yarn, pnpm or go
+    command: list[str] = field(default_factory=list)
+    port: int | None = None
+    system_packages: list[str] = field(default_factory=list)   # apt packages (packages.txt)
+    build_script: bool = False      # node: package.json has a "build" script
+    entry_file: str = ""            # source file the benchmark edits
+
+    def summary(self) -> str:
+        parts = [f"{self.language} {self.version}", self.package_manager, f"deps from {', '.join(self.manifests)}"]
+        if self.port:
+            parts.append(f"port {self.port}")
+        return " · ".join(part for part in parts if part)
+
+
+@dataclass
+class BenchmarkResult:
+    cold_time: float = 0.0
+    rebuild_time: float = 0.0
+    steps: int = 0
+    cached_steps: int = 0           # steps of the rebuild served from the layer cache
+    edited_file: str = ""
+    error: str = ""
+    log_tail: str = ""
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.error
+
+    def as_row(self) -> dict:
+        return {
+            "cold_build_s": round(self.cold_time, 1),
+            "rebuild_s": round(self.rebuild_time, 1),
+            "cached_steps": f"{self.cached_steps}/{self.steps}",
+            "edited_file": self.edited_file,
+            "error": self.error,
+        }
+
+
+# ---------------------------------------------------------------------- #
+# Project detection
+# ---------------------------------------------------------------------- #
+def _read(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _first_existing(root: str, names: list[str]) -> str:
+    return next((name for name in names if os.path.isfile(os.path.join(root, name))), "")
+
+
+def _python_command(root: str, requirements: str, entry: str = "") -> tuple[list[str], int | None, str]:
+    """
+    Start command, port and entry file of a Python project, guessed from its dependencies.
+
+    Raises:
+        ValueError: If no entry file is given and none of the usual ones exists;
+            a bare ``python`` would only start a REPL that exits at once.
+    """
+    deps = requirements.lower()
+    entry = entry or _first_existing(root, PYTHON_ENTRY_FILES)
+    if not entry:
+        raise ValueError(f"No Python entry point found ({', '.join(PYTHON_ENTRY_FILES)}); "
+                         f"give the file to run as the entry file")
+    module = entry.removesuffix(".py").replace("/", ".")
+    if "streamlit" in deps:
+        return ["streamlit", "run", entry, "--server.port=8501", "--server.address=0.0.0.0"], 8501, entry
+    if entry == "manage.py":
+        return ["python", "manage.py", "runserver", "0.0.0.0:8000"], 8000, entry
+    if "fastapi" in deps:
+        server = "uvicorn" if "uvicorn" in deps else "python -m uvicorn"
+        return [*server.split(), f"{module}:app", "--host", "0.0.0.0", "--port", "8000"], 8000, entry
+    if "flask" in deps:
+        if "gunicorn" in deps:
+            return ["gunicorn", "--bind", "0.0.0.0:5000", f"{module}:app"], 5000, entry
+        return ["python", entry], 5000, entry
+    if "gradio" in deps:
+        return ["python", entry], 7860, entry
+    return ["python", entry], None, entry
+
+
+def detect_project(path: str, entry: str = "") -> ProjectProfile:
+    """
+    Work out language, dependency manifests, versions and start command of a project.
+
+    Args:
+        path (str): Project directory
+        entry (str, optional): File a Python project runs, relative to ``path``
+            (default: the first of :data:`PYTHON_ENTRY_FILES` that exists)
+
+    Raises:
+        ValueError: If the directory does not exist, no supported manifest
+            (requirements.txt, pyproject.toml, package.json, go.mod) is found,
+            or a Python project has no entry point.
+    """
+    root = os.path.abspath(os.path.expanduser(path))
+    if not os.path.isdir(root):
+        raise ValueError(f"Not a directory: '{path}'")
+    if entry and not os.path.isfile(os.path.join(root, entry)):
+        raise ValueError(f"Entry file not found: '{entry}'")
+    files = set(os.listdir(root))
+
+    if "package.json" in files:
+        try:
+            package = json.loads(_read(os.path.join(root, "package.json")))
+        except ValueError as e:
+            raise ValueError(f"Invalid package.json: {e}") from e
+        lock, manager = next(((lock, manager) for lock, manager in [
+            ("pnpm-lock.yaml", "pnpm"), ("yarn.lock", "yarn"), ("package-lock.json", "npm")] if lock in files),
+            ("", "npm"))
+        engines = (package.get("engines") or {}).get("node", "")
+        nvmrc = _read(os.path.join(root, ".nvmrc")).strip().lstrip("v")
+        version = (re.search(r"\d+", engines or nvmrc) or [DEFAULT_NODE_VERSION])[0]
+        scripts = package.get("scripts") or {}
+        command = ["npm", "start"] if "start" in scripts else ["node", package.get("main", "index.js")]
+        entry = package.get("main", "") or _first_existing(root, ["index.js", "server.js", "app.js", "src/index.js",
+                                                                   "src/index.ts"])
+        return ProjectProfile(root, "node", ["package.json", *([lock] if lock else [])], version, manager,
+                              command, 3000, build_script="build" in scripts, entry_file=entry)
+
+    if "go.mod" in files:
+        match = re.search(r"^go (\d+\.\d+)", _read(os.path.join(root, "go.mod")), re.MULTILINE)
+        manifests = ["go.mod", *(["go.sum"] if "go.sum" in files else [])]
+        entry = _first_existing(root, ["main.go", "cmd/main.go"])
+        return ProjectProfile(root, "go", manifests, match.group(1) if match else DEFAULT_GO_VERSION, "go",
+                              ["/app"], None, entry_file=entry)
+
+    # requirements.txt (the shortest name) is installed; -prod variants are copied along for ``-r`` includes.
+    requirements = sorted((name for name in files if re.fullmatch(r"requirements(-prod|\.prod)?\.txt", name)),
+                          key=len)
+    pyproject = _read(os.path.join(root, "pyproject.toml")) if "pyproject.toml" in files else ""
+    if requirements or pyproject:
+        runtime = _read(os.path.join(root, "runtime.txt")) or _read(os.path.join(root, ".python-version"))
+        match = re.search(r"(\d+\.\d+)", runtime)
+        if requirements:
+            manager, manifests = "pip", requirements
+        elif "[tool.poetry]" in pyproject:
+            manager, manifests = "poetry", ["pyproject.toml", *(["poetry.lock"] if "poetry.lock" in files else [])]
+        else:
+            manager, manifests = "pip", ["pyproject.toml"]
+        command, port, entry = _python_command(root, _read(os.path.join(root, manifests[0])), entry)
+        system_packages = [line.strip() for line in _read(os.path.join(root, "packages.txt")).splitlines()
+                           if line.strip() and not line.startswith("#")]
+        return ProjectProfile(root, "python", manifests, match.group(1) if match else DEFAULT_PYTHON_VERSION,
+                              manager, command, port, system_packages, entry_file=entry)
+
+    raise ValueError("No requirements.txt, pyproject.toml, package.json or go.mod found")
+
+
+# ---------------------------------------------------------------------- #
+# Generation
+# ---------------------------------------------------------------------- #
+def _python_dockerfile(p: ProjectProfile) -> list[str]:
+    base = f"python:{p.version}-slim"
+    lines = [f"FROM {base} AS builder",
+             "ENV PIP_DISABLE_PIP_VERSION_CHECK=1 PIP_NO_CACHE_DIR=1",
+             "WORKDIR /app",
+             "RUN python -m venv /opt/venv",
+             'ENV PATH="/opt/venv/bin:$PATH"',
+             "# Dependencies first: this layer is reused until a manifest changes.",
+             f"COPY {' '.join(p.manifests)} ./"]
+    if p.package_manager == "poetry":
+        lines += ["RUN pip install poetry poetry-plugin-export \\",
+                  "    && poetry export --without-hashes --only main -o /tmp/requirements.txt \\",
+                  "    && pip install -r /tmp/requirements.txt"]
+    elif p.manifests[0].endswith(".txt"):
+        lines.append(f"RUN pip install -r {p.manifests[0]}")
+    else:
+        # PEP 621 project without a lock file: install [project] dependencies from pyproject.toml
+        # alone, so only the --no-deps install of the project itself reruns on source edits.
+        toml = "tomllib" if tuple(int(part) for part in p.version.split(".")[:2]) >= (3, 11) else "tomli"
+        if toml == "tomli":
+            lines.insert(-1, "RUN pip install tomli")   # before the COPY, so it is cached independently
+        lines += [f'RUN python -c "import {toml}; '
+                  f"print(*{toml}.load(open('pyproject.toml', 'rb')).get('project', {{}}).get('dependencies', []), "
+                  f'sep=chr(10))" > /tmp/requirements.txt \\',
+                  "    && pip install -r /tmp/requirements.txt",
+                  "COPY . .",
+                  "RUN pip install --no-deps ."]
+    lines += ["", f"FROM {base}",
+              "ENV PATH=\"/opt/venv/bin:$PATH\" PYTHONDONTWRITEBYTECODE=1 PYTHONUNBUFFERED=1"]
+    if p.system_packages:
+        lines += ["RUN apt-get update \\",
+                  f"    && apt-get install -y --no-install-recommends {' '.join(p.system_packages)} \\",
+                  "    && rm -rf /var/lib/apt/lists/*"]
+    lines += ["RUN useradd --create-home --uid 10001 app",
+              "WORKDIR /app",
+              "COPY --from=builder /opt/venv /opt/venv",
+              "COPY --chown=app:app . .",
+              "USER app"]
+    return lines
+
+
+def _node_dockerfile(p: ProjectProfile) -> list[str]:
+    base = f"node:{p.version}-slim"
+    install = {
+        "npm": "npm ci" if "package-lock.json" in p.manifests else "npm install",
+        "yarn": "yarn install --frozen-lockfile",
+        "pnpm": "pnpm install --frozen-lockfile",
+    }[p.package_manager]
+    prune = {"npm": "npm prune --omit=dev", "yarn": "yarn install --frozen-lockfile --production",
+             "pnpm": "pnpm prune --prod"}[p.package_manager]
+    lines = [f"FROM {base} AS build", "WORKDIR /app"]
+    if p.package_manager != "npm":
+        lines.append("RUN corepack enable")
+    lines += ["# Dependencies first: this layer is reused until a manifest changes.",
+              f"COPY {' '.join(p.manifests)} ./",
+              f"RUN {install}",
+              "COPY . ."]
+    if p.build_script:
+        lines.append(f"RUN {p.package_manager} run build")
+    lines += [f"RUN {prune}",
+              "", f"FROM {base}",
+              "ENV NODE_ENV=production",
+              "WORKDIR /app",
+              "COPY --from=build --chown=node:node /app ./",
+              "USER node"]
+    return lines
+
+
+def _go_dockerfile(p: ProjectProfile) -> list[str]:
+    return [f"FROM golang:{p.version} AS build",
+            "WORKDIR /src",
+            "# Dependencies first: this layer is reused until go.mod/go.sum change.",
+            f"COPY {' '.join(p.manifests)} ./",
+            "RUN go mod download",
+            "COPY . .",
+            "RUN CGO_ENABLED=0 go build -trimpath -ldflags='-s -w' -o /out/app .",
+            "", "FROM gcr.io/distroless/static-debian12:nonroot",
+            "COPY --from=build /out/app /app",
+            "USER nonroot:nonroot"]
+
+
+def generate_dockerfile(profile: ProjectProfile) -> str:
+    """
+    Multi-stage Dockerfile ordered for layer-cache reuse.
+
+    Dependency manifests are copied and installed before the source, so
+    editing code only rebuilds the final ``COPY`` layers. Build tools stay in
+    the first stage; the runtime stage starts from a slim (or distroless) base
+    and runs as a non-root user.
+    """
+    build = {"python": _python_dockerfile, "node": _node_dockerfile, "go": _go_dockerfile}[profile.language]
+    lines = ["# syntax=docker/dockerfile:1", f"# Generated for: {profile.summary()}", *build(profile)]
+    if profile.port:
+        lines.append(f"EXPOSE {profile.port}")
+    if profile.command:
+        key = "ENTRYPOINT" if profile.language == "go" else "CMD"
+        lines.append(f"{key} {json.dumps(profile.command)}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_dockerignore(profile: ProjectProfile) -> str:
+    """Keeps the build context (and so the ``COPY . .`` layer) small and stable."""
+    return "\n".join(DOCKERIGNORE["common"] + DOCKERIGNORE[profile.language]) + "\n"
+
+
+def write_files(profile: ProjectProfile, overwrite: bool = False) -> list[str]:
+    """
+    Write Dockerfile and .dockerignore into the project; returns the files written.
+
+    Existing files are kept unless ``overwrite`` is set.
+    """
+    written = []
+    for name, content in (("Dockerfile", generate_dockerfile(profile)),
+                          (".dockerignore", generate_dockerignore(profile))):
+        target = os.path.join(profile.path, name)
+        if os.path.exists(target) and not overwrite:
+            continue
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(content)
+        written.append(target)
+    return written
+
+
+# ---------------------------------------------------------------------- #
+# Benchmark
+# ---------------------------------------------------------------------- #
+def _build(context: str, tag: str) -> tuple[float, str, int]:
+    start = time.perf_counter()
+    proc = subprocess.run(["docker", "build", "--progress=plain", "-t", tag, context],
+                          capture_output=True, text=True, errors="replace", timeout=BUILD_TIMEOUT,
+                          env={**os.environ, "DOCKER_BUILDKIT": "1"})
+    return time.perf_counter() - start, proc.stdout + proc.stderr, proc.returncode
+
+
+def _source_file(context: str, profile: ProjectProfile) -> str:
+    """Source file (relative path) the benchmark edits: the entry file, else the first other source file."""
+    if profile.entry_file and profile.entry_file not in profile.manifests \
+            and os.path.isfile(os.path.join(context, profile.entry_file)):
+        return profile.entry_file
+    for directory, dirs, files in os.walk(context):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in DOCKERIGNORE[profile.language])
+        for name in sorted(files):
+            relative = os.path.relpath(os.path.join(directory, name), context)
+            if name.endswith(SOURCE_EXTENSIONS[profile.language]) and relative not in profile.manifests:
+                return relative
+    return ""
+
+
+def benchmark(profile: ProjectProfile, dockerfile: str | None = None,
+              tag: str = "dockerfile-generator-benchmark") -> BenchmarkResult:
+    """
+    Build the generated Dockerfile twice, with a one-line source change in between.
+
+    The project is copied to a temporary directory first, so the real source
+    is never edited. The first build fills the layer cache; the second, after
+    appending a comment to a source file (never a dependency manifest),
+    shows what a code-only change costs: with cache-friendly ordering only
+    the source layers rebuild. Needs a local ``docker`` with BuildKit.
+    """
+    result = BenchmarkResult()
+    comment = {"python": "# benchmark edit", "node": "// benchmark edit", "go": "// benchmark edit"}
+    with tempfile.TemporaryDirectory(prefix="dockerfile-bench-") as tmp:
+        context = os.path.join(tmp, "project")
+        try:
+            shutil.copytree(profile.path, context, ignore=_BENCHMARK_IGNORE, symlinks=True)
+            with open(os.path.join(context, "Dockerfile"), "w", encoding="utf-8") as f:
+                f.write(dockerfile or generate_dockerfile(profile))
+            if not os.path.exists(os.path.join(context, ".dockerignore")):
+                with open(os.path.join(context, ".dockerignore"), "w", encoding="utf-8") as f:
+                    f.write(generate_dockerignore(profile))
+            result.edited_file = _source_file(context, profile)
+            if not result.edited_file:
+                result.error = "no source file to edit (only dependency manifests found); benchmark skipped"
+                return result
+
+            result.cold_time, log, status = _build(context, tag)
+            if status != 0:
+                result.error, result.log_tail = "first build failed", log[-4000:]
+                return result
+
+            with open(os.path.join(context, result.edited_file), "a", encoding="utf-8") as f:
+                f.write(f"\n{comment[profile.language]} {time.time():.0f}\n")
+
+            result.rebuild_time, log, status = _build(context, tag)
+            result.log_tail = log[-4000:]
+            if status != 0:
+                result.error = "rebuild failed"
+                return result
+            steps = set(re.findall(r"^#(\d+) \[(?!internal)", log, re.MULTILINE))
+            result.steps = len(steps)
+            result.cached_steps = len(set(re.findall(r"^#(\d+) CACHED", log, re.MULTILINE)) & steps)
+        except FileNotFoundError:
+            result.error = "docker is not installed on this machine"
+        except subprocess.TimeoutExpired:
+            result.error = f"build timed out after {BUILD_TIMEOUT}s"
+        except OSError as e:
+            result.error = str(e)
+    return result
+
+
+# ---------------------------------------------------------------------- #
+# Gradio interface
+# ---------------------------------------------------------------------- #
+def build_interface():
+    """Gradio app: generate, write and benchmark a Dockerfile for a local project."""
+    import gradio as gr
+
+    def generate(path, entry):
+        try:
+            profile = detect_project(path, entry.strip())
+        except ValueError as e:
+            return f"❌ {e}", "", ""
+        return f"✅ {profile.summary()}", generate_dockerfile(profile), generate_dockerignore(profile)
+
+    def write(path, entry, dockerfile, dockerignore, overwrite):
+        try:
+            profile = detect_project(path, entry.strip())
+        except ValueError as e:
+            return f"❌ {e}"
+        written = []
+        for name, content in (("Dockerfile", dockerfile), (".dockerignore", dockerignore)):
+            target = os.path.join(profile.path, name)
+            if content and (overwrite or not os.path.exists(target)):
+                with open(target, "w", encoding="utf-8") as f:
+                    f.write(content)
+                written.append(name)
+        return f"✅ Wrote {', '.join(written)}" if written else "ℹ️ Files already exist (tick overwrite)"
+
+    def run_benchmark(path, entry, dockerfile):
+        try:
+            profile = detect_project(path, entry.strip())
+        except ValueError as e:
+            return f"❌ {e}", ""
+        result = benchmark(profile, dockerfile or None)
+        if not result.succeeded:
+            return f"❌ {result.error}", result.log_tail
+        return (f"✅ Cold build {result.cold_time:.1f}s · rebuild after editing `{result.edited_file}` "
+                f"{result.rebuild_time:.1f}s · {result.cached_steps}/{result.steps} steps cached"), result.log_tail
+
+    with gr.Blocks(title="Dockerfile Generator") as demo:
+        gr.Markdown("## 🐳 Dockerfile Generator\nCache-friendly, multi-stage Dockerfiles from a project directory.")
+        with gr.Row():
+            path = gr.Textbox(label="Project Directory", value=os.getcwd())
+            entry = gr.Textbox(label="Entry File (Python, optional)", placeholder="e.g. src/main.py")
+        status = gr.Markdown()
+        with gr.Row():
+            dockerfile = gr.Code(label="Dockerfile", language="dockerfile", interactive=True)
+            dockerignore = gr.Code(label=".dockerignore", interactive=True)
+        overwrite = gr.Checkbox(label="Overwrite existing files")
+        with gr.Row():
+            generate_button = gr.Button("Generate", variant="primary")
+            write_button = gr.Button("Write Files")
+            benchmark_button = gr.Button("Benchmark Rebuild")
+        log = gr.Textbox(label="Build Log (tail)", lines=12)
+        generate_button.click(generate, [path, entry], [status, dockerfile, dockerignore])
+        write_button.click(write, [path, entry, dockerfile, dockerignore, overwrite], [status])
+        benchmark_button.click(run_benchmark, [path, entry, dockerfile], [status, log])
+    return demo
+
+
+if __name__ == "__main__":
+    build_interface().launch()
@@ -0,0 +1,129 @@
+import fnmatch
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterator
+
+from core.docker_automation.docker_api import (
+    DEFAULT_MAX_CONNECTIONS, DEFAULT_STOP_TIMEOUT, DockerAPIClient, DockerAPIError,
+)
+
+BULK_ACTIONS = ("start", "stop", "restart", "remove")
+
+
+@dataclass
+class ContainerOutcome:
+    container: str
+    action: str
+    status: str = "ok"      # "ok", "failed" or "skipped" (already in the requested state)
+    duration: float = 0.0
+    error: str = ""
+
+    def as_row(self) -> dict:
+        return {
+            "container": self.container,
+            "action": self.action,
+            "status": self.status,
+            "duration_s": round(self.duration, 2),
+            "error": self.error,
+        }
+
+
+def container_name(container: dict) -> str:
+    return (container.get("Names") or [container["Id"][:12]])[0].lstrip("/")
+
+
+def parse_label_selector(selector: str) -> list[str]:
+    """
+    Split ``"app=web, tier"`` into Docker label filters (``key=value`` or bare ``key``).
+
+    Raises:
+        ValueError: On an empty key.
+    """
+    labels = [part.strip() for part in selector.split(",") if part.strip()]
+    for label in labels:
+        if not label.split("=", 1)[0].strip():
+            raise ValueError(f"Invalid label selector: '{label}'")
+    return labels
+
+
+def select_containers(containers: list[dict], names: list[str] | None = None,
+                      pattern: str | None = None, labels: list[str] | None = None) -> list[dict]:
+    """
+    Filter ``/containers/json`` entries.
+
+    All given criteria must match: ``names`` is an explicit list, ``pattern``
+    a shell-style glob on the name (e.g. ``web-*``) and ``labels`` a list of
+    ``key`` / ``key=value`` selectors.
+    """
+    selected = []
+    for container in containers:
+        name = container_name(container)
+        if names is not None and name not in names:
+            continue
+        if pattern and not fnmatch.fnmatchcase(name, pattern):
+            continue
+        container_labels = container.get("Labels") or {}
+        if labels and not all(
+            (label.split("=", 1)[0] in container_labels) if "=" not in label
+            else container_labels.get(label.split("=", 1)[0]) == label.split("=", 1)[1]
+            for label in labels
+        ):
+            continue
+        selected.append(container)
+    return selected
+
+
+def _already_done(action: str, container: dict) -> bool:
+    state = container.get("State")
+    return (action == "start" and state == "running") or (action == "stop" and state != "running")
+
+
+def _apply(client: DockerAPIClient, action: str, container: dict, stop_timeout: int,
+           force: bool) -> ContainerOutcome:
+    outcome = ContainerOutcome(container_name(container), action)
+    if _already_done(action, container):
+        outcome.status = "skipped"
+        return outcome
+    start = time.perf_counter()
+    try:
+        if action == "start":
+            client.start(container["Id"])
+        elif action == "stop":
+            client.stop(container["Id"], timeout=stop_timeout)
+        elif action == "restart":
+            client.restart(container["Id"], timeout=stop_timeout)
+        else:
+            client.remove(container["Id"], force=force)
+    except (DockerAPIError, ConnectionError) as e:
+        outcome.status, outcome.error = "failed", str(e)
+    outcome.duration = time.perf_counter() - start
+    return outcome
+
+
+def run_bulk(client: DockerAPIClient, action: str, containers: list[dict],
+             max_concurrency: int = DEFAULT_MAX_CONNECTIONS, stop_timeout: int = DEFAULT_STOP_TIMEOUT,
+             force: bool = False) -> Iterator[ContainerOutcome]:
+    """
+    Apply one lifecycle action to many containers of a host in parallel.
+
+    Up to ``max_concurrency`` API calls are in flight at once, each on its own
+    kept-alive connection through the host's tunnel. ``stop``/``restart`` give
+    every container ``stop_timeout`` seconds to exit before it is killed, so
+    the whole batch takes roughly ``ceil(n / max_concurrency) * stop_timeout``
+    at worst instead of ``n * stop_timeout``. Containers already in the
+    requested state are skipped.
+
+    Yields:
+        ContainerOutcome: One per container, as each finishes
+
+    Raises:
+        ValueError: For an unknown action.
+    """
+    if action not in BULK_ACTIONS:
+        raise ValueError(f"Action must be one of {', '.join(BULK_ACTIONS)}")
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        futures = [executor.submit(_apply, client, action, container, stop_timeout, force)
+                   for container in containers]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,278 @@
+import collections
+import threading
+import time
+from dataclasses import dataclass
+
+from core.docker_automation.docker_api import DockerAPIClient, DockerAPIError, get_client
+from core.linux_tools.metrics_collector import RingBuffer, downsample
+
+DEFAULT_CAPACITY = 600          # samples kept per container
+DEFAULT_SAMPLE_INTERVAL = 2     # seconds between stored samples (the engine emits one per second)
+DEFAULT_DISCOVERY_INTERVAL = 10  # seconds between checks for started/stopped containers
+DEFAULT_ALERT_WINDOW = 30       # seconds a rolling average must stay above a threshold
+DEFAULT_THRESHOLDS = {"cpu_percent": 80.0, "mem_percent": 90.0}
+STREAM_TIMEOUT = 30             # socket timeout of a stats stream; lets stopped monitors exit
+
+NUMERIC_FIELDS = ["cpu_percent", "mem_bytes", "mem_percent", "net_rx_bytes", "net_tx_bytes",
+                  "blk_read_bytes", "blk_write_bytes"]
+
+
+@dataclass(slots=True)
+class ContainerSample:
+    ts: float
+    cpu_percent: float
+    mem_bytes: int
+    mem_limit: int
+    mem_percent: float
+    net_rx_bytes: int
+    net_tx_bytes: int
+    blk_read_bytes: int
+    blk_write_bytes: int
+
+
+@dataclass
+class Alert:
+    host: str
+    container: str
+    field: str
+    value: float        # rolling average that crossed the threshold
+    threshold: float
+    ts: float
+    resolved: bool = False
+
+    def as_row(self) -> dict:
+        return {
+            "time": time.strftime("%H:%M:%S", time.localtime(self.ts)),
+            "host": self.host,
+            "container": self.container,
+            "metric": self.field,
+            "value": round(self.value, 1),
+            "threshold": self.threshold,
+            "state": "resolved" if self.resolved else "firing",
+        }
+
+
+def parse_stats(stats: dict, ts: float | None = None) -> ContainerSample:
+    """
+    Turn one ``/containers/{id}/stats`` document into a sample.
+
+    CPU usage is the share of host CPU time since the previous document
+    (``precpu_stats``), scaled by the number of online CPUs like ``docker stats``.
+    Page cache is excluded from memory usage (``inactive_file`` on cgroup v2,
+    ``total_inactive_file`` on v1).
+    """
+    cpu, precpu = stats.get("cpu_stats", {}), stats.get("precpu_stats", {})
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    cpu_percent = cpu_delta / system_delta * online * 100 if system_delta > 0 and cpu_delta > 0 else 0.0
+
+    memory = stats.get("memory_stats", {})
+    details = memory.get("stats", {})
+    cache = details.get("inactive_file", details.get("total_inactive_file", 0))
+    mem_bytes = max(0, memory.get("usage", 0) - cache)
+    mem_limit = memory.get("limit", 0)
+
+    networks = (stats.get("networks") or {}).values()
+    io = (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+    return ContainerSample(
+        ts=ts if ts is not None else time.time(),
+        cpu_percent=cpu_percent,
+        mem_bytes=mem_bytes,
+        mem_limit=mem_limit,
+        mem_percent=mem_bytes / mem_limit * 100 if mem_limit else 0.0,
+        net_rx_bytes=sum(n.get("rx_bytes", 0) for n in networks),
+        net_tx_bytes=sum(n.get("tx_bytes", 0) for n in networks),
+        blk_read_bytes=sum(e.get("value", 0) for e in io if e.get("op", "").lower() == "read"),
+        blk_write_bytes=sum(e.get("value", 0) for e in io if e.get("op", "").lower() == "write"),
+    )
+
+
+class ContainerMonitor:
+    """
+    Live CPU/memory/network/block-I/O monitor for the containers of many hosts.
+
+    Each running container gets one streaming stats subscription over the
+    host's Docker API tunnel (see :mod:`docker_api`), so after start-up no
+    process is spawned per sample. Samples go into a fixed-size ring buffer per
+    container; rolling averages and peaks are computed from it, and rolling
+    averages above ``thresholds`` for ``alert_window`` seconds raise alerts.
+    """
+
+    def __init__(self, inventory: list[tuple[str, str]], capacity: int = DEFAULT_CAPACITY,
+                 sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 discovery_interval: float = DEFAULT_DISCOVERY_INTERVAL,
+                 thresholds: dict[str, float] | None = None,
+                 alert_window: float = DEFAULT_ALERT_WINDOW):
+        self.inventory = list(inventory)
+        self.capacity = capacity
+        self.sample_interval = sample_interval
+        self.discovery_interval = discovery_interval
+        self.thresholds = dict(DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+        self.alert_window = alert_window
+        self.errors: dict[str, str] = {}
+        self.alerts: collections.deque[Alert] = collections.deque(maxlen=200)
+        self._firing: dict[tuple[str, str, str], Alert] = {}
+        self._buffers: dict[tuple[str, str], RingBuffer] = {}
+        self._streams: dict[tuple[str, str], threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._discover_loop, args=(user, host),
+                             name=f"container-monitor-{host}", daemon=True)
+            for user, host in self.inventory
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1)
+
+    # ------------------------------------------------------------------ #
+    # Collection
+    # ------------------------------------------------------------------ #
+    def _discover_loop(self, user: str, host: str) -> None:
+        client = get_client(user, host)
+        while not self._stop.is_set():
+            try:
+                for container in client.containers(all=False):
+                    name = (container.get("Names") or [container["Id"][:12]])[0].lstrip("/")
+                    key = (host, name)
+                    thread = self._streams.get(key)
+                    if thread is None or not thread.is_alive():
+                        thread = threading.Thread(target=self._stream_container,
+                                                  args=(client, host, name, container["Id"]),
+                                                  name=f"stats-{host}-{name}", daemon=True)
+                        self._streams[key] = thread
+                        thread.start()
+                self.errors.pop(host, None)
+            except (DockerAPIError, ConnectionError) as e:
+                self.errors[host] = str(e)
+            self._stop.wait(self.discovery_interval)
+
+    def _stream_container(self, client: DockerAPIClient, host: str, name: str, container_id: str) -> None:
+        last_stored = 0.0
+        stream = client.stream(f"/containers/{container_id}/stats", {"stream": True}, timeout=STREAM_TIMEOUT)
+        try:
+            for stats in stream:
+                if self._stop.is_set():
+                    return
+                now = time.time()
+                if now - last_stored < self.sample_interval:
+                    continue
+                last_stored = now
+                self.record(host, name, parse_stats(stats, now))
+        except (DockerAPIError, OSError, ValueError):
+            # Container stopped or the tunnel dropped; discovery restarts the stream if needed.
+            pass
+        finally:
+            stream.close()
+
+    def record(self, host: str, container: str, sample: ContainerSample) -> None:
+        """Store a sample and re-evaluate the container's alerts."""
+        with self._lock:
+            buffer = self._buffers.setdefault((host, container), RingBuffer(self.capacity))
+            buffer.append(sample)
+        for field, threshold in self.thresholds.items():
+            average = self.rolling(host, container, field, self.alert_window)["avg"]
+            key = (host, container, field)
+            with self._lock:
+                firing = self._firing.get(key)
+                if average > threshold and firing is None:
+                    self._firing[key] = Alert(host, container, field, average, threshold, sample.ts)
+                    self.alerts.append(self._firing[key])
+                elif average <= threshold and firing is not None:
+                    del self._firing[key]
+                    self.alerts.append(Alert(host, container, field, average, threshold, sample.ts, resolved=True))
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+    def containers(self) -> list[tuple[str, str]]:
+        """``(host, container)`` pairs that have samples."""
+        with self._lock:
+            return list(self._buffers)
+
+    def samples(self, host: str, container: str, since: float | None = None) -> list[ContainerSample]:
+        with self._lock:
+            buffer = self._buffers.get((host, container))
+            items = buffer.items() if buffer else []
+        return [s for s in items if since is None or s.ts >= since]
+
+    def rolling(self, host: str, container: str, field: str, window: float) -> dict:
+        """Average, peak and latest value of ``field`` over the last ``window`` seconds."""
+        samples = self.samples(host, container, since=time.time() - window)
+        values = [getattr(s, field) for s in samples]
+        if not values:
+            return {"avg": 0.0, "peak": 0.0, "last": 0.0, "count": 0}
+        return {"avg": sum(values) / len(values), "peak": max(values), "last": values[-1], "count": len(values)}
+
+    def summary(self, window: float = 300) -> list[dict]:
+        """One row per container: rolling average and peak of CPU and memory."""
+        with self._lock:
+            firing = {key[:2] for key in self._firing}
+        rows = []
+        for host, container in self.containers():
+            cpu = self.rolling(host, container, "cpu_percent", window)
+            mem = self.rolling(host, container, "mem_bytes", window)
+            rows.append({
+                "host": host,
+                "container": container,
+                "cpu_avg_%": round(cpu["avg"], 1),
+                "cpu_peak_%": round(cpu["peak"], 1),
+                "mem_avg_mb": round(mem["avg"] / 1e6, 1),
+                "mem_peak_mb": round(mem["peak"] / 1e6, 1),
+                "samples": cpu["count"],
+                "alert": (host, container) in firing,
+            })
+        return rows
+
+    def series_frame(self, field: str, since: float | None = None, buckets: int = 120):
+        """Downsampled ``field`` per container as a pandas DataFrame (one column per ``host/container``)."""
+        import pandas as pd
+        frames = []
+        for host, container in self.containers():
+            points = downsample(self.samples(host, container, since), field, buckets)
+            if points:
+                frames.append(pd.Series([v for _, v in points],
+                                        index=pd.to_datetime([ts for ts, _ in points], unit="s"),
+                                        name=f"{host}/{container}"))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).sort_index().interpolate(method="time", limit_area="inside")
+
+
+# The monitor outlives Streamlit reruns; the dashboard starts/stops it here.
+_monitor: ContainerMonitor | None = None
+
+
+def get_monitor() -> ContainerMonitor | None:
+    return _monitor
+
+
+def start_monitor(inventory: list[tuple[str, str]], **kwargs) -> ContainerMonitor:
+    """Replace the running monitor (if any) with a new one and start it."""
+    global _monitor
+    stop_monitor()
+    _monitor = ContainerMonitor(inventory, **kwargs)
+    _monitor.start()
+    return _monitor
+
+
+def stop_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        _monitor.stop()
+        _monitor = None
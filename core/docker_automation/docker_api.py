@@ -0,0 +1,458 @@
+import hashlib
+import http.client
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator
+from urllib.parse import quote, urlencode
+
+from core.linux_tools.ssh_pool import MULTIPLEXING_SUPPORTED, POOL, SSH_OPTIONS, SSHPool
+
+DEFAULT_REMOTE_SOCKET = "/var/run/docker.sock"
+DEFAULT_API_TIMEOUT = 30
+DEFAULT_STOP_TIMEOUT = 10
+DEFAULT_MAX_CONNECTIONS = 8  # concurrent requests (kept-alive connections) per host
+TUNNEL_START_TIMEOUT = 10
+
+# Errors that mean the tunnel (not the request) is gone: re-open it and retry.
+_TUNNEL_ERRORS = (ConnectionRefusedError, FileNotFoundError, ConnectionResetError,
+                  BrokenPipeError, http.client.RemoteDisconnected)
+
+
+class DockerAPIError(Exception):
+    """Non-2xx answer from the Docker Engine API."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker API error {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection to a local unix socket (the forwarded docker.sock)."""
+
+    def __init__(self, socket_path: str, timeout: float | None = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class DockerTunnel:
+    """
+    Local endpoint for the remote Docker socket of ``user@host``.
+
+    With multiplexing, the remote socket is forwarded to a local unix socket
+    through the pooled master (``ssh -O forward -L``), so no extra SSH session
+    is needed. Where multiplexing is unavailable (Windows) a dedicated
+    ``ssh -N -L`` process forwards it to a localhost TCP port instead.
+    """
+
+    def __init__(self, user: str, host: str, remote_socket: str = DEFAULT_REMOTE_SOCKET,
+                 pool: SSHPool = POOL):
+        self.user = user
+        self.host = host
+        self.remote_socket = remote_socket
+        self.pool = pool
+        digest = hashlib.sha1(f"{user}@{host}:{remote_socket}".encode()).hexdigest()[:16]
+        self.local_socket = os.path.join(pool.control_dir, f"docker-{digest}.sock")
+        self.port: int | None = None
+        self._process: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def in_use(self):
+        """Hold the pooled master while a request or stream runs through the forward."""
+        self.pool.hold(self.user, self.host)
+        try:
+            yield
+        finally:
+            self.pool.release(self.user, self.host)
+
+    def new_connection(self, timeout: float | None) -> http.client.HTTPConnection:
+        if self.port is not None:
+            return http.client.HTTPConnection("127.0.0.1", self.port, timeout=timeout)
+        return _UnixHTTPConnection(self.local_socket, timeout=timeout)
+
+    def open(self, reopen: bool = False) -> None:
+        """
+        Raises:
+            ConnectionError: If the forward could not be established.
+        """
+        with self._lock:
+            if not reopen and self._is_open():
+                return
+            if MULTIPLEXING_SUPPORTED:
+                self._forward_via_master()
+            else:
+                self._forward_via_process()
+
+    def _is_open(self) -> bool:
+        if self._process is not None:
+            return self._process.poll() is None
+        return os.path.exists(self.local_socket) and self.pool.is_fresh(self.user, self.host)
+
+    def _forward_via_master(self) -> None:
+        self.pool.connect(self.user, self.host)
+        if os.path.exists(self.local_socket):
+            # Stale forward from a master that has since gone away.
+            subprocess.run(self.pool.forward_argv(self.user, self.host, self.local_socket,
+                                                  self.remote_socket, cancel=True),
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if os.path.exists(self.local_socket):
+                os.remove(self.local_socket)
+        proc = subprocess.run(
+            self.pool.forward_argv(self.user, self.host, self.local_socket, self.remote_socket),
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        if proc.returncode != 0:
+            raise ConnectionError(proc.stderr.strip() or f"could not forward {self.remote_socket}")
+
+    def _forward_via_process(self) -> None:
+        self._stop_process()
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        self._process = subprocess.Popen(
+            ["ssh", *SSH_OPTIONS, "-o", "ExitOnForwardFailure=yes", "-N",
+             "-L", f"127.0.0.1:{port}:{self.remote_socket}", f"{self.user}@{self.host}"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        deadline = time.monotonic() + TUNNEL_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                message = self._process.stderr.read().decode(errors="replace").strip()
+                self._process = None
+                raise ConnectionError(message or "ssh tunnel exited")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                self.port = port
+                return
+            except OSError:
+                time.sleep(0.1)
+        self._stop_process()
+        raise ConnectionError(f"timed out forwarding {self.remote_socket}")
+
+    def _stop_process(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process = None
+            self.port = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop_process()
+            if MULTIPLEXING_SUPPORTED and os.path.exists(self.local_socket):
+                subprocess.run(self.pool.forward_argv(self.user, self.host, self.local_socket,
+                                                      self.remote_socket, cancel=True),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                if os.path.exists(self.local_socket):
+                    os.remove(self.local_socket)
+
+
+class DockerAPIClient:
+    """
+    Docker Engine HTTP API client for a remote host, tunnelled over SSH.
+
+    Requests reuse keep-alive HTTP connections through the forwarded socket,
+    so after the first call each request costs a single round trip: no
+    ``ssh`` or ``docker`` process is spawned and answers arrive as JSON
+    instead of CLI text. Up to ``max_connections`` requests run concurrently,
+    each on its own kept-alive connection. A dropped tunnel (e.g. the master
+    was evicted as idle) is re-opened transparently.
+
+    Use :func:`get_client` to share one client per host across reruns.
+    """
+
+    def __init__(self, user: str, host: str, timeout: float = DEFAULT_API_TIMEOUT,
+                 remote_socket: str = DEFAULT_REMOTE_SOCKET,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS):
+        self.user = user
+        self.host = host
+        self.timeout = timeout
+        self.tunnel = DockerTunnel(user, host, remote_socket)
+        self._idle: list[http.client.HTTPConnection] = []
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Transport
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _url(path: str, params: dict | None) -> str:
+        query = {k: (json.dumps(v) if isinstance(v, dict) else str(v).lower() if isinstance(v, bool) else v)
+                 for k, v in (params or {}).items() if v is not None}
+        return f"{path}?{urlencode(query)}" if query else path
+
+    @staticmethod
+    def _decode(response: http.client.HTTPResponse, body: bytes, raw: bool = False) -> Any:
+        if response.status >= 400:
+            try:
+                message = json.loads(body).get("message", "")
+            except ValueError:
+                message = body.decode(errors="replace")
+            raise DockerAPIError(response.status, message or response.reason)
+        if raw:
+            return body
+        if not body:
+            return None
+        if response.getheader("Content-Type", "").startswith("application/json"):
+            return json.loads(body)
+        return body.decode(errors="replace")
+
+    def _exchange(self, conn: http.client.HTTPConnection, method: str, url: str,
+                  payload: bytes | None, headers: dict, timeout: float, raw: bool) -> Any:
+        try:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            conn.request(method, url, body=payload, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                self._idle.append(conn)
+        return self._decode(response, body, raw)
+
+    def request(self, method: str, path: str, params: dict | None = None, body: Any = None,
+                timeout: float | None = None, raw: bool = False) -> Any:
+        """
+        Send one API request over a kept-alive connection.
+
+        Args:
+            method (str): HTTP method
+            path (str): API path, e.g. ``/containers/json``
+            params (dict, optional): Query parameters; dicts (filters) are JSON-encoded
+            body (optional): JSON-serializable request body
+            timeout (float, optional): Socket timeout for this request; defaults to ``self.timeout``
+            raw (bool): Return the body as bytes instead of decoding it
+
+        Returns:
+            Parsed JSON, text, bytes (``raw``), or None for empty answers
+
+        Raises:
+            DockerAPIError: If the engine answers with an error status.
+            ConnectionError: If the tunnel cannot be (re-)established.
+        """
+        url = self._url(path, params)
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        timeout = self.timeout if timeout is None else timeout
+
+        def send(conn):
+            return self._exchange(conn, method, url, payload, headers, timeout, raw)
+
+        with self._slots, self.tunnel.in_use():
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            try:
+                if conn is not None:
+                    try:
+                        return send(conn)
+                    except _TUNNEL_ERRORS:
+                        pass  # the engine closed this idle connection; use a fresh one
+                self.tunnel.open()
+                try:
+                    return send(self.tunnel.new_connection(timeout))
+                except _TUNNEL_ERRORS:
+                    # The forward itself went away (e.g. the master was evicted): re-open it
+                    # and retry once. Engine errors (DockerAPIError) are never retried.
+                    self.tunnel.open(reopen=True)
+                    return send(self.tunnel.new_connection(timeout))
+            except OSError as e:
+                raise ConnectionError(f"Docker API on {self.host} unreachable: {e}") from e
+
+    def _open_stream(self, method: str, path: str, params: dict | None,
+                     body: bytes | Iterable[bytes] | None, headers: dict | None,
+                     timeout: float | None) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        self.tunnel.open()
+        conn = self.tunnel.new_connection(timeout)
+        try:
+            # Iterables (e.g. an image tarball read from another host) are sent chunked as they arrive.
+            conn.request(method, self._url(path, params), body=body, headers=headers or {},
+                         encode_chunked=body is not None and not isinstance(body, bytes))
+            response = conn.getresponse()
+            if response.status >= 400:
+                self._decode(response, response.read())
+        except BaseException:
+            conn.close()
+            raise
+        return conn, response
+
+    def stream(self, path: str, params: dict | None = None, timeout: float | None = None,
+               method: str = "GET", body: bytes | Iterable[bytes] | None = None,
+               headers: dict | None = None) -> Iterator[dict]:
+        """
+        Yield the JSON objects of a streaming endpoint (``/events``, stats with
+        ``stream=true``, image pull/push/load progress).
+
+        Streams use their own connection so regular requests are not blocked;
+        closing the generator closes it. The SSH master stays held while the
+        stream is open, so it is not evicted as idle between sparse events.
+
+        Raises:
+            DockerAPIError: If the engine answers with an error status.
+        """
+        with self.tunnel.in_use():
+            conn, response = self._open_stream(method, path, params, body, headers, timeout)
+            try:
+                while True:
+                    line = response.readline()
+                    if not line:
+                        return
+                    if line.strip():
+                        yield json.loads(line)
+            finally:
+                conn.close()
+
+    def download(self, path: str, params: dict | None = None, timeout: float | None = None,
+                 chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """
+        Yield a binary response body (e.g. ``/images/{name}/get``) in chunks, on its own connection.
+
+        Raises:
+            DockerAPIError: If the engine answers with an error status.
+        """
+        with self.tunnel.in_use():
+            conn, response = self._open_stream("GET", path, params, None, None, timeout)
+            try:
+                while chunk := response.read(chunk_size):
+                    yield chunk
+            finally:
+                conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        self.tunnel.close()
+
+    # ------------------------------------------------------------------ #
+    # Endpoints
+    # ------------------------------------------------------------------ #
+    def ping(self) -> bool:
+        return self.request("GET", "/_ping") == "OK"
+
+    def version(self) -> dict:
+        return self.request("GET", "/version")
+
+    def info(self) -> dict:
+        """System-wide information (``NCPU``, ``MemTotal``, ``ContainersRunning``, ...)."""
+        return self.request("GET", "/info")
+
+    def containers(self, all: bool = True, filters: dict | None = None) -> list[dict]:
+        """Containers as returned by ``GET /containers/json`` (``filters`` e.g. ``{"label": ["app=web"]}``)."""
+        return self.request("GET", "/containers/json", {"all": all, "filters": filters})
+
+    def inspect_container(self, container: str) -> dict:
+        return self.request("GET", f"/containers/{quote(container, safe='')}/json")
+
+    def stats(self, container: str, one_shot: bool = True) -> dict:
+        """
+        One stats sample (CPU, memory, network, block I/O) without streaming.
+
+        With ``one_shot`` the engine answers at once but leaves ``precpu_stats``
+        empty; without it, it waits for a second sample (about a second) so CPU
+        usage can be computed.
+        """
+        return self.request("GET", f"/containers/{quote(container, safe='')}/stats",
+                            {"stream": False, "one-shot": one_shot})
+
+    def start(self, container: str) -> None:
+        self.request("POST", f"/containers/{quote(container, safe='')}/start")
+
+    def stop(self, container: str, timeout: int = DEFAULT_STOP_TIMEOUT) -> None:
+        """Stop gracefully, killing the container after ``timeout`` seconds."""
+        self.request("POST", f"/containers/{quote(container, safe='')}/stop", {"t": timeout},
+                     timeout=self.timeout + timeout)
+
+    def restart(self, container: str, timeout: int = DEFAULT_STOP_TIMEOUT) -> None:
+        self.request("POST", f"/containers/{quote(container, safe='')}/restart", {"t": timeout},
+                     timeout=self.timeout + timeout)
+
+    def remove(self, container: str, force: bool = False) -> None:
+        self.request("DELETE", f"/containers/{quote(container, safe='')}", {"force": force})
+
+    def images(self, all: bool = False) -> list[dict]:
+        return self.request("GET", "/images/json", {"all": all})
+
+    def inspect_image(self, image: str) -> dict:
+        return self.request("GET", f"/images/{quote(image, safe='')}/json")
+
+    def image_history(self, image: str) -> list[dict]:
+        return self.request("GET", f"/images/{quote(image, safe='')}/history")
+
+    def distribution(self, image: str) -> dict:
+        """Registry manifest descriptor of ``image`` (``Descriptor.digest``), as resolved by the engine."""
+        return self.request("GET", f"/distribution/{quote(image, safe='/:@')}/json")
+
+    def tag_image(self, image: str, repo: str, tag: str) -> None:
+        self.request("POST", f"/images/{quote(image, safe='')}/tag", {"repo": repo, "tag": tag})
+
+
+def container_rows(containers: list[dict]) -> list[dict]:
+    """Flatten ``/containers/json`` entries for display."""
+    return [
+        {
+            "id": c["Id"][:12],
+            "name": (c.get("Names") or ["?"])[0].lstrip("/"),
+            "image": c.get("Image", ""),
+            "state": c.get("State", ""),
+            "status": c.get("Status", ""),
+            "created": time.strftime("%Y-%m-%d %H:%M", time.localtime(c.get("Created", 0))),
+        }
+        for c in containers
+    ]
+
+
+def image_rows(images: list[dict]) -> list[dict]:
+    """Flatten ``/images/json`` entries for display."""
+    return [
+        {
+            "id": image["Id"].split(":")[-1][:12],
+            "tags": ", ".join(image.get("RepoTags") or ["<none>"]),
+            "size_mb": round(image.get("Size", 0) / 1e6, 1),
+            "created": time.strftime("%Y-%m-%d %H:%M", time.localtime(image.get("Created", 0))),
+        }
+        for image in images
+    ]
+
+
+_CLIENTS: dict[tuple[str, str], DockerAPIClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(user: str, host: str) -> DockerAPIClient:
+    """Shared client for ``user@host`` (kept at module level so it survives Streamlit reruns)."""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get((user, host))
+        if client is None:
+            client = _CLIENTS[(user, host)] = DockerAPIClient(user, host)
+        return client
+
+
+def close_all() -> None:
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        client.close()
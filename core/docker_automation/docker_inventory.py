@@ -0,0 +1,165 @@
+import threading
+import time
+
+from core.docker_automation.docker_api import DockerAPIClient, DockerAPIError, get_client
+
+CONTAINER_EVENTS = ["create", "start", "restart", "stop", "die", "kill", "pause", "unpause",
+                    "rename", "update", "destroy"]
+IMAGE_EVENTS = ["pull", "tag", "untag", "delete", "import", "load"]
+
+EVENTS_TIMEOUT = 60     # seconds of silence before the events connection is re-opened
+RETRY_DELAY = 5         # seconds to wait after the daemon becomes unreachable
+
+
+class HostInventory:
+    """
+    In-memory containers and images of one Docker host, kept current by events.
+
+    The host is listed once; afterwards a background thread follows
+    ``GET /events`` and only re-reads what an event touched (one container, or
+    the image list), so reads are served from memory and the daemon is not
+    polled. The subscription starts at the seed time, so nothing that happens
+    while seeding is missed. If the stream breaks, the inventory re-seeds.
+    """
+
+    def __init__(self, client: DockerAPIClient):
+        self.client = client
+        self.host = client.host
+        self.error: str | None = None
+        self.events_seen = 0
+        self.updated_at = 0.0
+        self._containers: dict[str, dict] = {}
+        self._images: list[dict] = []
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"docker-events-{self.host}", daemon=True)
+
+    def start(self) -> None:
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until the first seed finished (or failed); True if data is available."""
+        self._ready.wait(timeout)
+        return self.updated_at > 0
+
+    # ------------------------------------------------------------------ #
+    # Reads
+    # ------------------------------------------------------------------ #
+    def containers(self, all: bool = True) -> list[dict]:
+        with self._lock:
+            containers = list(self._containers.values())
+        if not all:
+            containers = [c for c in containers if c.get("State") == "running"]
+        return sorted(containers, key=lambda c: c.get("Created", 0), reverse=True)
+
+    def images(self) -> list[dict]:
+        with self._lock:
+            return list(self._images)
+
+    # ------------------------------------------------------------------ #
+    # Updates
+    # ------------------------------------------------------------------ #
+    def _seed(self) -> None:
+        containers = self.client.containers(all=True)
+        images = self.client.images()
+        with self._lock:
+            self._containers = {c["Id"]: c for c in containers}
+            self._images = images
+            self.updated_at = time.time()
+
+    def _refresh_container(self, container_id: str) -> None:
+        found = self.client.containers(all=True, filters={"id": [container_id]})
+        with self._lock:
+            if found:
+                self._containers[container_id] = found[0]
+            else:
+                self._containers.pop(container_id, None)
+            self.updated_at = time.time()
+
+    def _refresh_images(self) -> None:
+        images = self.client.images()
+        with self._lock:
+            self._images = images
+            self.updated_at = time.time()
+
+    def apply(self, event: dict) -> None:
+        """Update the inventory for one ``/events`` message."""
+        kind = event.get("Type")
+        action = event.get("Action", event.get("status", ""))
+        actor_id = (event.get("Actor") or {}).get("ID") or event.get("id", "")
+        self.events_seen += 1
+        if kind == "container" and actor_id:
+            if action == "destroy":
+                with self._lock:
+                    self._containers.pop(actor_id, None)
+                    self.updated_at = time.time()
+            else:
+                self._refresh_container(actor_id)
+        elif kind == "image":
+            self._refresh_images()
+
+    def _run(self) -> None:
+        since = None
+        while not self._stop.is_set():
+            try:
+                if since is None:
+                    since = int(time.time())
+                    self._seed()
+                    self.error = None
+                    self._ready.set()
+                events = self.client.stream("/events", {
+                    "since": since,
+                    "filters": {"type": ["container", "image"], "event": CONTAINER_EVENTS + IMAGE_EVENTS},
+                }, timeout=EVENTS_TIMEOUT)
+                try:
+                    for event in events:
+                        if self._stop.is_set():
+                            return
+                        since = max(since, int(event.get("time", since)))
+                        self.apply(event)
+                finally:
+                    events.close()
+            except TimeoutError:
+                # Quiet host: re-subscribe from the last event, no re-seed needed.
+                continue
+            except (DockerAPIError, OSError, ValueError) as e:
+                self.error = str(e)
+                since = None   # we may have missed events: seed again
+                self._ready.set()
+                self._stop.wait(RETRY_DELAY)
+
+
+_INVENTORIES: dict[tuple[str, str], HostInventory] = {}
+_INVENTORIES_LOCK = threading.Lock()
+
+
+def get_inventory(user: str, host: str) -> HostInventory:
+    """Shared, already started inventory for ``user@host`` (survives Streamlit reruns)."""
+    with _INVENTORIES_LOCK:
+        inventory = _INVENTORIES.get((user, host))
+        if inventory is None:
+            inventory = _INVENTORIES[(user, host)] = HostInventory(get_client(user, host))
+            inventory.start()
+        return inventory
+
+
+def stop_all() -> None:
+    with _INVENTORIES_LOCK:
+        inventories = list(_INVENTORIES.values())
+        _INVENTORIES.clear()
+    for inventory in inventories:
+        inventory.stop()
+
+
+def stop_unused(in_use) -> None:
+    """Stop and forget every inventory whose ``(user, host)`` is not in ``in_use``."""
+    in_use = set(in_use)
+    with _INVENTORIES_LOCK:
+        unused = [_INVENTORIES.pop(target) for target in list(_INVENTORIES) if target not in in_use]
+    for inventory in unused:
+        inventory.stop()
@@ -1,8 +1,12 @@
-import os
+import threading
+
+from core.linux_tools.async_runner import EXECUTOR, AsyncSSHExecutor
+from core.linux_tools.ssh_pool import POOL, CommandResult, RemoteStream
 
 DOCKER_COMMAND_INPUTS = {
     "Launch New Container": ["name", "image"],
     "Launch New Container with interactive shell": ["name", "image"],
+    "Launch New Container with Limits": ["name", "image", "cpus", "memory"],
     "Start Container": ["name"],
     "Stop Container": ["name"],
     "Remove Container": ["name"],
@@ -24,6 +28,8 @@ DOCKER_COMMAND_INPUTS = {
 DOCKER_COMMANDS = {
     "Launch New Container": lambda args: f"docker run -d --name {args['name']} {args['image']}",
     "Launch New Container with interactive shell": lambda args: f"docker run -dit --name {args['name']} {args['image']}",
+    "Launch New Container with Limits": lambda args: (f"docker run -d --name {args['name']} --cpus {args['cpus']} "
+                                                      f"--memory {args['memory']} {args['image']}"),
     "Start Container": lambda args: f"docker start {args['name']}",
     "Stop Container": lambda args: f"docker stop {args['name']}",
     "Remove Container": lambda args: f"docker rm {args['name']}",
@@ -41,33 +47,93 @@ DOCKER_COMMANDS = {
     "Prune Resources": lambda args: "docker system prune -f"
 }
 
-def run_docker_command(label: str, args: dict, user: str, ip: str) -> str:
+# Commands that change the host; only these are deduplicated by the idempotency guard.
+DOCKER_MUTATING_COMMANDS = {
+    "Launch New Container", "Launch New Container with interactive shell", "Launch New Container with Limits",
+    "Start Container", "Stop Container", "Remove Container", "Pull Image", "Push Image", "Tag Image",
+    "Remove Image", "Prune Resources",
+}
+
+# Commands that keep running and are worth following live when streamed.
+DOCKER_FOLLOW_COMMANDS = {
+    "View Logs": lambda args: f"docker logs -f --tail 200 {args['name']}",
+}
+
+
+def execute_docker_command(label: str, args: dict, user: str, ip: str,
+                           timeout: float | None = None) -> CommandResult | None:
+    """
+    Run a DOCKER_COMMANDS entry on ``user@ip`` over the shared SSH connection pool (which journals it).
+
+    Returns:
+        CommandResult: Output plus timings, or None for an unknown label
+
+    Raises:
+        KeyError: If a required argument is missing from ``args``.
+        ConnectionError: If the host could not be reached.
+    """
+    if label not in DOCKER_COMMANDS:
+        return None
+    docker_cmd = DOCKER_COMMANDS[label](args)
+    return POOL.run(user, ip, docker_cmd, timeout=timeout, label=label, kind="docker", args=args)
+
+
+def stream_docker_command(label: str, args: dict, user: str, ip: str, follow: bool = False,
+                          cancel_event: threading.Event | None = None) -> RemoteStream | None:
+    """
+    Start a DOCKER_COMMANDS entry and stream its output line by line.
+
+    Args:
+        follow (bool): Use the DOCKER_FOLLOW_COMMANDS variant (e.g. ``docker logs -f``)
+            when one exists, so the stream keeps going until cancelled.
+
+    Returns:
+        RemoteStream: The running command, or None for an unknown label
+
+    Raises:
+        KeyError: If a required argument is missing from ``args``.
+        ConnectionError: If the host could not be reached.
+    """
+    if label not in DOCKER_COMMANDS:
+        return None
+    build = DOCKER_FOLLOW_COMMANDS.get(label) if follow else None
+    docker_cmd = (build or DOCKER_COMMANDS[label])(args)
+    return POOL.stream(user, ip, docker_cmd, cancel_event=cancel_event, label=label, kind="docker", args=args)
+
+
+async def run_docker_command_async(label: str, args: dict, user: str, ip: str,
+                                   executor: AsyncSSHExecutor = EXECUTOR,
+                                   timeout: float | None = None) -> str:
+    """Async counterpart of :func:`run_docker_command`, driven by the asyncio executor."""
     if label not in DOCKER_COMMANDS:
         return "❌ Invalid Docker command"
-        
     try:
-        # Generate the Docker command
         docker_cmd = DOCKER_COMMANDS[label](args)
-        
-        # SSH options to handle host key verification automatically
-        ssh_options = "-o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null -o LogLevel=ERROR"
-        
-        # Escape any double quotes in the Docker command
-        escaped_docker_cmd = docker_cmd.replace('"', '\\"')
-        
-        # Build the full SSH command
-        full_cmd = f'ssh {ssh_options} {user}@{ip} "{escaped_docker_cmd}"'
-        
-        # Execute the command with error handling
-        with os.popen(full_cmd) as process:
-            output = process.read()
-            
-        # Check if the command failed
-        if process.close() is not None:  # None means success, otherwise it's the exit status
-            return f"❌ Docker command failed with status {process.close()}\n{output}"
-            
-        return output if output else "✅ Docker command executed successfully (no output)"
-        
+        return format_docker_result(await executor.run(user, ip, docker_cmd, timeout=timeout,
+                                                       label=label, kind="docker", args=args))
+    except KeyError as ke:
+        return f"❌ Missing required argument: {ke}"
+    except Exception as e:
+        return f"❌ Error executing Docker command: {str(e)}"
+
+
+def format_docker_result(result: CommandResult) -> str:
+    """Render a CommandResult the way the dashboard displays Docker output."""
+    output = result.stdout + result.stderr
+    if result.timed_out:
+        return f"❌ Docker command timed out after {result.exec_time:.1f}s\n{output}"
+    if result.exit_status != 0:
+        return f"❌ Docker command failed with status {result.exit_status}\n{output}"
+    return output if output else "✅ Docker command executed successfully (no output)"
+
+
+def run_docker_command(label: str, args: dict, user: str, ip: str) -> str:
+    try:
+        result = execute_docker_command(label, args, user, ip)
+        if result is None:
+            return "❌ Invalid Docker command"
+        return format_docker_result(result)
+
     except KeyError as ke:
         return f"❌ Missing required argument: {ke}"
     except Exception as e:
@@ -0,0 +1,220 @@
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from core.docker_automation.docker_api import DEFAULT_MAX_CONNECTIONS, DockerAPIClient, DockerAPIError
+
+BIG_LAYER_BYTES = 50 * 1024 * 1024
+LAYER_KINDS = ("RUN", "COPY", "ADD", "WORKDIR")   # instructions that always add a layer
+
+# (check, advice) pairs applied to every layer; checks get the layer's instruction and size.
+LAYER_HINTS = [
+    (lambda cmd, size: "apt-get install" in cmd and "/var/lib/apt/lists" not in cmd,
+     "apt package lists stay in the layer: add `&& rm -rf /var/lib/apt/lists/*` to the same RUN"),
+    (lambda cmd, size: re.search(r"\bpip3? install\b", cmd) is not None and "--no-cache-dir" not in cmd,
+     "pip keeps its download cache: use `pip install --no-cache-dir`"),
+    (lambda cmd, size: "apk add" in cmd and "--no-cache" not in cmd,
+     "apk index is cached in the layer: use `apk add --no-cache`"),
+    (lambda cmd, size: re.match(r"(COPY|ADD) (--\S+ )*\. ", cmd) is not None and size >= BIG_LAYER_BYTES,
+     "large build context copied: add a .dockerignore or copy only what is needed"),
+    (lambda cmd, size: re.match(r"ADD file:\S+ in /$", cmd) is not None and size >= 4 * BIG_LAYER_BYTES,
+     "large base image: consider a -slim or distroless variant"),
+]
+
+_SHELL_PREFIX = re.compile(r"^(RUN )?\|?\d* ?(\S+=\S+ )*/bin/(ba)?sh -c ")
+
+
+def instruction(created_by: str) -> str:
+    """
+    Dockerfile instruction recorded in an image history entry.
+
+    ``/bin/sh -c #(nop)  COPY dir:ab in /app`` gives ``COPY dir:ab in /app`` and
+    ``/bin/sh -c apt-get update`` gives ``RUN apt-get update``; BuildKit's
+    ``# buildkit`` suffix is dropped.
+    """
+    text = created_by.strip().removesuffix("# buildkit").strip()
+    match = _SHELL_PREFIX.match(text)
+    if match:
+        text = text[match.end():].strip()
+        return text.removeprefix("#(nop)").strip() if text.startswith("#(nop)") else f"RUN {text}"
+    return text
+
+
+def chain_ids(diff_ids: list[str]) -> list[str]:
+    """
+    Layer chain IDs (how the engine stores layers) for an image's ``RootFS.Layers``.
+
+    A diff ID only identifies a layer's content; two images share a stored
+    layer when the whole stack below it matches too, which the chain ID encodes.
+    """
+    chains = []
+    for diff_id in diff_ids:
+        chains.append(diff_id if not chains else
+                      "sha256:" + hashlib.sha256(f"{chains[-1]} {diff_id}".encode()).hexdigest())
+    return chains
+
+
+@dataclass
+class LayerInfo:
+    chain_id: str
+    size: int
+    created_by: str
+    images: list[str] = field(default_factory=list)
+
+    @property
+    def instruction(self) -> str:
+        return instruction(self.created_by)
+
+    @property
+    def hints(self) -> list[str]:
+        return [advice for check, advice in LAYER_HINTS if check(self.instruction, self.size)]
+
+    def as_row(self) -> dict:
+        return {
+            "layer": self.chain_id.split(":")[-1][:12],
+            "size_mb": round(self.size / 1e6, 1),
+            "instruction": self.instruction[:160],
+            "used_by": len(self.images),
+            "images": ", ".join(self.images[:5]) + (" ..." if len(self.images) > 5 else ""),
+        }
+
+
+@dataclass
+class ImageReport:
+    id: str
+    name: str
+    layers: list[LayerInfo] = field(default_factory=list)   # base layer first
+
+    @property
+    def size(self) -> int:
+        return sum(layer.size for layer in self.layers)
+
+    @property
+    def unique_size(self) -> int:
+        """Bytes that deleting this image would free (layers no other image uses)."""
+        return sum(layer.size for layer in self.layers if len(layer.images) == 1)
+
+    def as_row(self) -> dict:
+        biggest = max(self.layers, key=lambda layer: layer.size, default=None)
+        return {
+            "image": self.name,
+            "id": self.id.split(":")[-1][:12],
+            "size_mb": round(self.size / 1e6, 1),
+            "unique_mb": round(self.unique_size / 1e6, 1),
+            "shared_mb": round((self.size - self.unique_size) / 1e6, 1),
+            "layers": len(self.layers),
+            "biggest_layer_mb": round(biggest.size / 1e6, 1) if biggest else 0.0,
+            "biggest_instruction": biggest.instruction[:100] if biggest else "",
+        }
+
+
+@dataclass
+class HostImageReport:
+    host: str
+    images: list[ImageReport]
+    layers: dict[str, LayerInfo]    # chain ID -> layer, each stored layer once
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def apparent_size(self) -> int:
+        """Sum of image sizes, as if no layer were shared."""
+        return sum(image.size for image in self.images)
+
+    @property
+    def stored_size(self) -> int:
+        """Bytes the layers take once, i.e. what the images really use on disk."""
+        return sum(layer.size for layer in self.layers.values())
+
+    @property
+    def shared_savings(self) -> int:
+        return self.apparent_size - self.stored_size
+
+    def biggest_layers(self, n: int = 20) -> list[LayerInfo]:
+        return sorted(self.layers.values(), key=lambda layer: layer.size, reverse=True)[:n]
+
+    def biggest_images(self, n: int = 20) -> list[ImageReport]:
+        return sorted(self.images, key=lambda image: image.size, reverse=True)[:n]
+
+    def instruction_totals(self) -> list[dict]:
+        """Stored bytes per instruction type (RUN, COPY, ADD, ...), largest first."""
+        totals: dict[str, list[int]] = {}
+        for layer in self.layers.values():
+            kind = layer.instruction.split(" ", 1)[0].upper() or "?"
+            entry = totals.setdefault(kind, [0, 0])
+            entry[0] += layer.size
+            entry[1] += 1
+        return [{"instruction": kind, "size_mb": round(size / 1e6, 1), "layers": count}
+                for kind, (size, count) in sorted(totals.items(), key=lambda item: item[1][0], reverse=True)]
+
+    def hints(self) -> list[dict]:
+        """Advice for the layers that match a LAYER_HINTS rule, biggest first."""
+        return [
+            {"layer": layer.chain_id.split(":")[-1][:12], "size_mb": round(layer.size / 1e6, 1),
+             "images": ", ".join(layer.images[:3]), "hint": hint}
+            for layer in self.biggest_layers(len(self.layers)) for hint in layer.hints
+        ]
+
+
+def _image_name(image: dict) -> str:
+    tags = [tag for tag in image.get("RepoTags") or [] if tag != "<none>:<none>"]
+    return tags[0] if tags else image["Id"].split(":")[-1][:12]
+
+
+def _layer_steps(history: list[dict], layer_count: int) -> list[dict]:
+    """History steps (oldest first) that created the ``layer_count`` layers of an image."""
+    # Filesystem instructions create a layer even when it is empty; metadata ones never do.
+    steps = [step for step in history
+             if step.get("Size", 0) > 0 or instruction(step.get("CreatedBy", "")).split(" ", 1)[0] in LAYER_KINDS]
+    if len(steps) != layer_count:
+        steps = [step for step in history if step.get("Size", 0) > 0]
+        steps = [{"Size": 0, "CreatedBy": ""}] * max(0, layer_count - len(steps)) + steps
+    return steps[len(steps) - layer_count:]
+
+
+def analyze_host(client: DockerAPIClient, images: list[dict] | None = None,
+                 max_concurrency: int = DEFAULT_MAX_CONNECTIONS) -> HostImageReport:
+    """
+    Attribute the size of every image on a host to its layers and instructions.
+
+    For each image, ``/images/{id}/json`` gives the layer stack (``RootFS.Layers``)
+    and ``/images/{id}/history`` the instruction and size of each step;
+    metadata steps (ENV, CMD, ...) created no layer, the others map onto the
+    stack in order. Layers are keyed by chain ID, so one stored under several
+    images is counted once and listed with every image that uses it.
+
+    Args:
+        client (DockerAPIClient): Client of the host
+        images (list, optional): ``/images/json`` entries to analyze (default: all images)
+        max_concurrency (int): Images fetched in parallel
+
+    Raises:
+        DockerAPIError: If the image list cannot be read.
+        ConnectionError: If the host cannot be reached.
+    """
+    images = client.images() if images is None else images
+    errors: dict[str, str] = {}
+
+    def fetch(image: dict) -> tuple[dict, dict, list[dict]] | None:
+        try:
+            return image, client.inspect_image(image["Id"]), client.image_history(image["Id"])
+        except DockerAPIError as e:
+            errors[_image_name(image)] = str(e)    # removed while we were reading
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        fetched = [item for item in executor.map(fetch, images) if item is not None]
+
+    layers: dict[str, LayerInfo] = {}
+    reports = []
+    for image, details, history in fetched:
+        name = _image_name(image)
+        chains = chain_ids((details.get("RootFS") or {}).get("Layers") or [])
+        steps = _layer_steps(list(reversed(history)), len(chains))
+        report = ImageReport(image["Id"], name)
+        for chain_id, step in zip(chains, steps):
+            layer = layers.setdefault(chain_id, LayerInfo(chain_id, step.get("Size", 0), step.get("CreatedBy", "")))
+            layer.images.append(name)
+            report.layers.append(layer)
+        reports.append(report)
+    return HostImageReport(client.host, reports, layers, errors)
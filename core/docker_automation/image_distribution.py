@@ -0,0 +1,365 @@
+import base64
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+from urllib.parse import quote
+
+from core.docker_automation.docker_api import DEFAULT_MAX_CONNECTIONS, DockerAPIClient, DockerAPIError, get_client
+
+DISTRIBUTION_MODES = ("registry", "peer")
+TRANSFER_TIMEOUT = 600      # seconds a pull/push/load stream may stay silent
+FANOUT_BUFFER = 32          # chunks (1 MiB each) buffered per receiving host in peer mode
+UPDATE_INTERVAL = 0.25      # minimum seconds between progress updates of one host
+
+# Per-layer statuses after which the layer needs no more work.
+LAYER_DONE = ("Pull complete", "Already exists", "Pushed", "Layer already exists", "Mounted from")
+
+
+def parse_reference(image: str) -> tuple[str, str, str]:
+    """
+    Split an image reference into ``(repository, tag, digest)``.
+
+    ``registry:5000/app:1.2@sha256:ab..`` gives ``("registry:5000/app", "1.2", "sha256:ab..")``;
+    the tag defaults to ``latest`` unless a digest is given.
+    """
+    name, _, digest = image.strip().partition("@")
+    slash, colon = name.rfind("/"), name.rfind(":")
+    if colon > slash:
+        return name[:colon], name[colon + 1:], digest
+    return name, "" if digest else "latest", digest
+
+
+def registry_auth(auth: dict | None = None) -> str:
+    """``X-Registry-Auth`` header value (``{"username": .., "password": .., "serveraddress": ..}``)."""
+    return base64.urlsafe_b64encode(json.dumps(auth or {}).encode()).decode()
+
+
+@dataclass
+class LayerProgress:
+    id: str
+    status: str = ""
+    current: int = 0
+    total: int = 0
+
+    @property
+    def fraction(self) -> float:
+        if self.status.startswith(LAYER_DONE):
+            return 1.0
+        ratio = min(1.0, self.current / self.total) if self.total else 0.0
+        # A pulled layer is downloaded, then extracted: count each phase as half.
+        if self.status == "Downloading":
+            return ratio / 2
+        if self.status in ("Verifying Checksum", "Download complete"):
+            return 0.5
+        if self.status == "Extracting":
+            return 0.5 + ratio / 2
+        return ratio
+
+
+@dataclass
+class HostTransfer:
+    user: str
+    host: str
+    state: str = "pending"      # pending, skipped, pulling, pushing, sending, done, failed
+    layers: dict[str, LayerProgress] = field(default_factory=dict)
+    bytes_sent: int = 0         # peer mode: bytes of the image tarball received from the seed
+    bytes_total: int = 0
+    started: float = 0.0
+    finished: float = 0.0
+    note: str = ""
+    error: str = ""
+
+    @property
+    def progress(self) -> float:
+        if self.state in ("done", "skipped"):
+            return 1.0
+        if self.layers:
+            return sum(layer.fraction for layer in self.layers.values()) / len(self.layers)
+        return min(1.0, self.bytes_sent / self.bytes_total) if self.bytes_total else 0.0
+
+    @property
+    def duration(self) -> float:
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def apply(self, message: dict) -> None:
+        """
+        Fold one pull/push/load progress message into the per-layer state.
+
+        Raises:
+            DockerAPIError: If the message reports an error (e.g. manifest unknown).
+        """
+        if message.get("error"):
+            raise DockerAPIError(500, message["error"])
+        if message.get("stream"):
+            self.note = message["stream"].strip()   # e.g. "Loaded image: app:1.2"
+            return
+        layer_id = message.get("id")
+        status = message.get("status", "")
+        if not layer_id or not status or status.startswith("Pulling from"):
+            if status:
+                self.note = status                  # e.g. "Status: Downloaded newer image for app:1.2"
+            return
+        layer = self.layers.setdefault(layer_id, LayerProgress(layer_id))
+        layer.status = status
+        detail = message.get("progressDetail") or {}
+        if detail.get("total"):
+            layer.current, layer.total = detail.get("current", 0), detail["total"]
+
+    def as_row(self) -> dict:
+        return {
+            "host": f"{self.user}@{self.host}",
+            "state": self.state,
+            "progress_%": round(self.progress * 100),
+            "layers_done": sum(1 for layer in self.layers.values() if layer.fraction >= 1.0),
+            "layers": len(self.layers),
+            "received_mb": round(self.bytes_sent / 1e6, 1),
+            "duration_s": round(self.duration, 1),
+            "note": self.error or self.note,
+        }
+
+
+class ImageDistribution:
+    """
+    Roll one image out to many Docker hosts in parallel.
+
+    The target digest is resolved once (``/distribution``, or taken from an
+    ``@sha256:`` reference) and hosts that already hold exactly that image are
+    skipped. In ``registry`` mode every remaining host pulls by digest at the
+    same time (at most ``max_concurrency`` at once) and re-applies the tag, so
+    a tag moved mid-rollout cannot leave hosts on different images. In
+    ``peer`` mode the registry is contacted at most once: a seed host (one that
+    already has the image, else the first host, which pulls it) streams
+    ``docker save`` output through this process into ``docker load`` on up to
+    ``max_concurrency`` hosts at a time, reading the seed once per batch.
+
+    :meth:`run` yields a :class:`HostTransfer` whenever one changes.
+    """
+
+    def __init__(self, inventory: list[tuple[str, str]], image: str, mode: str = "registry",
+                 max_concurrency: int = DEFAULT_MAX_CONNECTIONS, auth: dict | None = None):
+        if mode not in DISTRIBUTION_MODES:
+            raise ValueError(f"Mode must be one of {', '.join(DISTRIBUTION_MODES)}")
+        self.image = image.strip()
+        self.repo, self.tag, self.digest = parse_reference(self.image)
+        self.mode = mode
+        self.max_concurrency = max(1, max_concurrency)
+        self.auth = auth
+        self.image_id = ""          # local image ID of the target, once a host is known to have it
+        self.transfers = {(user, host): HostTransfer(user, host) for user, host in inventory}
+        self._updates: queue.Queue[HostTransfer | None] = queue.Queue()
+        self._last_update: dict[tuple[str, str], float] = {}
+
+    @property
+    def reference(self) -> str:
+        """Name the image is saved and checked under once distributed."""
+        if self.tag:
+            return f"{self.repo}:{self.tag}"
+        return f"{self.repo}@{self.digest}"
+
+    # ------------------------------------------------------------------ #
+    # Progress plumbing
+    # ------------------------------------------------------------------ #
+    def _notify(self, transfer: HostTransfer, force: bool = False) -> None:
+        key = (transfer.user, transfer.host)
+        now = time.monotonic()
+        if force or now - self._last_update.get(key, 0.0) >= UPDATE_INTERVAL:
+            self._last_update[key] = now
+            self._updates.put(transfer)
+
+    def _set_state(self, transfer: HostTransfer, state: str, error: str = "") -> None:
+        transfer.state, transfer.error = state, error
+        if state in ("pulling", "sending", "pushing") and not transfer.started:
+            transfer.started = time.time()
+        if state in ("done", "failed", "skipped"):
+            transfer.finished = time.time() if transfer.started else 0.0
+        self._notify(transfer, force=True)
+
+    def run(self) -> Iterator[HostTransfer]:
+        """Run the rollout in the background and yield host transfers as they progress."""
+        worker = threading.Thread(target=self._run, name=f"distribute-{self.repo}", daemon=True)
+        worker.start()
+        while True:
+            transfer = self._updates.get()
+            if transfer is None:
+                return
+            yield transfer
+
+    def _run(self) -> None:
+        try:
+            self._resolve()
+            pending = [t for t in self.transfers.values() if t.state == "pending"]
+            if self.mode == "registry":
+                self._parallel(self._pull, pending)
+            else:
+                self._distribute_from_peer(pending)
+        except Exception as e:  # noqa: BLE001 - reported on every unfinished host
+            for transfer in self.transfers.values():
+                if transfer.state not in ("done", "failed", "skipped"):
+                    self._set_state(transfer, "failed", str(e))
+        finally:
+            self._updates.put(None)
+
+    def _parallel(self, action, transfers: list[HostTransfer]) -> None:
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            list(executor.map(action, transfers))
+
+    # ------------------------------------------------------------------ #
+    # Phases
+    # ------------------------------------------------------------------ #
+    def _resolve(self) -> None:
+        """Pin the target digest and mark hosts that already have the exact image as skipped."""
+        if not self.digest:
+            for user, host in self.transfers:
+                try:
+                    self.digest = get_client(user, host).distribution(self.image)["Descriptor"]["digest"]
+                    break
+                except (DockerAPIError, ConnectionError, KeyError):
+                    continue
+        local = {}
+
+        def inspect(transfer: HostTransfer) -> None:
+            try:
+                local[(transfer.user, transfer.host)] = get_client(transfer.user, transfer.host).inspect_image(
+                    self.reference)
+            except DockerAPIError:
+                pass                # image not present
+            except ConnectionError as e:
+                self._set_state(transfer, "failed", str(e))
+
+        self._parallel(inspect, list(self.transfers.values()))
+        for image in local.values():
+            if self.digest and any(d.endswith("@" + self.digest) for d in image.get("RepoDigests") or []):
+                self.image_id = image["Id"]
+                break
+        else:
+            if not self.digest and self.mode == "peer" and local:
+                # No registry to ask: the copy on the first host that has the image is the target.
+                self.image_id = next(iter(local.values()))["Id"]
+        for key, transfer in self.transfers.items():
+            image = local.get(key)
+            # Peer-loaded images carry no repo digest, so the image ID is compared instead.
+            if image and self.image_id and image["Id"] == self.image_id:
+                transfer.note = f"{self.digest or self.image_id[:19]} already present"
+                self._set_state(transfer, "skipped")
+
+    def _pull(self, transfer: HostTransfer) -> None:
+        client = get_client(transfer.user, transfer.host)
+        self._set_state(transfer, "pulling")
+        try:
+            # Pull by digest when known so every host ends up on the same image.
+            params = {"fromImage": self.repo, "tag": self.digest or self.tag}
+            for message in client.stream("/images/create", params, timeout=TRANSFER_TIMEOUT, method="POST",
+                                         headers={"X-Registry-Auth": registry_auth(self.auth)}):
+                transfer.apply(message)
+                self._notify(transfer)
+            if self.digest and self.tag:
+                client.tag_image(f"{self.repo}@{self.digest}", self.repo, self.tag)
+            self._set_state(transfer, "done")
+        except (DockerAPIError, OSError, ValueError) as e:
+            self._set_state(transfer, "failed", str(e))
+
+    def _distribute_from_peer(self, pending: list[HostTransfer]) -> None:
+        seeds = [t for t in self.transfers.values() if t.state == "skipped"]
+        if seeds:
+            seed = seeds[0]
+        elif pending:
+            seed = pending.pop(0)
+            self._pull(seed)
+            if seed.state != "done":
+                for transfer in pending:
+                    self._set_state(transfer, "failed", f"seed {seed.host} could not pull the image")
+                return
+        else:
+            return
+        seed_client = get_client(seed.user, seed.host)
+        size = seed_client.inspect_image(self.reference).get("Size", 0)
+        for start in range(0, len(pending), self.max_concurrency):
+            self._fan_out(seed_client, pending[start:start + self.max_concurrency], size)
+
+    def _fan_out(self, seed_client: DockerAPIClient, targets: list[HostTransfer], size: int) -> None:
+        """Read the seed's ``docker save`` stream once and feed it to ``docker load`` on every target."""
+        feeds = {id(t): queue.Queue(maxsize=FANOUT_BUFFER) for t in targets}
+        failed = {id(t): threading.Event() for t in targets}
+        aborted = object()
+
+        def chunks(transfer: HostTransfer) -> Iterable[bytes]:
+            feed = feeds[id(transfer)]
+            while (chunk := feed.get()) is not None:
+                if chunk is aborted:
+                    raise OSError(f"reading the image from {seed_client.host} failed")
+                transfer.bytes_sent += len(chunk)
+                self._notify(transfer)
+                yield chunk
+
+        def load(transfer: HostTransfer) -> None:
+            transfer.bytes_total = size
+            self._set_state(transfer, "sending")
+            try:
+                client = get_client(transfer.user, transfer.host)
+                for message in client.stream("/images/load", {"quiet": False}, timeout=TRANSFER_TIMEOUT,
+                                             method="POST", body=chunks(transfer),
+                                             headers={"Content-Type": "application/x-tar"}):
+                    transfer.apply(message)
+                    self._notify(transfer)
+                self._set_state(transfer, "done")
+            except (DockerAPIError, OSError, ValueError) as e:
+                failed[id(transfer)].set()
+                self._set_state(transfer, "failed", str(e))
+
+        def put(transfer: HostTransfer, chunk) -> None:
+            # A slow host throttles the read (bounded buffers); a failed one is dropped.
+            while not failed[id(transfer)].is_set():
+                try:
+                    feeds[id(transfer)].put(chunk, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        loaders = [threading.Thread(target=load, args=(t,), daemon=True) for t in targets]
+        for thread in loaders:
+            thread.start()
+        end = None
+        try:
+            for chunk in seed_client.download(f"/images/{quote(self.reference, safe='')}/get",
+                                              timeout=TRANSFER_TIMEOUT):
+                for transfer in targets:
+                    put(transfer, chunk)
+                if all(event.is_set() for event in failed.values()):
+                    break
+        except (DockerAPIError, OSError):
+            end = aborted
+        for transfer in targets:
+            put(transfer, end)
+        for thread in loaders:
+            thread.join()
+
+
+def push_image(user: str, host: str, image: str, auth: dict | None = None) -> Iterator[HostTransfer]:
+    """
+    Push ``image`` from ``user@host`` to its registry, yielding per-layer progress.
+
+    The returned transfer ends in state ``done`` or ``failed`` (with ``error`` set).
+    """
+    repo, tag, _ = parse_reference(image)
+    transfer = HostTransfer(user, host, "pushing", started=time.time())
+    yield transfer
+    last = 0.0
+    try:
+        for message in get_client(user, host).stream(f"/images/{quote(repo, safe='')}/push", {"tag": tag},
+                                                      timeout=TRANSFER_TIMEOUT, method="POST",
+                                                      headers={"X-Registry-Auth": registry_auth(auth)}):
+            transfer.apply(message)
+            if time.monotonic() - last >= UPDATE_INTERVAL:
+                last = time.monotonic()
+                yield transfer
+        transfer.state = "done"
+    except (DockerAPIError, OSError, ValueError) as e:
+        transfer.state, transfer.error = "failed", str(e)
+    transfer.finished = time.time()
+    yield transfer
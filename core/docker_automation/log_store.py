@@ -0,0 +1,336 @@
+import collections
+import gzip
+import json
+import os
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
+
+from core.docker_automation.docker_api import DockerAPIClient
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_LOG_ROOT = os.path.join(PROJECT_ROOT, "data", "container_logs")
+CHUNK_LINES = 5000      # lines per gzip chunk before a new one is started
+STREAMS = {1: "o", 2: "e"}  # multiplexed stream id -> stored tag (stdout / stderr)
+
+_UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+@dataclass
+class LogLine:
+    ts_ns: int      # engine timestamp, nanoseconds since the epoch
+    stream: str     # "o" (stdout) or "e" (stderr)
+    text: str
+
+    @property
+    def ts(self) -> float:
+        return self.ts_ns / 1e9
+
+    def as_row(self) -> dict:
+        return {
+            "time": f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.ts))}.{self.ts_ns % 10**9 // 10**6:03d}",
+            "stream": "stderr" if self.stream == "e" else "stdout",
+            "line": self.text,
+        }
+
+
+@dataclass
+class SyncResult:
+    container: str
+    new_lines: int
+    bytes_transferred: int
+    duration: float
+    first_sync: bool
+
+
+def parse_timestamp(value: str) -> int:
+    """
+    RFC 3339 timestamp as written by ``docker logs --timestamps`` to epoch nanoseconds.
+
+    ``2024-05-01T10:00:00.123456789Z`` keeps its full nanosecond precision,
+    which ``datetime`` alone would round to microseconds.
+
+    Raises:
+        ValueError: If the value is not a timestamp.
+    """
+    value = value.strip()
+    if value.endswith("Z"):
+        value, offset = value[:-1], "+00:00"
+    else:
+        value, offset = value[:-6], value[-6:]
+    seconds, _, fraction = value.partition(".")
+    if fraction and not fraction.isdigit():
+        raise ValueError(f"Invalid timestamp: '{value}'")
+    return int(datetime.fromisoformat(seconds + offset).timestamp()) * 10**9 + int(fraction.ljust(9, "0")[:9])
+
+
+def format_since(ts_ns: int) -> str:
+    """Epoch nanoseconds as the ``seconds.nanoseconds`` form accepted by ``since``/``until``."""
+    return f"{ts_ns // 10**9}.{ts_ns % 10**9:09d}"
+
+
+def demultiplex(data: bytes) -> Iterator[tuple[str, bytes]]:
+    """
+    Split a ``/containers/{id}/logs`` body into ``(stream, payload)`` frames.
+
+    Containers without a TTY get a multiplexed body: every frame starts with an
+    8-byte header (stream id, three zero bytes, big-endian payload length).
+    TTY containers return the raw output, which is reported as stdout.
+    """
+    if len(data) < 8 or data[0] not in (0, 1, 2) or data[1:4] != b"\0\0\0":
+        if data:
+            yield "o", data
+        return
+    offset = 0
+    while offset + 8 <= len(data):
+        stream_id, size = struct.unpack_from(">BxxxL", data, offset)
+        offset += 8
+        yield STREAMS.get(stream_id, "o"), data[offset:offset + size]
+        offset += size
+
+
+def parse_log_lines(data: bytes) -> list[LogLine]:
+    """Parse a timestamped ``/logs`` body into lines, oldest first."""
+    pending = {"o": b"", "e": b""}
+    for stream, payload in demultiplex(data):
+        pending[stream] += payload
+    lines = []
+    for stream, buffered in pending.items():
+        for raw in buffered.split(b"\n"):
+            if not raw:
+                continue
+            stamp, _, text = raw.decode(errors="replace").partition(" ")
+            try:
+                lines.append(LogLine(parse_timestamp(stamp), stream, text.rstrip("\r")))
+            except ValueError:
+                continue
+    lines.sort(key=lambda line: line.ts_ns)
+    return lines
+
+
+class ContainerLogStore:
+    """
+    Local, compressed copy of one container's logs.
+
+    Lines are appended to gzip chunks of up to ``CHUNK_LINES`` lines (each
+    append adds a gzip member, so nothing is rewritten) and ``index.json``
+    records the time range of every chunk plus the newest stored timestamp.
+    That timestamp is the offset of the next :func:`sync_logs`, and the chunk
+    ranges let time-bounded reads and searches skip whole chunks.
+
+    Use :func:`get_store` to share one store per container across reruns.
+    """
+
+    def __init__(self, host: str, container: str, root: str = DEFAULT_LOG_ROOT):
+        self.host = host
+        self.container = container
+        self.path = os.path.join(root, _UNSAFE_PATH_CHARS.sub("_", host), _UNSAFE_PATH_CHARS.sub("_", container))
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    # ------------------------------------------------------------------ #
+    # Index
+    # ------------------------------------------------------------------ #
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.path, "index.json")
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"container_id": "", "last_ns": 0, "chunks": []}
+
+    def _save_index(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
+
+    @property
+    def last_ns(self) -> int:
+        """Timestamp of the newest stored line (0 if nothing was fetched yet)."""
+        return self._index["last_ns"]
+
+    @property
+    def container_id(self) -> str:
+        return self._index["container_id"]
+
+    def stats(self) -> dict:
+        with self._lock:
+            chunks = list(self._index["chunks"])
+        size = sum(os.path.getsize(os.path.join(self.path, c["file"]))
+                   for c in chunks if os.path.exists(os.path.join(self.path, c["file"])))
+        return {
+            "lines": sum(c["lines"] for c in chunks),
+            "chunks": len(chunks),
+            "stored_bytes": size,
+            "first": chunks[0]["first_ns"] / 1e9 if chunks else None,
+            "last": self.last_ns / 1e9 if chunks else None,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Writes
+    # ------------------------------------------------------------------ #
+    def append(self, lines: list[LogLine], container_id: str = "") -> int:
+        """
+        Store lines newer than :attr:`last_ns`; returns how many were added.
+
+        Lines at or before the stored offset are dropped, so overlapping
+        fetches (``since`` is inclusive) never duplicate output.
+        """
+        with self._lock:
+            new = [line for line in lines if line.ts_ns > self._index["last_ns"]]
+            if container_id:
+                self._index["container_id"] = container_id
+            if not new:
+                return 0
+            os.makedirs(self.path, exist_ok=True)
+            chunks = self._index["chunks"]
+            remaining = new
+            while remaining:
+                if not chunks or chunks[-1]["lines"] >= CHUNK_LINES:
+                    chunks.append({"file": f"chunk-{len(chunks) + 1:05d}.log.gz",
+                                   "first_ns": remaining[0].ts_ns, "last_ns": 0, "lines": 0})
+                chunk = chunks[-1]
+                batch, remaining = remaining[:CHUNK_LINES - chunk["lines"]], remaining[CHUNK_LINES - chunk["lines"]:]
+                with gzip.open(os.path.join(self.path, chunk["file"]), "ab") as f:
+                    f.write("".join(f"{line.ts_ns} {line.stream} {line.text}\n" for line in batch).encode())
+                chunk["last_ns"] = batch[-1].ts_ns
+                chunk["lines"] += len(batch)
+            self._index["last_ns"] = new[-1].ts_ns
+            self._save_index()
+            return len(new)
+
+    def clear(self) -> None:
+        """Delete the local copy; the next sync fetches the container's logs again."""
+        with self._lock:
+            for chunk in self._index["chunks"]:
+                try:
+                    os.remove(os.path.join(self.path, chunk["file"]))
+                except FileNotFoundError:
+                    pass
+            self._index = {"container_id": "", "last_ns": 0, "chunks": []}
+            self._save_index()
+
+    # ------------------------------------------------------------------ #
+    # Reads
+    # ------------------------------------------------------------------ #
+    def _read_chunk(self, chunk: dict) -> Iterator[LogLine]:
+        try:
+            with gzip.open(os.path.join(self.path, chunk["file"]), "rt", encoding="utf-8", errors="replace") as f:
+                for row in f:
+                    ts, stream, text = row.rstrip("\n").split(" ", 2)
+                    yield LogLine(int(ts), stream, text)
+        except (FileNotFoundError, EOFError):
+            return
+
+    def lines(self, since: float | None = None, until: float | None = None) -> Iterator[LogLine]:
+        """Stored lines between ``since`` and ``until`` (epoch seconds, inclusive), oldest first."""
+        since_ns = round(since * 1e9) if since is not None else None
+        until_ns = round(until * 1e9) if until is not None else None
+        with self._lock:
+            chunks = list(self._index["chunks"])
+        for chunk in chunks:
+            if (since_ns is not None and chunk["last_ns"] < since_ns) or \
+                    (until_ns is not None and chunk["first_ns"] > until_ns):
+                continue
+            for line in self._read_chunk(chunk):
+                if since_ns is not None and line.ts_ns < since_ns:
+                    continue
+                if until_ns is not None and line.ts_ns > until_ns:
+                    return
+                yield line
+
+    def search(self, pattern: str, regex: bool = False, ignore_case: bool = True,
+               since: float | None = None, until: float | None = None, limit: int = 500) -> list[LogLine]:
+        """
+        Substring or regex search over the local copy; no request reaches the host.
+
+        Returns:
+            list[LogLine]: The newest ``limit`` matches, oldest first
+
+        Raises:
+            re.error: For an invalid regular expression.
+        """
+        if regex:
+            match = re.compile(pattern, re.IGNORECASE if ignore_case else 0).search
+        elif ignore_case:
+            needle = pattern.lower()
+            match = lambda text: needle in text.lower()  # noqa: E731
+        else:
+            match = lambda text: pattern in text  # noqa: E731
+        found = collections.deque(maxlen=limit)
+        for line in self.lines(since, until):
+            if match(line.text):
+                found.append(line)
+        return list(found)
+
+    def tail(self, n: int = 200) -> list[LogLine]:
+        """The newest ``n`` stored lines, oldest first (reads only the last chunks)."""
+        with self._lock:
+            chunks = list(self._index["chunks"])
+        needed, selected = n, []
+        for chunk in reversed(chunks):
+            if needed <= 0:
+                break
+            selected.insert(0, chunk)
+            needed -= chunk["lines"]
+        found = collections.deque(maxlen=n)
+        for chunk in selected:
+            found.extend(self._read_chunk(chunk))
+        return list(found)
+
+
+def sync_logs(client: DockerAPIClient, container: str, store: ContainerLogStore,
+              until: float | None = None, initial_tail: int | None = None) -> SyncResult:
+    """
+    Fetch only the lines written since the store's newest line and append them.
+
+    The first sync downloads the whole log (or its last ``initial_tail``
+    lines); later syncs pass the stored offset as ``since``, so revisiting a
+    noisy container transfers just the new output.
+
+    Args:
+        client (DockerAPIClient): Client of the container's host
+        container (str): Container name or ID
+        store (ContainerLogStore): Local store of that container
+        until (float, optional): Only fetch lines up to this epoch time
+        initial_tail (int, optional): Lines to fetch when the store is empty (default: all)
+
+    Raises:
+        DockerAPIError: If the engine answers with an error status (e.g. no such container).
+        ConnectionError: If the host cannot be reached.
+    """
+    start = time.perf_counter()
+    container_id = client.inspect_container(container)["Id"]
+    first_sync = store.last_ns == 0
+    params = {"stdout": True, "stderr": True, "timestamps": True}
+    if first_sync:
+        params["tail"] = initial_tail if initial_tail is not None else "all"
+    else:
+        params["since"] = format_since(store.last_ns)
+    if until is not None:
+        params["until"] = format_since(round(until * 1e9))
+    body = client.request("GET", f"/containers/{container_id}/logs", params, raw=True) or b""
+    added = store.append(parse_log_lines(body), container_id)
+    return SyncResult(container, added, len(body), time.perf_counter() - start, first_sync)
+
+
+_STORES: dict[tuple[str, str], ContainerLogStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(host: str, container: str) -> ContainerLogStore:
+    """Shared store for ``container`` on ``host`` (survives Streamlit reruns)."""
+    with _STORES_LOCK:
+        store = _STORES.get((host, container))
+        if store is None:
+            store = _STORES[(host, container)] = ContainerLogStore(host, container)
+        return store
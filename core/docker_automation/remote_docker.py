@@ -0,0 +1,220 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from core.docker_automation import container_monitor
+from core.docker_automation.container_monitor import ContainerSample
+from core.docker_automation.docker_api import (
+    DEFAULT_MAX_CONNECTIONS, DockerAPIClient, DockerAPIError, container_rows, get_client,
+)
+from core.docker_automation.docker_inventory import HostInventory, get_inventory
+from core.docker_automation.docker_runner import execute_docker_command
+from core.linux_tools.cache import TTLCache
+from core.linux_tools.ssh_pool import CommandResult
+
+LOAD_TTL = 15           # seconds a measured host load is reused for scheduling
+LOAD_WINDOW = 60        # seconds of monitor samples averaged into a host load
+
+# Host loads are shared by every fleet view and survive Streamlit reruns.
+LOAD_CACHE = TTLCache(LOAD_TTL, 256)
+
+
+@dataclass
+class HostLoad:
+    user: str
+    host: str
+    cpus: int = 0
+    mem_total: int = 0
+    cpu_percent: float = 0.0    # sum over running containers, 100 per fully used core
+    mem_bytes: int = 0
+    running: int = 0
+    source: str = ""            # "monitor" (rolling averages) or "stats" (one sample per container)
+    error: str = ""
+
+    @property
+    def cpu_share(self) -> float:
+        return self.cpu_percent / (self.cpus * 100) if self.cpus else 0.0
+
+    @property
+    def mem_share(self) -> float:
+        return self.mem_bytes / self.mem_total if self.mem_total else 0.0
+
+    @property
+    def measured(self) -> bool:
+        """False when the engine reported neither CPU count nor memory, so ``score`` means nothing."""
+        return bool(self.cpus or self.mem_total)
+
+    @property
+    def score(self) -> float:
+        """Share of the host's scarcest resource in use; lower is less loaded."""
+        return max(self.cpu_share, self.mem_share)
+
+    def as_row(self) -> dict:
+        return {
+            "host": f"{self.user}@{self.host}",
+            "cpus": self.cpus,
+            "cpu_used_%": round(self.cpu_share * 100, 1),
+            "mem_used_%": round(self.mem_share * 100, 1),
+            "running": self.running,
+            "score": round(self.score, 3),
+            "source": self.source,
+            "error": self.error,
+        }
+
+
+def _matches(query: str, *fields) -> bool:
+    query = query.lower()
+    return any(query in str(field).lower() for field in fields)
+
+
+def _sample(client: DockerAPIClient, container_id: str) -> ContainerSample | None:
+    try:
+        # Without one-shot the engine waits for a second sample, which CPU usage needs.
+        return container_monitor.parse_stats(client.stats(container_id, one_shot=False))
+    except DockerAPIError:
+        return None     # exited while we were measuring
+
+
+class DockerFleet:
+    """
+    One view over the Docker daemons of many hosts.
+
+    Every host keeps a single persistent channel: the shared API client
+    (pooled keep-alive connections through one SSH-forwarded socket) and its
+    event-driven :class:`HostInventory`. Listing and searching containers or
+    images across the fleet is therefore served from memory. New containers
+    are scheduled onto the host whose scarcest resource (CPU or memory) is
+    least used, judged from the live container monitor when it covers the host
+    and from one stats sample per running container otherwise.
+    """
+
+    def __init__(self, inventory: list[tuple[str, str]]):
+        self.inventory = list(inventory)
+
+    def inventories(self) -> dict[tuple[str, str], HostInventory]:
+        return {(user, host): get_inventory(user, host) for user, host in self.inventory}
+
+    def wait_ready(self, timeout: float | None = None) -> None:
+        """Wait (at most ``timeout`` seconds overall) for every host's first listing."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for inventory in self.inventories().values():
+            inventory.wait_ready(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def errors(self) -> dict[str, str]:
+        return {f"{user}@{host}": inv.error for (user, host), inv in self.inventories().items() if inv.error}
+
+    # ------------------------------------------------------------------ #
+    # Aggregated view
+    # ------------------------------------------------------------------ #
+    def containers(self, query: str = "", all: bool = True) -> list[dict]:
+        """
+        Containers of every host, flattened for display with a ``host`` column.
+
+        ``query`` is matched case-insensitively against host, name, image,
+        state, ID and ``key=value`` labels.
+        """
+        rows = []
+        for (user, host), inventory in self.inventories().items():
+            containers = inventory.containers(all=all)
+            for container, row in zip(containers, container_rows(containers)):
+                labels = [f"{k}={v}" for k, v in (container.get("Labels") or {}).items()]
+                if query and not _matches(query, host, row["name"], row["image"], row["state"],
+                                          container["Id"], *labels):
+                    continue
+                rows.append({"host": f"{user}@{host}", **row})
+        return rows
+
+    def images(self, query: str = "") -> list[dict]:
+        """
+        Images of every host, one row per image ID with the hosts that have it.
+
+        ``query`` is matched case-insensitively against tags, ID and host.
+        """
+        merged: dict[str, dict] = {}
+        for (user, host), inventory in self.inventories().items():
+            for image in inventory.images():
+                row = merged.setdefault(image["Id"], {
+                    "id": image["Id"].split(":")[-1][:12],
+                    "tags": ", ".join(image.get("RepoTags") or ["<none>"]),
+                    "size_mb": round(image.get("Size", 0) / 1e6, 1),
+                    "hosts": [],
+                })
+                row["hosts"].append(f"{user}@{host}")
+        rows = [row for image_id, row in merged.items()
+                if not query or _matches(query, row["tags"], image_id, *row["hosts"])]
+        for row in rows:
+            row["host_count"] = len(row["hosts"])
+            row["hosts"] = ", ".join(row["hosts"])
+        return sorted(rows, key=lambda row: row["host_count"], reverse=True)
+
+    # ------------------------------------------------------------------ #
+    # Load and scheduling
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _measure(user: str, host: str) -> HostLoad:
+        load = HostLoad(user, host)
+        client = get_client(user, host)
+        try:
+            info = client.info()
+            load.cpus, load.mem_total = info.get("NCPU", 0), info.get("MemTotal", 0)
+            running = client.containers(all=False)
+            load.running = len(running)
+            monitor = container_monitor.get_monitor()
+            if monitor is not None and any(h == host for _, h in monitor.inventory):
+                load.source = "monitor"
+                names = [(c.get("Names") or [c["Id"][:12]])[0].lstrip("/") for c in running]
+                for name in names:
+                    load.cpu_percent += monitor.rolling(host, name, "cpu_percent", LOAD_WINDOW)["avg"]
+                    load.mem_bytes += int(monitor.rolling(host, name, "mem_bytes", LOAD_WINDOW)["avg"])
+            else:
+                load.source = "stats"
+                with ThreadPoolExecutor(max_workers=DEFAULT_MAX_CONNECTIONS) as executor:
+                    for sample in executor.map(lambda c: _sample(client, c["Id"]), running):
+                        if sample is not None:
+                            load.cpu_percent += sample.cpu_percent
+                            load.mem_bytes += sample.mem_bytes
+        except (DockerAPIError, ConnectionError) as e:
+            load.error = str(e)
+        return load
+
+    def loads(self, refresh: bool = False) -> list[HostLoad]:
+        """Current load of every host (measured in parallel, reused for ``LOAD_TTL`` seconds)."""
+        def get(target: tuple[str, str]) -> HostLoad:
+            load, _ = LOAD_CACHE.get_or_set(target, lambda: self._measure(*target), refresh=refresh)
+            return load
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(self.inventory), 32))) as executor:
+            return list(executor.map(get, self.inventory))
+
+    def pick_host(self, refresh: bool = False) -> HostLoad | None:
+        """
+        The reachable host with the lowest load score (ties go to fewer running containers).
+
+        Hosts whose capacity is unknown are only chosen when no measured host is reachable.
+        """
+        candidates = [load for load in self.loads(refresh) if not load.error]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda load: (not load.measured, load.score, load.running))
+
+    def launch(self, args: dict, label: str = "Launch New Container",
+               target: tuple[str, str] | None = None) -> tuple[HostLoad | None, CommandResult | None]:
+        """
+        Run a launch command from ``DOCKER_COMMANDS`` on ``target`` or the least-loaded host.
+
+        The chosen host's cached load is dropped, so the next placement
+        measures it again instead of stacking containers on the same host.
+
+        Returns:
+            tuple: The chosen host's load (None if no host is reachable) and the command result
+
+        Raises:
+            KeyError: If a required argument is missing from ``args``.
+            ConnectionError: If the chosen host could not be reached.
+        """
+        load = HostLoad(*target) if target else self.pick_host()
+        if load is None:
+            return None, None
+        result = execute_docker_command(label, args, load.user, load.host)
+        LOAD_CACHE.invalidate((load.user, load.host))
+        return load, result
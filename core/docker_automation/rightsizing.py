@@ -0,0 +1,125 @@
+import math
+import time
+from dataclasses import dataclass
+
+from core.docker_automation.container_monitor import ContainerMonitor, ContainerSample
+from core.linux_tools.history import percentile
+
+DEFAULT_WINDOW = 900            # seconds of samples a recommendation is based on
+CPU_HEADROOM = 1.25             # --cpus = p95 CPU x headroom (bursts above it are throttled, not fatal)
+MEMORY_HEADROOM = 1.3           # --memory = peak memory x headroom (exceeding it gets the container OOM-killed)
+MIN_CPUS = 0.1
+MIN_MEMORY = 64 * 1024 * 1024
+MIN_SAMPLES = 30                # fewer samples than this and the recommendation is flagged as low confidence
+CPU_STEP = 0.05
+MIB = 1024 * 1024
+
+
+@dataclass
+class UsageProfile:
+    host: str
+    container: str
+    window: float               # seconds requested
+    samples: int
+    span: float                 # seconds actually covered by the samples
+    cpu_p50: float              # percent of one core, like `docker stats`
+    cpu_p95: float
+    cpu_max: float
+    mem_p50: int                # bytes, page cache excluded
+    mem_p95: int
+    mem_max: int
+    mem_limit: int              # current limit (host memory when unlimited)
+
+
+@dataclass
+class Recommendation:
+    usage: UsageProfile
+    cpus: float
+    memory: int                 # bytes
+
+    @property
+    def confident(self) -> bool:
+        return self.usage.samples >= MIN_SAMPLES
+
+    @property
+    def memory_flag(self) -> str:
+        return format_memory(self.memory)
+
+    @property
+    def docker_flags(self) -> str:
+        return f"--cpus {self.cpus:g} --memory {self.memory_flag}"
+
+    def as_row(self) -> dict:
+        u = self.usage
+        return {
+            "host": u.host,
+            "container": u.container,
+            "samples": u.samples,
+            "covered_min": round(u.span / 60, 1),
+            "cpu_p50_%": round(u.cpu_p50, 1),
+            "cpu_p95_%": round(u.cpu_p95, 1),
+            "cpu_max_%": round(u.cpu_max, 1),
+            "mem_p50_mb": round(u.mem_p50 / MIB, 1),
+            "mem_p95_mb": round(u.mem_p95 / MIB, 1),
+            "mem_max_mb": round(u.mem_max / MIB, 1),
+            "current_limit_mb": round(u.mem_limit / MIB),
+            "recommended": self.docker_flags,
+            "confidence": "ok" if self.confident else "low (few samples)",
+        }
+
+
+def format_memory(size: int) -> str:
+    """Bytes as a ``--memory`` value, rounded up to whole MiB (e.g. ``384m``)."""
+    return f"{math.ceil(size / MIB)}m"
+
+
+def usage_profile(host: str, container: str, samples: list[ContainerSample],
+                  window: float = DEFAULT_WINDOW) -> UsageProfile | None:
+    """p50/p95/max CPU and memory of a container's samples, or None without samples."""
+    if not samples:
+        return None
+    cpu = sorted(s.cpu_percent for s in samples)
+    mem = sorted(s.mem_bytes for s in samples)
+    return UsageProfile(
+        host=host,
+        container=container,
+        window=window,
+        samples=len(samples),
+        span=samples[-1].ts - samples[0].ts,
+        cpu_p50=percentile(cpu, 0.50),
+        cpu_p95=percentile(cpu, 0.95),
+        cpu_max=cpu[-1],
+        mem_p50=int(percentile(mem, 0.50)),
+        mem_p95=int(percentile(mem, 0.95)),
+        mem_max=mem[-1],
+        mem_limit=samples[-1].mem_limit,
+    )
+
+
+def recommend(usage: UsageProfile, cpu_headroom: float = CPU_HEADROOM,
+              memory_headroom: float = MEMORY_HEADROOM) -> Recommendation:
+    """
+    ``--cpus`` / ``--memory`` values for one container.
+
+    CPU is sized on the 95th percentile because going over a CPU limit only
+    throttles the container; memory is sized on the peak because going over a
+    memory limit kills it. Both get headroom and a floor, and CPU is rounded
+    up to steps of 0.05.
+    """
+    # Rounded before ceil() so float noise (e.g. 10.000000001 steps) does not add a step.
+    cpus = max(MIN_CPUS, math.ceil(round(usage.cpu_p95 / 100 * cpu_headroom / CPU_STEP, 6)) * CPU_STEP)
+    memory = max(MIN_MEMORY, math.ceil(usage.mem_max * memory_headroom / MIB) * MIB)
+    return Recommendation(usage, round(cpus, 2), memory)
+
+
+def recommend_all(monitor: ContainerMonitor, window: float = DEFAULT_WINDOW,
+                  cpu_headroom: float = CPU_HEADROOM, memory_headroom: float = MEMORY_HEADROOM,
+                  now: float | None = None) -> list[Recommendation]:
+    """Recommendations for every container the monitor has samples for within ``window`` seconds."""
+    since = (now if now is not None else time.time()) - window
+    recommendations = []
+    for host, container in monitor.containers():
+        usage = usage_profile(host, container, monitor.samples(host, container, since=since), window)
+        if usage is not None:
+            recommendations.append(recommend(usage, cpu_headroom, memory_headroom))
+    return sorted(recommendations, key=lambda r: (r.usage.host, r.usage.container))
@@ -0,0 +1,252 @@
+import asyncio
+import queue
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, TypeVar
+
+from core.linux_tools.ssh_pool import MULTIPLEXING_SUPPORTED, POOL, CommandResult, SSHPool
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 256  # remote commands in flight across all hosts
+DEFAULT_PER_HOST_LIMIT = 4     # remote commands in flight per host
+
+# (user, host, command) - the unit of work accepted by run_many/as_completed
+Job = tuple[str, str, str]
+
+
+class AsyncSSHExecutor:
+    """
+    Asyncio engine for running remote commands over the shared SSH pool.
+
+    Every command is an ``ssh`` child process driven by the event loop, so
+    hundreds of commands across many hosts run concurrently on one thread.
+    A global semaphore caps the total number in flight and a per-host
+    semaphore keeps any single box from being flooded; master connections are
+    shared with :data:`ssh_pool.POOL`, so the sync and async paths reuse the
+    same authenticated sessions.
+
+    Cancelling a task (or hitting its timeout) kills the local ssh client,
+    which closes the remote session.
+    """
+
+    def __init__(self, pool: SSHPool = POOL, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 per_host_limit: int = DEFAULT_PER_HOST_LIMIT):
+        self.pool = pool
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._global: asyncio.Semaphore | None = None
+        self._hosts: dict[tuple[str, str], asyncio.Semaphore] = {}
+        self._connecting: dict[tuple[str, str], asyncio.Lock] = {}
+
+    def _bind_loop(self) -> None:
+        # asyncio primitives belong to one loop; start fresh when run_sync()
+        # (or the caller) switched to a different one.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._hosts = {}
+            self._connecting = {}
+
+    def _host_semaphore(self, user: str, host: str) -> asyncio.Semaphore:
+        return self._hosts.setdefault((user, host), asyncio.Semaphore(self.per_host_limit))
+
+    async def connect(self, user: str, host: str) -> tuple[bool, float]:
+        """
+        Async counterpart of :meth:`SSHPool.connect`.
+
+        Returns:
+            tuple: ``(reused, handshake_time)``
+
+        Raises:
+            ConnectionError: If the master connection could not be established.
+        """
+        if not MULTIPLEXING_SUPPORTED:
+            return False, 0.0
+        self._bind_loop()
+        if self.pool.is_fresh(user, host):
+            return True, 0.0
+
+        # The master itself is opened by SSHPool.connect, under the pool's per-host
+        # lock, so the sync and async paths never replace each other's socket. It
+        # runs in a worker thread; the asyncio lock keeps concurrent tasks for the
+        # same host from occupying more than one.
+        lock = self._connecting.setdefault((user, host), asyncio.Lock())
+        async with lock:
+            if self.pool.is_fresh(user, host):
+                return True, 0.0
+            return await asyncio.to_thread(self.pool.connect, user, host)
+
+    async def run(self, user: str, host: str, command: str, timeout: float | None = None,
+                  input: str | None = None, label: str | None = None, kind: str = "shell",
+                  args: dict | None = None, record: bool = True) -> CommandResult:
+        """
+        Run ``command`` on ``user@host``; the async counterpart of :meth:`SSHPool.run`.
+
+        The run is journaled through the pool; ``label``, ``kind``, ``args``
+        and ``record`` are as for :meth:`SSHPool.run`.
+
+        Raises:
+            ConnectionError: If no connection to the host could be established.
+        """
+        self._bind_loop()
+        result = CommandResult(user=user, host=host, command=command)
+        async with self._global, self._host_semaphore(user, host):
+            try:
+                result.reused, result.handshake_time = await self.connect(user, host)
+            except ConnectionError as e:
+                if record:
+                    self.pool.record(user, host, command, None, label, kind, args, input is not None, str(e))
+                raise
+            start = time.perf_counter()
+            self.pool.hold(user, host)      # long installs must not be evicted as idle mid-run
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *self.pool.command_argv(user, host, command),
+                    stdin=asyncio.subprocess.DEVNULL if input is None else asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                )
+                try:
+                    stdout, stderr = await asyncio.wait_for(
+                        proc.communicate(input.encode() if input is not None else None), timeout,
+                    )
+                    result.stdout = stdout.decode(errors="replace")
+                    result.stderr = stderr.decode(errors="replace")
+                    result.exit_status = proc.returncode
+                except asyncio.TimeoutError:
+                    result.timed_out = True
+                    await _kill(proc)
+                except asyncio.CancelledError:
+                    await _kill(proc)
+                    raise
+            finally:
+                result.exec_time = time.perf_counter() - start
+                self.pool.release(user, host)
+        if record:
+            self.pool.record(user, host, command, result, label, kind, args, input is not None)
+        return result
+
+    async def _run_job(self, job: Job, timeout: float | None, **journal) -> CommandResult:
+        user, host, command = job
+        try:
+            return await self.run(user, host, command, timeout=timeout, **journal)
+        except ConnectionError as e:
+            return CommandResult(user=user, host=host, command=command, stderr=str(e), exit_status=255)
+
+    async def run_many(self, jobs: Iterable[Job], timeout: float | None = None,
+                       **journal) -> list[CommandResult]:
+        """
+        Run many jobs concurrently and return their results in job order.
+
+        Connection failures become results with exit status 255 instead of
+        aborting the whole batch. Keyword arguments (``label``, ``kind``,
+        ``args``, ``record``) are passed to :meth:`run` for every job.
+        """
+        return await asyncio.gather(*(self._run_job(job, timeout, **journal) for job in jobs))
+
+    async def as_completed(self, jobs: Iterable[Job], timeout: float | None = None,
+                           **journal) -> AsyncIterator[CommandResult]:
+        """Run many jobs concurrently, yielding each result as soon as it is ready."""
+        tasks = [asyncio.ensure_future(self._run_job(job, timeout, **journal)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        proc.kill()
+        await proc.wait()
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Uses ``asyncio.run`` when no loop is running in this thread; otherwise
+    (e.g. inside a notebook) the coroutine runs on a fresh loop in a helper
+    thread so the caller's loop is not re-entered.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    outcome: dict = {}
+
+    def runner():
+        try:
+            outcome["value"] = asyncio.run(coro)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def iter_sync(make_aiter: Callable[[], AsyncIterator[T]], buffer: int = 64) -> Iterator[T]:
+    """
+    Consume an async iterator from synchronous code, one item at a time.
+
+    The event loop runs in a single background thread and hands items over
+    through a bounded queue, so the caller (e.g. a Streamlit script) can render
+    each result as it arrives. Abandoning the generator cancels the loop.
+    """
+    items: queue.Queue = queue.Queue(maxsize=buffer)
+    done = object()
+    stop = threading.Event()
+    loop = asyncio.new_event_loop()
+
+    async def pump():
+        try:
+            async for item in make_aiter():
+                while not stop.is_set():
+                    try:
+                        items.put_nowait(("item", item))
+                        break
+                    except queue.Full:
+                        await asyncio.sleep(0.05)
+                if stop.is_set():
+                    return
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            items.put(("error", e))
+        finally:
+            items.put((done, None))
+
+    thread = threading.Thread(target=lambda: loop.run_until_complete(pump()), daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value = items.get()
+            if kind is done:
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stop.set()
+        if thread.is_alive():
+            loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(loop)])
+        # Drain so a blocked final put() can complete, then let the loop exit.
+        while thread.is_alive():
+            try:
+                items.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        loop.close()
+
+
+# Shared executor used by the dashboard.
+EXECUTOR = AsyncSSHExecutor()
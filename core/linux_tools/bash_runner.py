@@ -1,5 +1,11 @@
 # core/linux_tools/bash_runner.py
-import os
+import re
+import secrets
+import threading
+from dataclasses import dataclass
+
+from core.linux_tools.async_runner import EXECUTOR, AsyncSSHExecutor
+from core.linux_tools.ssh_pool import POOL, CommandResult, RemoteStream
 
 COMMANDS = {
     # 🌐 System Information
@@ -53,6 +59,9 @@ COMMANDS = {
     "System Info Summary": "neofetch || screenfetch",
 }
 
+# Commands with side effects; only these are deduplicated by the idempotency guard.
+MUTATING_COMMANDS = {"Run Project Script"}
+
 
 # COMMANDS = {
 #     "Date": "date",
@@ -68,34 +77,159 @@ COMMANDS = {
 #     # "Launch Docker Menu": "python dock.py"
 # }
 
-def run_linux_task(choice: str, user: str, ip: str) -> str:
+def execute_linux_task(choice: str, user: str, ip: str, timeout: float | None = None) -> CommandResult | None:
+    """
+    Run a COMMANDS entry on ``user@ip`` over the shared SSH connection pool (which journals it).
+
+    Returns:
+        CommandResult: Output plus handshake/exec timings, or None for an unknown choice
+
+    Raises:
+        ConnectionError: If the host could not be reached.
+    """
+    command = COMMANDS.get(choice)
+    if command is None:
+        return None
+    return POOL.run(user, ip, command, timeout=timeout, label=choice, kind="linux")
+
+
+def stream_linux_task(choice: str, user: str, ip: str,
+                      cancel_event: threading.Event | None = None) -> RemoteStream | None:
+    """
+    Start a COMMANDS entry on ``user@ip`` and stream its output line by line.
+
+    Iterate the returned stream to receive ``(stream_name, line)`` tuples while the
+    command is still running; ``stream.exit_status`` is set once iteration ends.
+
+    Returns:
+        RemoteStream: The running command, or None for an unknown choice
+
+    Raises:
+        ConnectionError: If the host could not be reached.
+    """
+    command = COMMANDS.get(choice)
+    if command is None:
+        return None
+    return POOL.stream(user, ip, command, cancel_event=cancel_event, label=choice, kind="linux")
+
+
+@dataclass
+class BatchResult:
+    """Per-command results of one batched SSH invocation."""
+    results: dict[str, CommandResult]
+    handshake_time: float = 0.0
+    exec_time: float = 0.0
+    reused: bool = False
+
+
+def build_batch_script(commands: list[str], nonce: str) -> str:
+    """
+    Build a shell script that runs ``commands`` in order and delimits their output.
+
+    Each command's output (stdout and stderr merged) is framed by a BEGIN marker
+    line and an END marker line carrying the exit code; ``nonce`` makes the
+    markers impossible to produce by accident.
+    """
+    lines = []
+    for index, command in enumerate(commands):
+        lines.append(f"printf '%s\\n' '__CH_{nonce}_BEGIN_{index}__'")
+        # stdin from /dev/null so a command can't swallow the rest of the script
+        lines.append(f"{{ {command}\n}} </dev/null 2>&1")
+        lines.append(f"printf '\\n%s %d\\n' '__CH_{nonce}_END_{index}__' \"$?\"")
+    return "\n".join(lines) + "\n"
+
+
+def split_batch_output(output: str, count: int, nonce: str) -> list[tuple[str, int | None]]:
+    """
+    Split the combined output of :func:`build_batch_script` back into per-command parts.
+
+    Returns:
+        list: ``(output, exit_status)`` per command; commands that never finished
+        (e.g. because the batch timed out) get whatever output was captured and
+        an exit status of None.
+    """
+    parts: list[tuple[str, int | None]] = [("", None)] * count
+    pattern = re.compile(
+        rf"^__CH_{nonce}_BEGIN_(\d+)__\n(.*?)(?:\n__CH_{nonce}_END_\1__ (\d+)$|\Z)",
+        re.DOTALL | re.MULTILINE,
+    )
+    for match in pattern.finditer(output):
+        index = int(match.group(1))
+        if index < count:
+            status = match.group(3)
+            parts[index] = (match.group(2), int(status) if status is not None else None)
+    return parts
+
+
+def run_linux_batch(choices: list[str], user: str, ip: str, timeout: float | None = None) -> BatchResult:
+    """
+    Run several COMMANDS entries on ``user@ip`` in a single SSH round trip.
+
+    The commands are shipped as one script over stdin and executed in order;
+    a failing command does not stop the ones after it.
+
+    Args:
+        choices (list): Keys of ``COMMANDS``
+        user (str): SSH username
+        ip (str): Hostname or IP address
+        timeout (float, optional): Seconds to wait for the whole batch
+
+    Returns:
+        BatchResult: One CommandResult per choice, plus the batch timings
+
+    Raises:
+        KeyError: If a choice is not a known command.
+        ConnectionError: If the host could not be reached.
+    """
+    commands = [COMMANDS[choice] for choice in choices]
+    nonce = secrets.token_hex(8)
+    batch = POOL.run(user, ip, "sh -s", timeout=timeout, input=build_batch_script(commands, nonce),
+                     label=f"batch: {', '.join(choices)}")
+
+    results = {}
+    parts = split_batch_output(batch.stdout, len(commands), nonce)
+    for choice, command, (output, exit_status) in zip(choices, commands, parts):
+        results[choice] = CommandResult(
+            user=user, host=ip, command=command, stdout=output, exit_status=exit_status,
+            timed_out=batch.timed_out and exit_status is None,
+        )
+    if batch.stderr:
+        # ssh-level errors (e.g. connection refused) belong to every command.
+        for result in results.values():
+            if result.exit_status is None:
+                result.stderr = batch.stderr
+                result.exit_status = batch.exit_status
+    return BatchResult(results, batch.handshake_time, batch.exec_time, batch.reused)
+
+
+async def run_linux_task_async(choice: str, user: str, ip: str, executor: AsyncSSHExecutor = EXECUTOR,
+                               timeout: float | None = None) -> str:
+    """Async counterpart of :func:`run_linux_task`, driven by the asyncio executor."""
     command = COMMANDS.get(choice)
     if command is None:
         return "❌ Invalid command selected."
+    try:
+        return format_result(await executor.run(user, ip, command, timeout=timeout, label=choice, kind="linux"))
+    except Exception as e:
+        return f"❌ Error executing command: {str(e)}"
+
 
+def format_result(result: CommandResult) -> str:
+    """Render a CommandResult the way the dashboard displays command output."""
+    output = result.stdout + result.stderr
+    if result.timed_out:
+        return f"❌ Command timed out after {result.exec_time:.1f}s\n{output}"
+    if result.exit_status != 0:
+        return f"❌ Command failed with status {result.exit_status}\n{output}"
+    return output if output else "✅ Command executed successfully (no output)"
+
+
+def run_linux_task(choice: str, user: str, ip: str) -> str:
     try:
-        # Disable strict host key checking and auto-accept new host keys
-        # -o UserKnownHostsFile=/dev/null - don't save host keys (optional, removes the prompt)
-        # -o StrictHostKeyChecking=no - automatically accept new host keys
-        # -o LogLevel=ERROR - reduce log verbosity
-        ssh_options = "-o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null -o LogLevel=ERROR"
-        
-        if command == "":  # Interactive shell
-            full_cmd = f'ssh {ssh_options} {user}@{ip}'
-        else:  # Single command
-            # Escape double quotes in the command for proper shell handling
-            escaped_cmd = command.replace('"', '\\"')
-            full_cmd = f'ssh {ssh_options} {user}@{ip} "{escaped_cmd}"'
-        
-        # Execute the command with error handling
-        with os.popen(full_cmd) as process:
-            output = process.read()
-            
-        # Check if the command failed
-        if process.close() is not None:  # None means success, otherwise it's the exit status
-            return f"❌ Command failed with status {process.close()}\n{output}"
-            
-        return output if output else "✅ Command executed successfully (no output)"
-        
+        result = execute_linux_task(choice, user, ip)
+        if result is None:
+            return "❌ Invalid command selected."
+        return format_result(result)
+
     except Exception as e:
         return f"❌ Error executing command: {str(e)}"
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+DEFAULT_TTL = 30  # seconds
+DEFAULT_MAXSIZE = 512
+
+
+class TTLCache:
+    """
+    Thread-safe key/value cache whose entries expire after ``ttl`` seconds.
+
+    The cache holds at most ``maxsize`` entries and drops the least recently
+    used one when full. Like :data:`ssh_pool.POOL`, module-level instances
+    survive Streamlit reruns, which is what makes repeated views free.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, maxsize: int = DEFAULT_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            stored_at, expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now, now + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any],
+                   ttl: float | None = None, refresh: bool = False) -> tuple[Any, bool]:
+        """
+        Return the cached value for ``key``, computing it with ``factory`` on a miss.
+
+        Args:
+            key: Cache key
+            factory (callable): Builds the value when it is not cached
+            ttl (float, optional): Lifetime of a newly stored value
+            refresh (bool): Ignore any cached value and call ``factory``
+
+        Returns:
+            tuple: ``(value, hit)`` where ``hit`` is True if the value came from the cache
+        """
+        missing = object()
+        if not refresh:
+            value = self.get(key, missing)
+            if value is not missing:
+                return value, True
+        value = factory()
+        self.set(key, value, ttl)
+        return value, False
+
+    def age(self, key: Hashable) -> float | None:
+        """Seconds since ``key`` was stored, or None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() >= entry[1]:
+                return None
+            return time.monotonic() - entry[0]
+
+    def invalidate(self, key: Hashable | None = None,
+                   predicate: Callable[[Hashable], bool] | None = None) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            key: Drop only this key
+            predicate (callable, optional): Drop every key for which it returns True
+
+        With neither argument the whole cache is cleared.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            if key is not None:
+                return 1 if self._entries.pop(key, None) is not None else 0
+            if predicate is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            doomed = [k for k in self._entries if predicate(k)]
+            for k in doomed:
+                del self._entries[k]
+            return len(doomed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
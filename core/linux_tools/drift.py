@@ -0,0 +1,113 @@
+import difflib
+from dataclasses import dataclass, field
+
+from core.linux_tools.async_runner import AsyncSSHExecutor, run_sync
+from core.linux_tools.bash_runner import COMMANDS
+
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_TIMEOUT = 30
+
+
+@dataclass
+class DriftGroup:
+    """Hosts whose normalized output hashed to the same value."""
+    digest: str
+    hosts: list[str]
+    baseline: bool = False
+    diff: str = ""  # unified diff against the baseline group (empty for the baseline)
+
+
+@dataclass
+class DriftReport:
+    command: str
+    groups: list[DriftGroup] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    baseline_content: str = ""
+
+    @property
+    def drifted(self) -> bool:
+        return len(self.groups) > 1
+
+    def as_rows(self) -> list[dict]:
+        return [
+            {"group": index + 1, "hosts": len(group.hosts), "baseline": group.baseline,
+             "digest": group.digest[:12], "members": ", ".join(group.hosts)}
+            for index, group in enumerate(self.groups)
+        ]
+
+
+def normalize_pipeline(command: str, sort_lines: bool = False) -> str:
+    """
+    Wrap ``command`` so the host normalizes its output before anything is sent.
+
+    Trailing whitespace and blank lines are dropped and, when ``sort_lines``
+    is set (useful for package or service lists), lines are sorted. The
+    output is captured first, so if the command fails the wrapper exits with
+    its status (and its stderr) instead of normalizing nothing into a hash.
+    """
+    pipeline = (f"out=$({{ {command}\n}}); rc=$?; [ $rc -eq 0 ] || exit $rc; "
+                f"printf '%s\\n' \"$out\" | sed -e 's/[[:space:]]*$//' -e '/^$/d'")
+    if sort_lines:
+        pipeline += " | LC_ALL=C sort"
+    return pipeline
+
+
+def detect_drift(inventory: list[tuple[str, str]], command: str, sort_lines: bool = False,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT) -> DriftReport:
+    """
+    Compare the output of a read-only command across every host.
+
+    Each host only returns the SHA-256 of its normalized output. Hosts are
+    grouped by hash; the largest group is the baseline, and full content is
+    fetched for just one representative per group to build diffs. Comparing
+    200 hosts thus costs 200 hashes plus one transfer per distinct variant.
+
+    Args:
+        inventory (list): ``(user, host)`` tuples
+        command (str): A ``bash_runner.COMMANDS`` key or a raw read-only shell command
+        sort_lines (bool): Ignore line order when comparing
+
+    Returns:
+        DriftReport: Groups (baseline first, then by size) and the hosts that were
+        unreachable or where the command failed
+    """
+    command = COMMANDS.get(command, command)
+    pipeline = normalize_pipeline(command, sort_lines)
+    executor = AsyncSSHExecutor(max_concurrency=max_concurrency)
+    report = DriftReport(command)
+
+    hashes = run_sync(executor.run_many(
+        [(user, host, f"{pipeline} | sha256sum | cut -c1-64") for user, host in inventory],
+        timeout=timeout, label="drift: hash",
+    ))
+    members: dict[str, list[tuple[str, str]]] = {}
+    for (user, host), result in zip(inventory, hashes):
+        digest = result.stdout.strip()
+        if not result.ok or len(digest) != 64:
+            report.failed[f"{user}@{host}"] = (
+                result.stderr.strip()
+                or ("timed out" if result.timed_out
+                    else f"exit status {result.exit_status}" if not result.ok else "no hash returned"))
+            continue
+        members.setdefault(digest, []).append((user, host))
+    if not members:
+        return report
+
+    ordered = sorted(members.items(), key=lambda item: len(item[1]), reverse=True)
+    if len(ordered) > 1:
+        representatives = [hosts[0] for _, hosts in ordered]
+        contents = run_sync(executor.run_many(
+            [(user, host, pipeline) for user, host in representatives], timeout=timeout, label="drift: content",
+        ))
+        baseline_lines = contents[0].stdout.splitlines(keepends=True)
+        report.baseline_content = contents[0].stdout
+    for index, (digest, hosts) in enumerate(ordered):
+        group = DriftGroup(digest, [f"{user}@{host}" for user, host in hosts], baseline=index == 0)
+        if index > 0:
+            group.diff = "".join(difflib.unified_diff(
+                baseline_lines, contents[index].stdout.splitlines(keepends=True),
+                fromfile=f"baseline ({ordered[0][1][0][1]})", tofile=group.hosts[0],
+            ))
+        report.groups.append(group)
+    return report
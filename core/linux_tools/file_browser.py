@@ -0,0 +1,192 @@
+import posixpath
+import shlex
+import time
+from dataclasses import dataclass, field
+
+from core.linux_tools.cache import TTLCache
+from core.linux_tools.ssh_pool import POOL
+
+DEFAULT_LISTING_TTL = 600       # upper bound on reusing a listing whose directory mtime is unchanged
+DEFAULT_MAX_ENTRIES = 10000     # entries fetched per directory; the rest is reported as truncated
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_PREVIEW_BYTES = 4096
+
+ENTRY_TYPES = {"f": "file", "d": "dir", "l": "link", "p": "fifo", "s": "socket", "c": "char", "b": "block"}
+
+# (user, host, path) -> Listing
+LISTING_CACHE = TTLCache(ttl=DEFAULT_LISTING_TTL, maxsize=256)
+
+
+@dataclass
+class DirEntry:
+    name: str
+    type: str           # see ENTRY_TYPES; symlinks report their own type here
+    target_type: str    # type of what a symlink points to (same as ``type`` otherwise)
+    size: int
+    mtime: float
+    mode: str           # octal permission bits, e.g. "755"
+
+    @property
+    def is_dir(self) -> bool:
+        return self.target_type == "dir"
+
+    def as_row(self) -> dict:
+        return {
+            "name": self.name + ("/" if self.is_dir else ""),
+            "type": self.type,
+            "size": self.size,
+            "modified": time.strftime("%Y-%m-%d %H:%M", time.localtime(self.mtime)),
+            "mode": self.mode,
+        }
+
+
+@dataclass
+class Listing:
+    """One level of a remote directory, directories first, then by name."""
+    path: str
+    mtime: float
+    entries: list[DirEntry] = field(default_factory=list)
+    truncated: bool = False
+    fetched_at: float = 0.0
+
+    def page(self, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> list[DirEntry]:
+        return self.entries[offset:offset + limit]
+
+
+@dataclass
+class FilePreview:
+    path: str
+    offset: int
+    length: int         # bytes requested
+    data: str
+    size: int           # total file size in bytes
+    binary: bool
+
+    @property
+    def end(self) -> int:
+        return min(self.size, self.offset + self.length)
+
+    @property
+    def eof(self) -> bool:
+        return self.end >= self.size
+
+
+def normalize_path(path: str) -> str:
+    """Collapse ``..`` and duplicate slashes; relative paths stay relative to the login directory."""
+    return posixpath.normpath(path.strip() or ".")
+
+
+def parent_path(path: str) -> str:
+    path = normalize_path(path)
+    if path == "/":
+        return path
+    if path in (".", "..") or path.endswith("/.."):
+        return normalize_path(path + "/..")
+    return posixpath.dirname(path) or "."
+
+
+def _mtime_command(path: str) -> str:
+    return f"cd -- {shlex.quote(path)} && find . -maxdepth 0 -printf '%T@\\n'"
+
+
+def _listing_command(path: str, max_entries: int) -> str:
+    # The directory mtime is read before the entries, so a change in between
+    # makes the next validation miss instead of serving a stale listing.
+    return (
+        f"{_mtime_command(path)} && "
+        "find . -mindepth 1 -maxdepth 1 -printf '%y\\t%Y\\t%s\\t%T@\\t%m\\t%f\\0' "
+        f"| head -z -n {int(max_entries) + 1}"
+    )
+
+
+def _run(user: str, host: str, command: str) -> str:
+    result = POOL.run(user, host, command, label="file browser")
+    if not result.ok:
+        raise OSError(result.stderr.strip() or f"remote command failed with status {result.exit_status}")
+    return result.stdout
+
+
+def parse_listing(path: str, output: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> Listing:
+    """Parse the output of the listing command (mtime line, then NUL-separated entries)."""
+    mtime_line, _, records = output.partition("\n")
+    entries = []
+    for record in records.split("\0"):
+        fields = record.split("\t", 5)
+        if len(fields) != 6:
+            continue
+        kind, target_kind, size, mtime, mode, name = fields
+        entries.append(DirEntry(
+            name=name,
+            type=ENTRY_TYPES.get(kind, kind),
+            target_type=ENTRY_TYPES.get(target_kind, target_kind),
+            size=int(size),
+            mtime=float(mtime),
+            mode=mode,
+        ))
+    truncated = len(entries) > max_entries
+    entries = entries[:max_entries]
+    entries.sort(key=lambda entry: (not entry.is_dir, entry.name.lower()))
+    return Listing(path, float(mtime_line), entries, truncated, time.time())
+
+
+def list_directory(user: str, host: str, path: str = ".", refresh: bool = False,
+                   max_entries: int = DEFAULT_MAX_ENTRIES) -> tuple[Listing, bool]:
+    """
+    List one level of a remote directory.
+
+    A cached listing is revalidated with a single ``find -printf '%T@'`` of the
+    directory itself and reused while its mtime is unchanged. The mtime only
+    moves when entries are added, removed or renamed, so sizes of files edited
+    in place may lag until the listing is refreshed or its TTL expires.
+
+    Args:
+        user (str): SSH username
+        host (str): Hostname or IP address
+        path (str): Remote directory; relative paths start at the login directory
+        refresh (bool): Skip the cache and always list again
+        max_entries (int): Maximum number of entries to fetch
+
+    Returns:
+        tuple: ``(listing, cached)`` where ``cached`` is True if the entries were not re-fetched
+
+    Raises:
+        OSError: If the directory cannot be read.
+        ConnectionError: If the host could not be reached.
+    """
+    path = normalize_path(path)
+    key = (user, host, path)
+    cached = None if refresh else LISTING_CACHE.get(key)
+    if cached is not None and float(_run(user, host, _mtime_command(path))) == cached.mtime:
+        return cached, True
+
+    listing = parse_listing(path, _run(user, host, _listing_command(path, max_entries)), max_entries)
+    LISTING_CACHE.set(key, listing)
+    return listing, False
+
+
+def read_range(user: str, host: str, path: str, offset: int = 0,
+               length: int = DEFAULT_PREVIEW_BYTES) -> FilePreview:
+    """
+    Read ``length`` bytes of a remote file starting at ``offset``.
+
+    Only the requested range leaves the host: ``tail -c +N`` seeks on regular
+    files and ``head -c`` stops reading after the window.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ConnectionError: If the host could not be reached.
+    """
+    path = normalize_path(path)
+    quoted = shlex.quote(path)
+    output = _run(user, host, f"stat -L -c %s -- {quoted} && "
+                              f"tail -c +{int(offset) + 1} -- {quoted} | head -c {int(length)}")
+    size_line, _, data = output.partition("\n")
+    binary = "\0" in data or data.count("�") > len(data) // 10
+    return FilePreview(path, int(offset), int(length), data, int(size_line), binary)
+
+
+def invalidate(user: str, host: str, path: str | None = None) -> int:
+    """Drop cached listings of a host (or of one of its directories)."""
+    if path is not None:
+        return LISTING_CACHE.invalidate((user, host, normalize_path(path)))
+    return LISTING_CACHE.invalidate(predicate=lambda key: key[:2] == (user, host))
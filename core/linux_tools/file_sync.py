@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from core.linux_tools.ssh_pool import POOL
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_WORKERS = 8
+COMPRESSION_LEVEL = 6
+
+# Both helpers run with the remote python3; the paths/payload arrive on stdin.
+REMOTE_HASH_SCRIPT = """
+import hashlib, json, os, sys
+root, chunk = os.path.expanduser(sys.argv[1]), int(sys.argv[2])
+out = {}
+for rel in json.loads(sys.stdin.read()):
+    path = os.path.join(root, rel)
+    try:
+        blocks = []
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(chunk), b""):
+                blocks.append(hashlib.sha256(block).hexdigest()[:32])
+        out[rel] = {"size": os.path.getsize(path), "mode": os.stat(path).st_mode & 0o7777, "blocks": blocks}
+    except OSError:
+        pass
+print(json.dumps(out))
+"""
+
+REMOTE_APPLY_SCRIPT = """
+import json, os, shutil, sys, zlib
+root, inp, applied = os.path.expanduser(sys.argv[1]), sys.stdin.buffer, 0
+while True:
+    header = inp.readline()
+    if not header:
+        break
+    op = json.loads(header)
+    path = os.path.join(root, op["path"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".chsync.tmp"
+    if os.path.exists(path):
+        shutil.copyfile(path, tmp)
+    else:
+        open(tmp, "wb").close()
+    with open(tmp, "r+b") as f:
+        for index, length in op["chunks"]:
+            f.seek(index * op["chunk_size"])
+            f.write(zlib.decompress(inp.read(length)))
+        f.truncate(op["size"])
+    os.chmod(tmp, op["mode"])
+    os.replace(tmp, path)
+    applied += 1
+print(applied)
+"""
+
+
+@dataclass
+class FileManifest:
+    size: int
+    mode: int
+    blocks: list[str]
+
+
+@dataclass
+class FileDelta:
+    path: str
+    size: int
+    mode: int
+    changed_blocks: list[int]
+
+
+@dataclass
+class SyncProgress:
+    host: str
+    done_bytes: int    # uncompressed changed bytes sent so far
+    total_bytes: int   # uncompressed changed bytes to send
+
+
+@dataclass
+class SyncResult:
+    host: str
+    status: str = "ok"            # "ok" or "failed"
+    files_total: int = 0
+    files_changed: int = 0
+    bytes_total: int = 0          # size of the local tree
+    bytes_changed: int = 0        # raw size of the chunks that differed
+    bytes_sent: int = 0           # compressed bytes actually sent
+    duration: float = 0.0
+    error: str = ""
+    changed_files: list[str] = field(default_factory=list)
+
+    def as_row(self) -> dict:
+        return {
+            "host": self.host,
+            "status": self.status,
+            "files_changed": f"{self.files_changed}/{self.files_total}",
+            "changed_kb": round(self.bytes_changed / 1024, 1),
+            "sent_kb": round(self.bytes_sent / 1024, 1),
+            "duration_s": round(self.duration, 2),
+            "error": self.error,
+        }
+
+
+def _hash_block(block: bytes) -> str:
+    return hashlib.sha256(block).hexdigest()[:32]
+
+
+def build_manifest(local_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict[str, FileManifest]:
+    """Hash every regular file below ``local_dir`` in ``chunk_size`` blocks."""
+    manifest = {}
+    for root, _, files in os.walk(local_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if not os.path.isfile(path) or os.path.islink(path):
+                continue
+            blocks = []
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(chunk_size), b""):
+                    blocks.append(_hash_block(block))
+            rel = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            manifest[rel] = FileManifest(os.path.getsize(path), os.stat(path).st_mode & 0o7777, blocks)
+    return manifest
+
+
+def fetch_remote_manifest(user: str, host: str, remote_dir: str, paths: list[str],
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict[str, FileManifest]:
+    """
+    Hash the given files on the remote side (missing files are simply absent).
+
+    Raises:
+        ConnectionError: If the host cannot be reached or the remote hashing fails.
+    """
+    command = f"python3 -c {shlex.quote(REMOTE_HASH_SCRIPT)} {shlex.quote(remote_dir)} {int(chunk_size)}"
+    result = POOL.run(user, host, command, input=json.dumps(paths), label="file sync: hash")
+    if not result.ok:
+        raise ConnectionError(result.stderr.strip() or f"remote hashing failed with status {result.exit_status}")
+    return {rel: FileManifest(**info) for rel, info in json.loads(result.stdout).items()}
+
+
+def plan_transfer(local: dict[str, FileManifest], remote: dict[str, FileManifest]) -> list[FileDelta]:
+    """Work out which blocks of which files differ between the two manifests."""
+    deltas = []
+    for rel, manifest in local.items():
+        theirs = remote.get(rel)
+        if theirs is None:
+            changed = list(range(len(manifest.blocks)))
+        else:
+            changed = [i for i, digest in enumerate(manifest.blocks)
+                       if i >= len(theirs.blocks) or theirs.blocks[i] != digest]
+        size_differs = theirs is None or theirs.size != manifest.size
+        mode_differs = theirs is None or theirs.mode != manifest.mode
+        if changed or size_differs or mode_differs:
+            deltas.append(FileDelta(rel, manifest.size, manifest.mode, changed))
+    return deltas
+
+
+def _payload(local_dir: str, deltas: list[FileDelta], chunk_size: int) -> Iterator[tuple[bytes, int]]:
+    """
+    Yield the wire format read by REMOTE_APPLY_SCRIPT, one file at a time.
+
+    Each item is ``(bytes_to_send, raw_bytes_covered)`` so callers can report
+    progress against the uncompressed amount of changed data.
+    """
+    for delta in deltas:
+        compressed = []
+        with open(os.path.join(local_dir, delta.path), "rb") as f:
+            for index in delta.changed_blocks:
+                f.seek(index * chunk_size)
+                raw = f.read(chunk_size)
+                compressed.append((index, len(raw), zlib.compress(raw, COMPRESSION_LEVEL)))
+        header = {
+            "path": delta.path, "size": delta.size, "mode": delta.mode, "chunk_size": chunk_size,
+            "chunks": [[index, len(data)] for index, _, data in compressed],
+        }
+        yield (json.dumps(header) + "\n").encode(), 0
+        for _, raw_length, data in compressed:
+            yield data, raw_length
+
+
+def sync_to_host(user: str, host: str, local_dir: str, remote_dir: str,
+                 manifest: dict[str, FileManifest] | None = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, dry_run: bool = False,
+                 progress: Callable[[SyncProgress], None] | None = None) -> SyncResult:
+    """
+    Bring ``remote_dir`` on ``user@host`` in line with ``local_dir``, sending only changed chunks.
+
+    Files are hashed in ``chunk_size`` blocks on both sides; only blocks whose
+    hashes differ travel, zlib-compressed, in a single SSH stream. Each file is
+    patched into a temporary copy and moved into place atomically. Extra files
+    on the remote side are left alone. Requires ``python3`` on the host.
+    """
+    start = time.perf_counter()
+    target = f"{user}@{host}"
+    manifest = manifest if manifest is not None else build_manifest(local_dir, chunk_size)
+    result = SyncResult(target, files_total=len(manifest),
+                        bytes_total=sum(m.size for m in manifest.values()))
+    try:
+        remote = fetch_remote_manifest(user, host, remote_dir, list(manifest), chunk_size)
+        deltas = plan_transfer(manifest, remote)
+        result.files_changed = len(deltas)
+        result.changed_files = [d.path for d in deltas]
+        result.bytes_changed = sum(
+            min(chunk_size, d.size - i * chunk_size) for d in deltas for i in d.changed_blocks
+        )
+        if deltas and not dry_run:
+            result.bytes_sent = _push(user, host, remote_dir, local_dir, deltas, chunk_size, progress)
+    except Exception as e:
+        result.status, result.error = "failed", str(e)
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def _push(user: str, host: str, remote_dir: str, local_dir: str, deltas: list[FileDelta],
+          chunk_size: int, progress: Callable[[SyncProgress], None] | None) -> int:
+    POOL.connect(user, host)
+    command = f"python3 -c {shlex.quote(REMOTE_APPLY_SCRIPT)} {shlex.quote(remote_dir)}"
+    proc = subprocess.Popen(POOL.command_argv(user, host, command), stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Drain stdout/stderr in the background so a chatty failure can't deadlock the writes.
+    output: dict[str, bytes] = {}
+    drains = [
+        threading.Thread(target=lambda name=name, pipe=pipe: output.__setitem__(name, pipe.read()), daemon=True)
+        for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr))
+    ]
+    for drain in drains:
+        drain.start()
+
+    total = sum(min(chunk_size, d.size - i * chunk_size) for d in deltas for i in d.changed_blocks)
+    sent = done = 0
+    try:
+        for piece, raw_length in _payload(local_dir, deltas, chunk_size):
+            proc.stdin.write(piece)
+            sent += len(piece)
+            done += raw_length
+            if progress and raw_length:
+                progress(SyncProgress(f"{user}@{host}", done, total))
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+    proc.wait()
+    for drain in drains:
+        drain.join()
+    if proc.returncode != 0:
+        raise RuntimeError(output.get("stderr", b"").decode(errors="replace").strip()
+                           or f"remote apply failed with status {proc.returncode}")
+    if progress:
+        progress(SyncProgress(f"{user}@{host}", total, total))
+    return sent
+
+
+def sync_to_hosts(inventory: list[tuple[str, str]], local_dir: str, remote_dir: str,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, max_workers: int = DEFAULT_MAX_WORKERS,
+                  dry_run: bool = False) -> Iterator[SyncProgress | SyncResult]:
+    """
+    Push ``local_dir`` to every host in parallel.
+
+    The local tree is hashed once and shared by all hosts. Yields
+    :class:`SyncProgress` events while data is being sent and one
+    :class:`SyncResult` per host as it finishes, all from the calling thread.
+    """
+    manifest = build_manifest(local_dir, chunk_size)
+    events: queue.Queue = queue.Queue()
+
+    def work(user, host):
+        events.put(sync_to_host(user, host, local_dir, remote_dir, manifest, chunk_size,
+                                dry_run=dry_run, progress=events.put))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for user, host in inventory:
+            executor.submit(work, user, host)
+        finished = 0
+        while finished < len(inventory):
+            event = events.get()
+            if isinstance(event, SyncResult):
+                finished += 1
+            yield event
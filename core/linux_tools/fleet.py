@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from typing import Iterator
+
+from core.linux_tools.async_runner import AsyncSSHExecutor, iter_sync
+from core.linux_tools.bash_runner import COMMANDS
+from core.linux_tools.ssh_pool import CommandResult
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_HOST_TIMEOUT = 30  # seconds
+
+
+@dataclass
+class HostResult:
+    """Result of a fleet command on a single host."""
+    user: str
+    host: str
+    status: str            # "ok", "failed" or "timeout"
+    wall_time: float
+    output: str = ""
+    exit_status: int | None = None
+    handshake_time: float = 0.0
+
+    def as_row(self) -> dict:
+        return {
+            "host": f"{self.user}@{self.host}",
+            "status": self.status,
+            "exit_status": self.exit_status,
+            "wall_time_s": round(self.wall_time, 2),
+            "handshake_s": round(self.handshake_time, 2),
+        }
+
+
+def parse_inventory(text: str, default_user: str | None = None) -> list[tuple[str, str]]:
+    """
+    Parse a host inventory, one host per line.
+
+    Lines may be ``user@host`` or just ``host`` (which then uses ``default_user``).
+    Blank lines and ``#`` comments are ignored, as are duplicate entries.
+
+    Args:
+        text (str): Inventory text
+        default_user (str, optional): User for lines without an explicit ``user@``
+
+    Returns:
+        list: ``(user, host)`` tuples in inventory order
+
+    Raises:
+        ValueError: If a line has no user and no default user was given, or is malformed
+            (empty user or host, or whitespace inside the entry).
+    """
+    hosts = []
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if "@" in line:
+            user, host = line.rsplit("@", 1)
+        elif default_user:
+            user, host = default_user, line
+        else:
+            raise ValueError(f"Line {lineno}: no user given for host '{line}'")
+        if not user or not host or any(c.isspace() for c in user + host):
+            raise ValueError(f"Line {lineno}: malformed host entry '{line}'")
+        if (user, host) not in hosts:
+            hosts.append((user, host))
+    return hosts
+
+
+def _host_result(result: CommandResult) -> HostResult:
+    if result.timed_out:
+        status = "timeout"
+    elif result.exit_status == 0:
+        status = "ok"
+    else:
+        status = "failed"
+    return HostResult(
+        result.user, result.host, status, result.total_time,
+        output=result.stdout + result.stderr,
+        exit_status=result.exit_status,
+        handshake_time=result.handshake_time,
+    )
+
+
+def run_fleet(inventory: list[tuple[str, str]], choice: str,
+              max_workers: int = DEFAULT_MAX_WORKERS,
+              timeout: float = DEFAULT_HOST_TIMEOUT) -> Iterator[HostResult]:
+    """
+    Run a COMMANDS entry on every host of ``inventory`` concurrently.
+
+    Results are yielded as each host finishes, not in inventory order, so the
+    caller can render progress while slow hosts are still running. All hosts
+    are driven from one asyncio event loop (see ``async_runner``), so large
+    inventories don't need a thread per host.
+
+    Args:
+        inventory (list): ``(user, host)`` tuples, e.g. from :func:`parse_inventory`
+        choice (str): Key of ``bash_runner.COMMANDS`` to run
+        max_workers (int): Maximum number of hosts contacted at the same time
+        timeout (float): Per-host command timeout in seconds
+
+    Yields:
+        HostResult: One result per host
+
+    Raises:
+        KeyError: If ``choice`` is not a known command.
+    """
+    command = COMMANDS[choice]
+    executor = AsyncSSHExecutor(max_concurrency=max(1, max_workers))
+    jobs = [(user, host, command) for user, host in inventory]
+    for result in iter_sync(lambda: executor.as_completed(jobs, timeout=timeout, label=choice, kind="linux")):
+        yield _host_result(result)
+
+
+def summarize(results: list[HostResult]) -> dict:
+    """Count results per status, e.g. ``{"ok": 78, "failed": 1, "timeout": 1}``."""
+    summary = {"ok": 0, "failed": 0, "timeout": 0}
+    for result in results:
+        summary[result.status] = summary.get(result.status, 0) + 1
+    return summary
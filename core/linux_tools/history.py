@@ -0,0 +1,242 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:   # ssh_pool imports this module to journal its runs
+    from core.linux_tools.ssh_pool import CommandResult
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_HISTORY_PATH = os.path.join(PROJECT_ROOT, "data", "command_history.db")
+
+
+@dataclass
+class HistoryEntry:
+    ts: float
+    kind: str               # "linux" (bash_runner.COMMANDS), "docker" (docker_runner.DOCKER_COMMANDS) or "shell"
+    label: str              # the COMMANDS / DOCKER_COMMANDS key, or what ran the shell command
+    user: str
+    host: str
+    command: str
+    args: dict = field(default_factory=dict)
+    exit_status: int | None = None
+    handshake_time: float = 0.0
+    exec_time: float = 0.0
+    reused: bool = False
+    timed_out: bool = False
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    error: str = ""         # set when the host could not be reached
+    id: int | None = None
+
+    @property
+    def total_time(self) -> float:
+        return self.handshake_time + self.exec_time
+
+    def as_row(self) -> dict:
+        return {
+            "id": self.id,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.ts)),
+            "kind": self.kind,
+            "command": self.label,
+            "host": f"{self.user}@{self.host}",
+            "exit_status": self.exit_status,
+            "handshake_ms": round(self.handshake_time * 1000),
+            "exec_ms": round(self.exec_time * 1000),
+            "output_bytes": self.stdout_bytes + self.stderr_bytes,
+            "error": self.error,
+        }
+
+
+@dataclass
+class LatencyStats:
+    label: str
+    host: str
+    count: int
+    failures: int
+    p50: float      # seconds, handshake + execution
+    p95: float
+    max: float
+
+    def as_row(self) -> dict:
+        return {
+            "command": self.label,
+            "host": self.host,
+            "runs": self.count,
+            "failures": self.failures,
+            "p50_ms": round(self.p50 * 1000),
+            "p95_ms": round(self.p95 * 1000),
+            "max_ms": round(self.max * 1000),
+        }
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class CommandJournal:
+    """
+    Append-only SQLite log of every command run through the SSH pool.
+
+    :class:`~core.linux_tools.ssh_pool.SSHPool` and the asyncio executor
+    record each run themselves, so every feature that executes remote
+    commands (single commands, streams, batches, fleet runs, plans, init
+    tasks) shows up here without its own bookkeeping.
+
+    Rows are only ever inserted; indexes on ``ts``, ``(label, ts)`` and ``(host, ts)``
+    keep per-command and per-host queries fast as the table grows. Recording
+    never raises: a journal that cannot be written must not break the command
+    it describes.
+    """
+
+    _COLUMNS = [f.name for f in fields(HistoryEntry) if f.name != "id"]
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use so importing the runners never touches the disk.
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")   # one insert per command; WAL stays consistent
+            conn.execute(f"CREATE TABLE IF NOT EXISTS history "
+                         f"(id INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(self._COLUMNS)})")
+            conn.execute("CREATE INDEX IF NOT EXISTS history_ts ON history (ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS history_label_ts ON history (label, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS history_host_ts ON history (host, ts)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def record(self, kind: str, label: str, user: str, host: str, command: str,
+               result: "CommandResult | None" = None, args: dict | None = None,
+               error: str = "") -> HistoryEntry:
+        """Append one execution; ``result`` is None when the host could not be reached."""
+        entry = HistoryEntry(time.time(), kind, label, user, host, command, dict(args or {}), error=error)
+        if result is not None:
+            entry.exit_status = result.exit_status
+            entry.handshake_time = result.handshake_time
+            entry.exec_time = result.exec_time
+            entry.reused = result.reused
+            entry.timed_out = result.timed_out
+            entry.stdout_bytes = len(result.stdout.encode(errors="replace"))
+            entry.stderr_bytes = len(result.stderr.encode(errors="replace"))
+        values = [getattr(entry, name) for name in self._COLUMNS]
+        values[self._COLUMNS.index("args")] = json.dumps(entry.args)
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(
+                    f"INSERT INTO history ({', '.join(self._COLUMNS)}) VALUES ({placeholders})", values,
+                )
+                conn.commit()
+            entry.id = cursor.lastrowid
+        except (sqlite3.Error, OSError):
+            pass
+        return entry
+
+    def _entries(self, where: str, params: tuple, limit: int | None = None) -> list[HistoryEntry]:
+        sql = f"SELECT id, {', '.join(self._COLUMNS)} FROM history WHERE {where} ORDER BY ts DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        entries = []
+        for row in rows:
+            values = dict(zip(["id"] + self._COLUMNS, row))
+            values["args"] = json.loads(values["args"] or "{}")
+            values["reused"], values["timed_out"] = bool(values["reused"]), bool(values["timed_out"])
+            entries.append(HistoryEntry(**values))
+        return entries
+
+    def recent(self, limit: int = 100, label: str | None = None, host: str | None = None) -> list[HistoryEntry]:
+        """Latest entries first, optionally restricted to one command and/or host."""
+        clauses, params = ["1"], []
+        if label:
+            clauses.append("label = ?")
+            params.append(label)
+        if host:
+            clauses.append("host = ?")
+            params.append(host)
+        return self._entries(" AND ".join(clauses), tuple(params), limit=limit)
+
+    def get(self, entry_id: int) -> HistoryEntry | None:
+        entries = self._entries("id = ?", (entry_id,))
+        return entries[0] if entries else None
+
+    def latency_stats(self, since: float | None = None, by: str = "both") -> list[LatencyStats]:
+        """
+        p50/p95/max of handshake + execution time.
+
+        Args:
+            since (float, optional): Only consider entries newer than this epoch time
+            by (str): Group by ``"label"``, ``"host"`` or ``"both"``
+
+        Returns:
+            list: LatencyStats, slowest p95 first
+        """
+        groups: dict[tuple[str, str], list[tuple[float, bool]]] = {}
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT label, host, handshake_time + exec_time, exit_status FROM history WHERE ts >= ?",
+                (since or 0,),
+            ).fetchall()
+        for label, host, total, exit_status in rows:
+            key = (label if by != "host" else "*", host if by != "label" else "*")
+            groups.setdefault(key, []).append((total, exit_status == 0))
+
+        stats = []
+        for (label, host), samples in groups.items():
+            totals = sorted(total for total, _ in samples)
+            stats.append(LatencyStats(
+                label, host, len(samples), sum(1 for _, ok in samples if not ok),
+                percentile(totals, 0.50), percentile(totals, 0.95), totals[-1],
+            ))
+        stats.sort(key=lambda s: s.p95, reverse=True)
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def replay(entry: HistoryEntry, timeout: float | None = None) -> "CommandResult | None":
+    """
+    Run a journaled command again on the same host (and record the new run).
+
+    Returns:
+        CommandResult: The new result, or None if the command no longer exists
+        or cannot be replayed (its stdin was not journaled)
+
+    Raises:
+        ConnectionError: If the host could not be reached.
+    """
+    # Imported here: the SSH pool imports this module to record its executions.
+    if entry.kind == "docker":
+        from core.docker_automation.docker_runner import execute_docker_command
+        return execute_docker_command(entry.label, entry.args, entry.user, entry.host, timeout=timeout)
+    if entry.kind == "linux":
+        from core.linux_tools.bash_runner import execute_linux_task
+        return execute_linux_task(entry.label, entry.user, entry.host, timeout=timeout)
+    if entry.args.get("stdin"):
+        return None
+    from core.linux_tools.ssh_pool import POOL
+    return POOL.run(entry.user, entry.host, entry.command, timeout=timeout, label=entry.label)
+
+
+JOURNAL = CommandJournal()
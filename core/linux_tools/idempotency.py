@@ -0,0 +1,111 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from core.linux_tools.cache import TTLCache
+
+DEFAULT_WINDOW = 10  # seconds a completed action keeps absorbing identical requests
+
+
+def action_key(*parts: Any) -> str:
+    """
+    Derive a stable key for one user action, e.g. ``action_key("docker", label, args, user, ip)``.
+
+    Dicts are serialized with sorted keys, so argument order does not matter.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _succeeded(result: Any) -> bool:
+    return bool(getattr(result, "ok", True))
+
+
+class IdempotencyGuard:
+    """
+    Collapses identical actions into a single execution.
+
+    Streamlit reruns the whole script on every interaction, so a double click
+    on a Run button re-enters the same handler. A request whose key is already
+    in flight waits for that execution and shares its result; a request that
+    arrives within ``window`` seconds of an identical one completing gets the
+    stored result. Failures (exceptions, and results whose ``ok`` is false,
+    such as a CommandResult with a non-zero exit) are shared with concurrent
+    waiters but never stored, so retrying a failed action runs it again.
+
+    Actions can name the ``target`` they change (e.g. a container); a
+    different action on the same target forgets the stored result of the
+    previous one, so a deliberate Start -> Stop -> Start runs all three.
+    Only guard actions with side effects; read-only ones should simply run.
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW):
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+        self._completed = TTLCache(ttl=window)
+        self._targets = TTLCache(ttl=window)    # target -> key of the last action on it
+
+    @property
+    def window(self) -> float:
+        return self._completed.ttl
+
+    def run(self, key: str, action: Callable[[], Any], window: float | None = None,
+            target: str | None = None,
+            should_store: Callable[[Any], bool] | None = None) -> tuple[Any, bool]:
+        """
+        Execute ``action`` unless an identical request is running or just finished.
+
+        Args:
+            key (str): Key from :func:`action_key`
+            action (callable): Performs the request and returns its result
+            window (float, optional): Override how long this result absorbs duplicates
+            target (str, optional): What the action changes, e.g. ``action_key(user, ip, container)``
+            should_store (callable, optional): Whether a result may absorb later requests;
+                defaults to the result's ``ok`` attribute (True if it has none)
+
+        Returns:
+            tuple: ``(result, duplicate)`` where ``duplicate`` is True if ``action`` was not called
+        """
+        missing = object()
+        with self._lock:
+            if target is not None:
+                previous = self._targets.get(target)
+                if previous is not None and previous != key:
+                    self._completed.invalidate(previous)
+                self._targets.set(target, key, window)
+            done = self._completed.get(key, missing)
+            if done is not missing:
+                return done, True
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result(), True
+
+        try:
+            result = action()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            if (should_store or _succeeded)(result):
+                self._completed.set(key, result, window)
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def age(self, key: str) -> float | None:
+        """Seconds since the stored result for ``key`` was produced, or None."""
+        return self._completed.age(key)
+
+    def forget(self, key: str | None = None) -> int:
+        """Drop stored results so the next identical request runs again."""
+        return self._completed.invalidate(key)
+
+
+GUARD = IdempotencyGuard()
@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+import itertools
+import shlex
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
+
+from core.linux_tools.async_runner import EXECUTOR, run_sync
+from core.linux_tools.ssh_pool import POOL, RemoteStream
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_SINCE = "1 hour ago"
+DEFAULT_STREAM_BUFFER = 500  # unread lines buffered per host
+
+
+@dataclass
+class LogEntry:
+    ts: float
+    host: str
+    message: str
+
+    def as_row(self) -> dict:
+        return {
+            "time": datetime.fromtimestamp(self.ts).isoformat(sep=" ", timespec="milliseconds"),
+            "host": self.host,
+            "message": self.message,
+        }
+
+
+@dataclass
+class LogCursor:
+    """
+    Position in a search result.
+
+    ``until`` is pinned to the moment the first page was requested, so later
+    pages see the same result set even while hosts keep logging.
+    """
+    offset: int = 0
+    until: float | None = None
+
+    def next(self, limit: int) -> "LogCursor":
+        return LogCursor(self.offset + limit, self.until)
+
+    def previous(self, limit: int) -> "LogCursor":
+        return LogCursor(max(0, self.offset - limit), self.until)
+
+
+def build_journal_command(pattern: str | None = None, unit: str | None = None,
+                          since: str | None = DEFAULT_SINCE, until: float | None = None,
+                          per_host_limit: int | None = None) -> str:
+    """
+    Build the remote journalctl pipeline for a search.
+
+    Output uses ``-o short-unix`` so every entry starts with an epoch timestamp,
+    which is what the merge orders on. ``pattern`` is an extended, case
+    insensitive grep regex applied on the host, so only matches cross the wire.
+    """
+    command = ["journalctl", "--no-pager", "-o", "short-unix"]
+    if unit:
+        command += ["-u", unit]
+    if since:
+        command += ["--since", since]
+    if until is not None:
+        command += ["--until", f"@{int(until)}"]
+    if per_host_limit and not pattern:
+        command += ["-n", str(per_host_limit)]
+    pipeline = " ".join(shlex.quote(part) for part in command)
+    if pattern:
+        pipeline += f" | grep -E -i -e {shlex.quote(pattern)}"
+        if per_host_limit:
+            pipeline += f" | tail -n {int(per_host_limit)}"
+    return pipeline
+
+
+def _entries(host: str, stream: RemoteStream, errors: dict[str, str]) -> Iterator[LogEntry]:
+    last_ts = 0.0
+    for name, line in stream:
+        if name == "stderr":
+            errors[host] = (errors.get(host, "") + line + "\n")
+            continue
+        if line.startswith("-- "):
+            # journalctl markers such as "-- No entries --" or "-- Boot ... --"
+            continue
+        head, _, rest = line.partition(" ")
+        try:
+            last_ts = float(head)
+        except ValueError:
+            # Continuation line of a multi-line message: keep it next to its entry.
+            yield LogEntry(last_ts, host, line)
+            continue
+        yield LogEntry(last_ts, host, rest)
+
+
+class LogSearch:
+    """
+    Search the journals of many hosts at once and merge the matches by time.
+
+    All hosts run their (filtered) journalctl concurrently and stream lines
+    back through bounded buffers; :func:`heapq.merge` then pulls from whichever
+    host has the oldest pending entry. Each host's journal is already sorted,
+    so the merged stream is globally time-ordered while only one pending entry
+    per host plus the stream buffers are held in memory. Reading stops (and the
+    remote commands are cancelled) as soon as the requested page is full.
+    """
+
+    def __init__(self, inventory: list[tuple[str, str]], pattern: str | None = None,
+                 unit: str | None = None, since: str | None = DEFAULT_SINCE,
+                 per_host_limit: int | None = None):
+        self.inventory = list(inventory)
+        self.pattern = pattern
+        self.unit = unit
+        self.since = since
+        self.per_host_limit = per_host_limit
+        self.errors: dict[str, str] = {}
+
+    def _connect_all(self) -> None:
+        # Open all master connections concurrently instead of one by one.
+        async def connect_all():
+            return await asyncio.gather(
+                *(EXECUTOR.connect(user, host) for user, host in self.inventory),
+                return_exceptions=True,
+            )
+        for (user, host), outcome in zip(self.inventory, run_sync(connect_all())):
+            if isinstance(outcome, Exception):
+                self.errors[host] = str(outcome)
+
+    def iter_entries(self, until: float | None = None) -> Iterator[LogEntry]:
+        """Yield all matching entries of all hosts, oldest first."""
+        self.errors = {}
+        self._connect_all()
+        command = build_journal_command(self.pattern, self.unit, self.since, until, self.per_host_limit)
+        streams: list[RemoteStream] = []
+        try:
+            sources = []
+            for user, host in self.inventory:
+                if host in self.errors:
+                    continue
+                stream = POOL.stream(user, host, command, buffer_lines=DEFAULT_STREAM_BUFFER, label="log search")
+                streams.append(stream)
+                sources.append(_entries(host, stream, self.errors))
+            yield from heapq.merge(*sources, key=lambda entry: entry.ts)
+        finally:
+            for stream in streams:
+                stream.cancel()
+
+    def page(self, cursor: LogCursor | None = None,
+             limit: int = DEFAULT_PAGE_SIZE) -> tuple[list[LogEntry], LogCursor, bool]:
+        """
+        Return one page of merged results.
+
+        Args:
+            cursor (LogCursor, optional): Where to start; None starts a new search
+            limit (int): Maximum number of entries on the page
+
+        Returns:
+            tuple: ``(entries, cursor, has_more)`` where ``cursor`` is the (pinned)
+            cursor of this page; use ``cursor.next(limit)`` for the following one
+        """
+        cursor = cursor or LogCursor()
+        if cursor.until is None:
+            cursor = LogCursor(cursor.offset, time.time())
+        entries = self.iter_entries(until=cursor.until)
+        try:
+            window = list(itertools.islice(entries, cursor.offset, cursor.offset + limit + 1))
+        finally:
+            entries.close()
+        return window[:limit], cursor, len(window) > limit
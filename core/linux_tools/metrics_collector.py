@@ -0,0 +1,335 @@
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+
+from core.linux_tools.async_runner import AsyncSSHExecutor, run_sync
+
+DEFAULT_INTERVAL = 15      # seconds between samples
+DEFAULT_CAPACITY = 720     # samples kept in memory per host (3h at 15s)
+DEFAULT_TIMEOUT = 10       # seconds per host per sample
+
+# One round trip returns everything a sample needs, separated by "---" lines.
+SAMPLE_COMMAND = (
+    "cat /proc/loadavg; echo ---; "
+    "grep -E '^(MemTotal|MemAvailable):' /proc/meminfo; echo ---; "
+    "df -P / | tail -n 1; echo ---; "
+    "cat /proc/net/dev; echo ---; "
+    "head -n 1 /proc/stat"
+)
+
+
+@dataclass
+class Sample:
+    """One metrics sample of one host."""
+    host: str
+    ts: float
+    load1: float
+    load5: float
+    load15: float
+    cpu_pct: float | None       # None for the first sample (needs a previous one)
+    mem_total: int              # bytes
+    mem_available: int          # bytes
+    mem_used_pct: float
+    disk_used_pct: float        # of the root filesystem
+    net_rx_bytes: int           # counters summed over all non-loopback interfaces
+    net_tx_bytes: int
+    net_rx_rate: float | None   # bytes/s since the previous sample
+    net_tx_rate: float | None
+    cpu_total: int = 0          # raw /proc/stat jiffies, kept for the next delta
+    cpu_idle: int = 0
+
+
+# Fields that make sense to chart
+NUMERIC_FIELDS = ["load1", "load5", "load15", "cpu_pct", "mem_used_pct",
+                  "disk_used_pct", "net_rx_rate", "net_tx_rate"]
+
+
+class RingBuffer:
+    """
+    Fixed-size circular buffer.
+
+    Appending to a full buffer overwrites the oldest item and hands it to
+    ``on_evict`` (used to spill samples to SQLite), so memory use is constant.
+    """
+
+    def __init__(self, capacity: int, on_evict=None):
+        self.capacity = capacity
+        self.on_evict = on_evict
+        self._items: list = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def append(self, item) -> None:
+        if self._size < self.capacity:
+            self._items[(self._start + self._size) % self.capacity] = item
+            self._size += 1
+            return
+        evicted = self._items[self._start]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % self.capacity
+        if self.on_evict:
+            self.on_evict(evicted)
+
+    def items(self) -> list:
+        """All items, oldest first."""
+        return [self._items[(self._start + i) % self.capacity] for i in range(self._size)]
+
+    def last(self):
+        if not self._size:
+            return None
+        return self._items[(self._start + self._size - 1) % self.capacity]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def parse_sample(host: str, output: str, previous: Sample | None = None,
+                 ts: float | None = None) -> Sample:
+    """
+    Parse the output of :data:`SAMPLE_COMMAND`.
+
+    Rates and CPU utilisation are computed against ``previous``.
+
+    Raises:
+        ValueError: If the output is incomplete.
+    """
+    sections = output.split("---\n")
+    if len(sections) < 5:
+        raise ValueError("incomplete metrics output")
+    loadavg, meminfo, df, netdev, stat = sections[:5]
+    ts = time.time() if ts is None else ts
+
+    load1, load5, load15 = (float(v) for v in loadavg.split()[:3])
+
+    mem = {}
+    for line in meminfo.splitlines():
+        key, _, value = line.partition(":")
+        mem[key.strip()] = int(value.split()[0]) * 1024
+    mem_total, mem_available = mem["MemTotal"], mem["MemAvailable"]
+
+    disk_used_pct = float(df.split()[4].rstrip("%"))
+
+    rx = tx = 0
+    for line in netdev.splitlines()[2:]:
+        iface, _, counters = line.partition(":")
+        if iface.strip() == "lo" or not counters:
+            continue
+        values = counters.split()
+        rx += int(values[0])
+        tx += int(values[8])
+
+    cpu_values = [int(v) for v in stat.split()[1:]]
+    cpu_total = sum(cpu_values)
+    cpu_idle = cpu_values[3] + (cpu_values[4] if len(cpu_values) > 4 else 0)
+
+    cpu_pct = rx_rate = tx_rate = None
+    if previous is not None:
+        elapsed = ts - previous.ts
+        total_delta = cpu_total - previous.cpu_total
+        if total_delta > 0:
+            cpu_pct = 100.0 * (1 - (cpu_idle - previous.cpu_idle) / total_delta)
+        # Counters reset on reboot; skip the rate rather than report a negative one.
+        if elapsed > 0 and rx >= previous.net_rx_bytes and tx >= previous.net_tx_bytes:
+            rx_rate = (rx - previous.net_rx_bytes) / elapsed
+            tx_rate = (tx - previous.net_tx_bytes) / elapsed
+
+    return Sample(
+        host=host, ts=ts, load1=load1, load5=load5, load15=load15, cpu_pct=cpu_pct,
+        mem_total=mem_total, mem_available=mem_available,
+        mem_used_pct=100.0 * (1 - mem_available / mem_total) if mem_total else 0.0,
+        disk_used_pct=disk_used_pct, net_rx_bytes=rx, net_tx_bytes=tx,
+        net_rx_rate=rx_rate, net_tx_rate=tx_rate, cpu_total=cpu_total, cpu_idle=cpu_idle,
+    )
+
+
+def downsample(samples: list[Sample], field: str, buckets: int = 120) -> list[tuple[float, float]]:
+    """
+    Reduce a series to at most ``buckets`` points by averaging equal time slices.
+
+    Returns:
+        list: ``(bucket_start_ts, mean_value)`` tuples; empty buckets are skipped
+    """
+    points = [(s.ts, getattr(s, field)) for s in samples if getattr(s, field) is not None]
+    if len(points) <= buckets:
+        return points
+    start, end = points[0][0], points[-1][0]
+    width = (end - start) / buckets or 1.0
+    sums: dict[int, list[float]] = {}
+    for ts, value in points:
+        slot = min(int((ts - start) / width), buckets - 1)
+        acc = sums.setdefault(slot, [0.0, 0])
+        acc[0] += value
+        acc[1] += 1
+    return [(start + slot * width, total / count) for slot, (total, count) in sorted(sums.items())]
+
+
+class SampleSpill:
+    """SQLite table that receives samples evicted from the in-memory ring buffers."""
+
+    _COLUMNS = [f.name for f in fields(Sample)]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = ", ".join(self._COLUMNS)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS samples ({columns})")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS samples_host_ts ON samples (host, ts)")
+        self._conn.commit()
+
+    def write(self, samples: list[Sample]) -> None:
+        if not samples:
+            return
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO samples VALUES ({placeholders})",
+                [tuple(asdict(s).values()) for s in samples],
+            )
+            self._conn.commit()
+
+    def read(self, host: str, since: float | None = None) -> list[Sample]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM samples WHERE host = ? AND ts >= ? ORDER BY ts",
+                (host, since or 0),
+            ).fetchall()
+        return [Sample(*row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class MetricsCollector:
+    """
+    Background sampler of CPU, memory, disk and network metrics for a host inventory.
+
+    Every ``interval`` seconds all hosts are sampled concurrently over the
+    pooled SSH connections (one round trip per host). The latest ``capacity``
+    samples per host stay in memory; older ones are spilled to SQLite when
+    ``spill_path`` is given and dropped otherwise.
+    """
+
+    def __init__(self, inventory: list[tuple[str, str]], interval: float = DEFAULT_INTERVAL,
+                 capacity: int = DEFAULT_CAPACITY, spill_path: str | None = None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.inventory = list(inventory)
+        self.interval = interval
+        self.capacity = capacity
+        self.timeout = timeout
+        self.spill = SampleSpill(spill_path) if spill_path else None
+        self.errors: dict[str, str] = {}
+        self._buffers: dict[str, RingBuffer] = {}
+        self._evicted: list[Sample] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor = AsyncSSHExecutor()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="metrics-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.timeout + self.interval)
+        if self.spill:
+            self.spill.close()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.collect_once()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def collect_once(self) -> None:
+        """Take one sample of every host."""
+        jobs = [(user, host, SAMPLE_COMMAND) for user, host in self.inventory]
+        # Not journaled: one sample per host every few seconds would bury every other command.
+        results = run_sync(self._executor.run_many(jobs, timeout=self.timeout, record=False))
+        for result in results:
+            if not result.ok:
+                self.errors[result.host] = (result.stderr or "timed out").strip()
+                continue
+            with self._lock:
+                # Without a spill target evicted samples are simply dropped.
+                buffer = self._buffers.setdefault(
+                    result.host, RingBuffer(self.capacity, on_evict=self._evicted.append if self.spill else None)
+                )
+                try:
+                    buffer.append(parse_sample(result.host, result.stdout, previous=buffer.last()))
+                    self.errors.pop(result.host, None)
+                except (ValueError, KeyError, IndexError) as e:
+                    self.errors[result.host] = f"unparseable sample: {e}"
+        if self.spill:
+            with self._lock:
+                evicted, self._evicted[:] = list(self._evicted), []
+            self.spill.write(evicted)
+
+    def hosts(self) -> list[str]:
+        with self._lock:
+            return list(self._buffers)
+
+    def samples(self, host: str, since: float | None = None, include_spilled: bool = False) -> list[Sample]:
+        """Samples of ``host``, oldest first, optionally including spilled history."""
+        with self._lock:
+            buffer = self._buffers.get(host)
+            recent = buffer.items() if buffer else []
+        if include_spilled and self.spill:
+            recent = self.spill.read(host, since) + recent
+        return [s for s in recent if since is None or s.ts >= since]
+
+    def series(self, field: str, since: float | None = None, buckets: int = 120,
+               include_spilled: bool = False) -> dict[str, list[tuple[float, float]]]:
+        """Downsampled ``field`` series per host, ready for charting."""
+        return {host: downsample(self.samples(host, since, include_spilled), field, buckets)
+                for host in self.hosts()}
+
+    def series_frame(self, field: str, since: float | None = None, buckets: int = 120,
+                     include_spilled: bool = False):
+        """Return :meth:`series` as a pandas DataFrame (time index, one column per host)."""
+        import pandas as pd
+        frames = [
+            pd.Series([v for _, v in points],
+                      index=pd.to_datetime([ts for ts, _ in points], unit="s"), name=host)
+            for host, points in self.series(field, since, buckets, include_spilled).items()
+            if points
+        ]
+        if not frames:
+            return pd.DataFrame()
+        # Hosts are bucketed independently; fill the gaps between their points.
+        return pd.concat(frames, axis=1).sort_index().interpolate(method="time", limit_area="inside")
+
+
+# The collector outlives Streamlit reruns; the dashboard starts/stops it here.
+_collector: MetricsCollector | None = None
+
+
+def get_collector() -> MetricsCollector | None:
+    return _collector
+
+
+def start_collector(inventory: list[tuple[str, str]], **kwargs) -> MetricsCollector:
+    """Replace the running collector (if any) with a new one and start it."""
+    global _collector
+    stop_collector()
+    _collector = MetricsCollector(inventory, **kwargs)
+    _collector.start()
+    return _collector
+
+
+def stop_collector() -> None:
+    global _collector
+    if _collector is not None:
+        _collector.stop()
+        _collector = None
@@ -0,0 +1,194 @@
+"""Parsers that turn the text output of read-only COMMANDS into typed records."""
+import re
+from dataclasses import asdict, dataclass, field
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4, "P": 1024 ** 5}
+
+
+def parse_size(text: str) -> int | None:
+    """
+    Convert a human readable size as printed by ``df -h``/``free -h`` to bytes.
+
+    Accepts forms such as ``512``, ``20G``, ``1.5Gi`` or ``3.4M``; returns None
+    for placeholders like ``-``.
+    """
+    match = re.fullmatch(r"([\d.]+)\s*([KMGTP]?)(?:i?B?)?", text.strip(), re.IGNORECASE)
+    if not match:
+        return None
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.upper()])
+
+
+@dataclass
+class DiskUsage:
+    filesystem: str
+    size: str
+    used: str
+    available: str
+    use_percent: int | None
+    mounted_on: str
+
+    @property
+    def size_bytes(self) -> int | None:
+        return parse_size(self.size)
+
+    @property
+    def used_bytes(self) -> int | None:
+        return parse_size(self.used)
+
+    @property
+    def available_bytes(self) -> int | None:
+        return parse_size(self.available)
+
+
+@dataclass
+class MemoryUsage:
+    kind: str  # "Mem" or "Swap"
+    total: str
+    used: str
+    free: str
+    shared: str | None = None
+    buff_cache: str | None = None
+    available: str | None = None
+
+    @property
+    def total_bytes(self) -> int | None:
+        return parse_size(self.total)
+
+    @property
+    def used_bytes(self) -> int | None:
+        return parse_size(self.used)
+
+
+@dataclass
+class NetConnection:
+    netid: str
+    state: str
+    recv_q: int
+    send_q: int
+    local_address: str
+    local_port: str
+    peer_address: str
+    peer_port: str
+    process: str = ""
+
+
+@dataclass
+class CPUInfo:
+    architecture: str | None = None
+    model_name: str | None = None
+    cpus: int | None = None
+    threads_per_core: int | None = None
+    cores_per_socket: int | None = None
+    sockets: int | None = None
+    max_mhz: float | None = None
+    fields: dict = field(default_factory=dict)  # every "Key: value" line, verbatim
+
+
+def parse_df(output: str) -> list[DiskUsage]:
+    """Parse ``df -h`` output."""
+    records = []
+    for line in output.splitlines()[1:]:
+        parts = line.split(None, 5)
+        if len(parts) < 6:
+            continue
+        filesystem, size, used, available, use_percent, mounted_on = parts
+        percent = use_percent.rstrip("%")
+        records.append(DiskUsage(
+            filesystem, size, used, available,
+            int(percent) if percent.isdigit() else None,
+            mounted_on,
+        ))
+    return records
+
+
+def parse_free(output: str) -> list[MemoryUsage]:
+    """Parse ``free -h`` output (both the ``Mem:`` and ``Swap:`` rows)."""
+    records = []
+    for line in output.splitlines():
+        parts = line.split()
+        if not parts or not parts[0].endswith(":"):
+            continue
+        kind, values = parts[0].rstrip(":"), parts[1:]
+        if len(values) < 3:
+            continue
+        values += [None] * (6 - len(values))
+        records.append(MemoryUsage(kind, *values[:6]))
+    return records
+
+
+def _split_endpoint(endpoint: str) -> tuple[str, str]:
+    address, _, port = endpoint.rpartition(":")
+    return address.strip("[]"), port
+
+
+def parse_ss(output: str) -> list[NetConnection]:
+    """Parse ``ss -tunap`` output."""
+    records = []
+    for line in output.splitlines():
+        parts = line.split(None, 6)
+        if len(parts) < 6 or parts[0] == "Netid" or not parts[2].isdigit():
+            continue
+        netid, state, recv_q, send_q, local, peer = parts[:6]
+        local_address, local_port = _split_endpoint(local)
+        peer_address, peer_port = _split_endpoint(peer)
+        records.append(NetConnection(
+            netid, state, int(recv_q), int(send_q),
+            local_address, local_port, peer_address, peer_port,
+            parts[6].strip() if len(parts) > 6 else "",
+        ))
+    return records
+
+
+def _to_int(value: str | None) -> int | None:
+    return int(value) if value and value.isdigit() else None
+
+
+def parse_lscpu(output: str) -> list[CPUInfo]:
+    """Parse ``lscpu`` output into a single CPUInfo record."""
+    fields = {}
+    for line in output.splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip()] = value.strip()
+    if not fields:
+        return []
+    try:
+        max_mhz = float(fields.get("CPU max MHz") or fields.get("CPU MHz") or "")
+    except ValueError:
+        max_mhz = None
+    return [CPUInfo(
+        architecture=fields.get("Architecture"),
+        model_name=fields.get("Model name"),
+        cpus=_to_int(fields.get("CPU(s)")),
+        threads_per_core=_to_int(fields.get("Thread(s) per core")),
+        cores_per_socket=_to_int(fields.get("Core(s) per socket")),
+        sockets=_to_int(fields.get("Socket(s)")),
+        max_mhz=max_mhz,
+        fields=fields,
+    )]
+
+
+# COMMANDS key -> parser for its output
+PARSERS = {
+    "Disk Usage": parse_df,
+    "Memory Usage": parse_free,
+    "Active Network Connections": parse_ss,
+    "CPU Info": parse_lscpu,
+}
+
+
+def as_rows(records: list) -> list[dict]:
+    """Flatten records into plain dicts (suitable for ``st.dataframe``)."""
+    rows = []
+    for record in records:
+        row = asdict(record)
+        row.pop("fields", None)
+        rows.append(row)
+    return rows
+
+
+def to_dataframe(records: list):
+    """Return the records as a pandas DataFrame."""
+    import pandas as pd
+    return pd.DataFrame(as_rows(records))
@@ -0,0 +1,282 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from graphlib import CycleError, TopologicalSorter
+
+from core.docker_automation.docker_runner import DOCKER_COMMANDS
+from core.linux_tools.async_runner import AsyncSSHExecutor, run_sync
+from core.linux_tools.bash_runner import COMMANDS
+
+DEFAULT_MAX_CONCURRENCY = 32
+
+TASK_KINDS = ("command", "docker", "script")
+
+EXAMPLE_PLAN = """[
+  {"name": "pull", "kind": "docker", "spec": "Pull Image", "args": {"image": "nginx:latest"}},
+  {"name": "stop", "kind": "docker", "spec": "Stop Container", "args": {"name": "web"},
+   "depends_on": ["pull"], "batch_size": 2},
+  {"name": "start", "kind": "docker", "spec": "Start Container", "args": {"name": "web"},
+   "depends_on": ["stop"], "batch_size": 2},
+  {"name": "verify", "kind": "script", "spec": "curl -fsS http://localhost/ > /dev/null",
+   "depends_on": ["start"]},
+  {"name": "uptime", "kind": "command", "spec": "System Uptime"}
+]"""
+
+
+@dataclass
+class Task:
+    """
+    One node of the orchestration DAG.
+
+    ``kind`` selects how ``spec`` is interpreted: a ``bash_runner.COMMANDS`` key
+    ("command"), a ``docker_runner.DOCKER_COMMANDS`` label with ``args``
+    ("docker"), or a raw shell script ("script"). The task runs on ``hosts``
+    (default: the orchestrator's inventory), ``batch_size`` hosts at a time
+    when rolling; a failed batch stops the roll-out.
+    """
+    name: str
+    kind: str
+    spec: str
+    args: dict = field(default_factory=dict)
+    depends_on: list[str] = field(default_factory=list)
+    hosts: list[tuple[str, str]] | None = None
+    batch_size: int | None = None
+    timeout: float | None = None
+
+    def command(self) -> str:
+        if self.kind == "command":
+            return COMMANDS[self.spec]
+        if self.kind == "docker":
+            return DOCKER_COMMANDS[self.spec](self.args)
+        return self.spec
+
+
+@dataclass
+class NodeRun:
+    """Execution of one task on one host."""
+    task: str
+    host: str
+    status: str = "pending"   # "ok", "failed", "timeout" or "skipped"
+    start: float = 0.0
+    end: float = 0.0
+    output: str = ""
+    exit_status: int | None = None
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+
+@dataclass
+class TaskRun:
+    """Execution of one task across all of its hosts."""
+    name: str
+    status: str = "pending"   # "ok", "failed" or "skipped"
+    start: float = 0.0
+    end: float = 0.0
+    nodes: list[NodeRun] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+
+# JSON type of each optional task field, with how to describe it in errors.
+_FIELD_TYPES = {
+    "name": (str, "a string"),
+    "kind": (str, "a string"),
+    "spec": (str, "a string"),
+    "args": (dict, "an object"),
+    "depends_on": (list, "a list"),
+    "hosts": (list, "a list"),
+    "batch_size": (int, "an integer"),
+    "timeout": ((int, float), "a number"),
+}
+
+
+def load_plan(text: str) -> list[Task]:
+    """
+    Build tasks from a JSON list of task objects (see :data:`EXAMPLE_PLAN`).
+
+    Hosts, when given per task, are ``"user@host"`` strings.
+
+    Raises:
+        ValueError: If the JSON is malformed or a task is invalid.
+    """
+    try:
+        raw_tasks = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid plan JSON: {e}") from e
+    if not isinstance(raw_tasks, list):
+        raise ValueError("The plan must be a JSON list of tasks")
+
+    tasks = []
+    for index, raw in enumerate(raw_tasks, start=1):
+        if not isinstance(raw, dict):
+            raise ValueError(f"Task #{index} must be a JSON object, not {type(raw).__name__}")
+        raw = dict(raw)
+        name = raw.get("name", f"#{index}")
+        for key, expected in _FIELD_TYPES.items():
+            if key in raw and raw[key] is not None and not isinstance(raw[key], expected[0]):
+                raise ValueError(f"Invalid task {name}: '{key}' must be {expected[1]}")
+        for key in ("depends_on", "hosts"):
+            if not all(isinstance(item, str) for item in raw.get(key) or []):
+                raise ValueError(f"Invalid task {name}: '{key}' must be a list of strings")
+        if raw.get("hosts") is not None:
+            hosts = [tuple(h.rsplit("@", 1)) for h in raw["hosts"]]
+            bad = [h for h, target in zip(raw["hosts"], hosts) if len(target) != 2 or not all(target)]
+            if bad:
+                raise ValueError(f"Invalid task {name}: hosts must be 'user@host', got {', '.join(bad)}")
+            raw["hosts"] = hosts
+        try:
+            tasks.append(Task(**raw))
+        except TypeError as e:
+            raise ValueError(f"Invalid task {name}: {e}") from e
+    return tasks
+
+
+class Orchestrator:
+    """
+    Runs a DAG of tasks across hosts over the pooled SSH connections.
+
+    Tasks whose dependencies have all succeeded start immediately, so
+    independent branches run in parallel; ``max_concurrency`` caps the number
+    of remote commands in flight overall. When a task fails, everything that
+    depends on it is skipped while unrelated branches carry on. Every task and
+    node is timed, and :meth:`critical_path` reports the chain of tasks that
+    determined the total run time.
+    """
+
+    def __init__(self, tasks: list[Task], inventory: list[tuple[str, str]],
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        self.tasks = {task.name: task for task in tasks}
+        if len(self.tasks) != len(tasks):
+            raise ValueError("Task names must be unique")
+        self.inventory = list(inventory)
+        self.executor = AsyncSSHExecutor(max_concurrency=max_concurrency)
+        self.runs: dict[str, TaskRun] = {}
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        self.validate()
+
+    def validate(self) -> None:
+        """
+        Raises:
+            ValueError: On unknown dependencies, bad kinds or specs, batch sizes, or cycles.
+        """
+        for task in self.tasks.values():
+            if task.kind not in TASK_KINDS:
+                raise ValueError(f"Task '{task.name}': kind must be one of {', '.join(TASK_KINDS)}")
+            try:
+                task.command()
+            except KeyError as e:
+                raise ValueError(f"Task '{task.name}': unknown command or missing argument {e}") from e
+            for dep in task.depends_on:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task '{task.name}' depends on unknown task '{dep}'")
+            if not (task.hosts or self.inventory):
+                raise ValueError(f"Task '{task.name}' has no hosts")
+            if task.batch_size is not None and task.batch_size < 1:
+                raise ValueError(f"Task '{task.name}': batch_size must be at least 1")
+        try:
+            TopologicalSorter(self._graph()).prepare()
+        except CycleError as e:
+            raise ValueError(f"Dependency cycle: {' -> '.join(e.args[1])}") from e
+
+    def _graph(self) -> dict[str, list[str]]:
+        return {name: task.depends_on for name, task in self.tasks.items()}
+
+    async def _run_node(self, task: Task, command: str, user: str, host: str) -> NodeRun:
+        node = NodeRun(task.name, f"{user}@{host}", start=time.perf_counter())
+        try:
+            result = await self.executor.run(user, host, command, timeout=task.timeout, label=f"plan: {task.name}")
+            node.output = result.stdout + result.stderr
+            node.exit_status = result.exit_status
+            node.status = "timeout" if result.timed_out else ("ok" if result.exit_status == 0 else "failed")
+        except ConnectionError as e:
+            node.status, node.output = "failed", str(e)
+        node.end = time.perf_counter()
+        return node
+
+    async def _run_task(self, task: Task) -> TaskRun:
+        run = self.runs[task.name]
+        run.start = time.perf_counter()
+        hosts = task.hosts or self.inventory
+        batch_size = task.batch_size or len(hosts)
+        command = task.command()
+        for offset in range(0, len(hosts), batch_size):
+            batch = hosts[offset:offset + batch_size]
+            run.nodes += await asyncio.gather(*(self._run_node(task, command, u, h) for u, h in batch))
+            if any(node.status != "ok" for node in run.nodes):
+                # Rolling update: don't touch the remaining hosts after a failure.
+                run.nodes += [NodeRun(task.name, f"{u}@{h}", status="skipped")
+                              for u, h in hosts[offset + batch_size:]]
+                break
+        run.status = "ok" if all(node.status == "ok" for node in run.nodes) else "failed"
+        run.end = time.perf_counter()
+        return run
+
+    async def run_async(self) -> dict[str, TaskRun]:
+        """Execute the whole DAG; returns the per-task runs keyed by task name."""
+        self.runs = {name: TaskRun(name) for name in self.tasks}
+        self.started_at = time.perf_counter()
+        sorter = TopologicalSorter(self._graph())
+        sorter.prepare()
+        pending: dict[asyncio.Task, str] = {}
+
+        while sorter.is_active():
+            for name in sorter.get_ready():
+                deps = self.tasks[name].depends_on
+                if any(self.runs[dep].status != "ok" for dep in deps):
+                    self.runs[name].status = "skipped"
+                    sorter.done(name)
+                    continue
+                pending[asyncio.ensure_future(self._run_task(self.tasks[name]))] = name
+            if not pending:
+                continue
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                sorter.done(pending.pop(finished))
+
+        self.finished_at = time.perf_counter()
+        return self.runs
+
+    def run(self) -> dict[str, TaskRun]:
+        """Synchronous wrapper around :meth:`run_async`."""
+        return run_sync(self.run_async())
+
+    def critical_path(self) -> tuple[list[str], float]:
+        """
+        Longest chain of dependent tasks by measured duration.
+
+        Returns:
+            tuple: ``(task_names, seconds)`` ordered from first to last task
+        """
+        longest: dict[str, tuple[float, list[str]]] = {}
+        for name in TopologicalSorter(self._graph()).static_order():
+            run = self.runs.get(name)
+            duration = run.duration if run else 0.0
+            best = max((longest[dep] for dep in self.tasks[name].depends_on),
+                       key=lambda item: item[0], default=(0.0, []))
+            longest[name] = (best[0] + duration, best[1] + [name])
+        if not longest:
+            return [], 0.0
+        total, path = max(longest.values(), key=lambda item: item[0])
+        return path, total
+
+    def report(self) -> list[dict]:
+        """One row per task: status, offsets from the start and critical-path membership."""
+        path, _ = self.critical_path()
+        rows = []
+        for name, run in self.runs.items():
+            rows.append({
+                "task": name,
+                "status": run.status,
+                "hosts": len(run.nodes),
+                "failed_hosts": sum(1 for node in run.nodes if node.status not in ("ok", "skipped")),
+                "start_s": round(run.start - self.started_at, 2) if run.start else None,
+                "duration_s": round(run.duration, 2),
+                "critical_path": name in path,
+            })
+        return rows
@@ -0,0 +1,508 @@
+import hashlib
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+from core.linux_tools.history import JOURNAL, CommandJournal
+
+# Disable strict host key checking and auto-accept new host keys
+# -o UserKnownHostsFile=/dev/null - don't save host keys (optional, removes the prompt)
+# -o StrictHostKeyChecking=no - automatically accept new host keys
+# -o LogLevel=ERROR - reduce log verbosity
+SSH_OPTIONS = [
+    "-o", "StrictHostKeyChecking=no",
+    "-o", "UserKnownHostsFile=/dev/null",
+    "-o", "LogLevel=ERROR",
+]
+
+# OpenSSH on Windows has no ControlMaster support, so every command falls back
+# to a fresh connection there.
+MULTIPLEXING_SUPPORTED = os.name != "nt"
+
+DEFAULT_IDLE_TIMEOUT = 300  # seconds a master connection may sit unused
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_STREAM_BUFFER = 1000  # unread lines kept in memory while streaming
+
+
+@dataclass
+class CommandResult:
+    """Outcome of a single remote command."""
+    user: str
+    host: str
+    command: str
+    stdout: str = ""
+    stderr: str = ""
+    exit_status: int | None = None
+    handshake_time: float = 0.0  # seconds spent opening a new master connection
+    exec_time: float = 0.0       # seconds spent running the command itself
+    reused: bool = False         # True when an existing master connection was used
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_status == 0 and not self.timed_out
+
+    @property
+    def total_time(self) -> float:
+        return self.handshake_time + self.exec_time
+
+
+@dataclass
+class _Connection:
+    socket_path: str
+    created: float
+    last_used: float
+
+
+class SSHPool:
+    """
+    Pool of authenticated SSH master connections keyed by ``(user, host)``.
+
+    Each entry is an OpenSSH ControlMaster socket. The first command against a
+    host pays the TCP + key-exchange + auth handshake; every following command
+    is multiplexed over the open master and only pays for its own execution.
+    Masters that stay unused for longer than ``idle_timeout`` seconds are closed
+    (both by :meth:`evict_idle` and by OpenSSH's own ``ControlPersist``); a
+    master that is held (see :meth:`hold`) is never idle, however long its
+    streams or forwarded sockets stay quiet.
+
+    The pool lives at module level (see :data:`POOL`), so connections survive
+    Streamlit reruns of ``app.py`` for as long as the server process runs.
+    Every command run or streamed through it is recorded in ``journal``.
+    """
+
+    def __init__(self, idle_timeout: int = DEFAULT_IDLE_TIMEOUT,
+                 connect_timeout: int = DEFAULT_CONNECT_TIMEOUT,
+                 control_dir: str | None = None,
+                 journal: CommandJournal | None = None):
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.journal = journal
+        self.control_dir = control_dir or os.path.join(tempfile.gettempdir(), "commandhub-ssh")
+        self._connections: dict[tuple[str, str], _Connection] = {}
+        self._host_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._holds: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Connection management
+    # ------------------------------------------------------------------ #
+    def _socket_path(self, user: str, host: str) -> str:
+        # Unix socket paths are limited to ~100 bytes, so hash the key.
+        digest = hashlib.sha1(f"{user}@{host}".encode()).hexdigest()[:16]
+        return os.path.join(self.control_dir, f"cm-{digest}.sock")
+
+    def _host_lock(self, key: tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._host_locks.setdefault(key, threading.Lock())
+
+    def _is_alive(self, socket_path: str, user: str, host: str) -> bool:
+        if not os.path.exists(socket_path):
+            return False
+        check = subprocess.run(
+            self.check_argv(user, host),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        return check.returncode == 0
+
+    def master_argv(self, user: str, host: str) -> list[str]:
+        """Return the argv that opens a backgrounded master connection."""
+        return [
+            "ssh", *SSH_OPTIONS,
+            "-o", f"ConnectTimeout={self.connect_timeout}",
+            "-o", f"ControlPersist={self.idle_timeout}",
+            "-M", "-S", self._socket_path(user, host),
+            "-N", "-f", f"{user}@{host}",
+        ]
+
+    def connect(self, user: str, host: str) -> tuple[bool, float]:
+        """
+        Make sure a live master connection exists for ``user@host``.
+
+        Returns:
+            tuple: ``(reused, handshake_time)``; ``handshake_time`` is 0 when an
+            existing connection was reused.
+
+        Raises:
+            ConnectionError: If the master connection could not be established.
+        """
+        key = (user, host)
+        if not MULTIPLEXING_SUPPORTED:
+            return False, 0.0
+
+        with self._host_lock(key):
+            if self.is_fresh(user, host):
+                return True, 0.0
+
+            socket_path = self._socket_path(user, host)
+            if self._is_alive(socket_path, user, host):
+                # Master kept open by ControlPersist or left over from an
+                # earlier process - adopt it instead of reconnecting.
+                self.register(user, host)
+                return True, 0.0
+
+            self.prepare_master(user, host)
+
+            # stderr goes to a file, not a pipe: the backgrounded master keeps
+            # its inherited descriptors open on older OpenSSH releases, and a
+            # pipe would then never reach EOF.
+            with tempfile.TemporaryFile() as err:
+                start = time.perf_counter()
+                proc = subprocess.run(
+                    self.master_argv(user, host),
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=err,
+                )
+                handshake_time = time.perf_counter() - start
+                if proc.returncode != 0:
+                    err.seek(0)
+                    message = err.read().decode(errors="replace").strip()
+                    self._connections.pop(key, None)
+                    raise ConnectionError(message or f"ssh exited with status {proc.returncode}")
+
+            self.register(user, host)
+            return False, handshake_time
+
+    def is_fresh(self, user: str, host: str) -> bool:
+        """
+        Return True (and mark it used) if a known, recently used master exists.
+
+        This never spawns a process, so it is cheap enough to call before every
+        command; callers fall back to :meth:`connect` (or their own async
+        equivalent) when it returns False.
+        """
+        with self._lock:
+            conn = self._connections.get((user, host))
+            now = time.monotonic()
+            busy = (user, host) in self._holds
+            if conn and (busy or now - conn.last_used < self.idle_timeout) and os.path.exists(conn.socket_path):
+                conn.last_used = now
+                return True
+            return False
+
+    def prepare_master(self, user: str, host: str) -> None:
+        """Create the control directory and clear a stale socket before opening a master."""
+        os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+        socket_path = self._socket_path(user, host)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+    def register(self, user: str, host: str) -> None:
+        """Record that a live master connection now exists for ``user@host``."""
+        now = time.monotonic()
+        with self._lock:
+            self._connections[(user, host)] = _Connection(self._socket_path(user, host), now, now)
+
+    def check_argv(self, user: str, host: str) -> list[str]:
+        """Return the argv that asks an existing master whether it is still alive."""
+        return ["ssh", "-S", self._socket_path(user, host), "-O", "check", f"{user}@{host}"]
+
+    def forward_argv(self, user: str, host: str, local: str, remote: str, cancel: bool = False) -> list[str]:
+        """Return the argv that adds (or cancels) a ``-L local:remote`` forward on the existing master."""
+        return ["ssh", "-S", self._socket_path(user, host), "-O", "cancel" if cancel else "forward",
+                "-L", f"{local}:{remote}", f"{user}@{host}"]
+
+    def command_argv(self, user: str, host: str, command: str | None = None) -> list[str]:
+        """Return the argv that runs ``command`` over the pooled connection."""
+        argv = ["ssh", *SSH_OPTIONS, "-o", f"ConnectTimeout={self.connect_timeout}"]
+        if MULTIPLEXING_SUPPORTED:
+            # ControlMaster=no: never turn a command process into a master, but
+            # still fall back to a direct connection if the socket went away.
+            argv += ["-o", "ControlMaster=no", "-S", self._socket_path(user, host)]
+        argv.append(f"{user}@{host}")
+        if command:
+            argv.append(command)
+        return argv
+
+    def close(self, user: str, host: str) -> None:
+        """Close the master connection for ``user@host`` if one is open."""
+        key = (user, host)
+        with self._host_lock(key):
+            conn = self._connections.pop(key, None)
+            socket_path = conn.socket_path if conn else self._socket_path(user, host)
+            if MULTIPLEXING_SUPPORTED and os.path.exists(socket_path):
+                subprocess.run(
+                    ["ssh", "-S", socket_path, "-O", "exit", f"{user}@{host}"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+
+    def evict_idle(self) -> list[tuple[str, str]]:
+        """Close every master that has been idle longer than ``idle_timeout``."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [key for key, conn in self._connections.items()
+                    if now - conn.last_used >= self.idle_timeout and key not in self._holds]
+        for user, host in idle:
+            self.close(user, host)
+        return idle
+
+    def close_all(self) -> None:
+        with self._lock:
+            keys = list(self._connections)
+        for user, host in keys:
+            self.close(user, host)
+
+    def stats(self) -> list[dict]:
+        """Describe the open connections (for display in the dashboard)."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "user": user,
+                    "host": host,
+                    "age_s": round(now - conn.created, 1),
+                    "idle_s": round(now - conn.last_used, 1),
+                    "active": self._holds.get((user, host), 0),
+                }
+                for (user, host), conn in self._connections.items()
+            ]
+
+    # ------------------------------------------------------------------ #
+    # Command execution
+    # ------------------------------------------------------------------ #
+    def record(self, user: str, host: str, command: str, result: CommandResult | None = None,
+               label: str | None = None, kind: str = "shell", args: dict | None = None,
+               stdin: bool = False, error: str = "") -> None:
+        """
+        Journal one run (``result`` is None when the host could not be reached).
+
+        ``label`` names what ran the command and defaults to the command
+        itself; ``stdin`` marks runs whose input is not journaled, so they
+        cannot be replayed.
+        """
+        if self.journal is None:
+            return
+        if stdin:
+            args = {**(args or {}), "stdin": True}
+        self.journal.record(kind, label or command, user, host, command, result, args=args, error=error)
+
+    def run(self, user: str, host: str, command: str, timeout: float | None = None,
+            input: str | None = None, label: str | None = None, kind: str = "shell",
+            args: dict | None = None, record: bool = True) -> CommandResult:
+        """
+        Run ``command`` on ``user@host`` over a pooled connection.
+
+        Args:
+            user (str): SSH username
+            host (str): Hostname or IP address
+            command (str): Shell command to run remotely
+            timeout (float, optional): Seconds to wait for the command to finish
+            input (str, optional): Text fed to the remote command's stdin
+            label (str, optional): Journal label, e.g. the ``COMMANDS`` key; defaults to ``command``
+            kind (str): Journal kind: ``"linux"``, ``"docker"`` or ``"shell"``
+            args (dict, optional): Arguments journaled with the run (for replay)
+            record (bool): Journal this run; off for high-frequency polling
+
+        Returns:
+            CommandResult: Output, exit status and the handshake/exec time split
+
+        Raises:
+            ConnectionError: If no connection to the host could be established.
+        """
+        self.evict_idle()
+        result = CommandResult(user=user, host=host, command=command)
+        try:
+            result.reused, result.handshake_time = self.connect(user, host)
+        except ConnectionError as e:
+            if record:
+                self.record(user, host, command, None, label, kind, args, input is not None, str(e))
+            raise
+
+        start = time.perf_counter()
+        try:
+            proc = subprocess.run(
+                self.command_argv(user, host, command),
+                stdin=subprocess.DEVNULL if input is None else None, input=input,
+                capture_output=True, text=True, errors="replace", timeout=timeout,
+            )
+            result.stdout, result.stderr, result.exit_status = proc.stdout, proc.stderr, proc.returncode
+        except subprocess.TimeoutExpired as e:
+            result.timed_out = True
+            result.stdout = e.stdout.decode(errors="replace") if isinstance(e.stdout, bytes) else (e.stdout or "")
+        finally:
+            result.exec_time = time.perf_counter() - start
+            self.touch(user, host)
+        if record:
+            self.record(user, host, command, result, label, kind, args, input is not None)
+        return result
+
+    def stream(self, user: str, host: str, command: str,
+               buffer_lines: int = DEFAULT_STREAM_BUFFER,
+               cancel_event: threading.Event | None = None,
+               label: str | None = None, kind: str = "shell", args: dict | None = None) -> "RemoteStream":
+        """
+        Start ``command`` on ``user@host`` and return a line-by-line stream of its output.
+
+        The run is journaled when the stream closes, with the time it was open
+        as its execution time.
+
+        Args:
+            user (str): SSH username
+            host (str): Hostname or IP address
+            command (str): Shell command to run remotely
+            buffer_lines (int): Maximum number of unread lines held in memory
+            cancel_event (threading.Event, optional): Set it to stop the command
+            label, kind, args: Journal fields, as for :meth:`run`
+
+        Returns:
+            RemoteStream: Iterable of ``(stream_name, line)`` tuples
+
+        Raises:
+            ConnectionError: If no connection to the host could be established.
+        """
+        self.evict_idle()
+        try:
+            reused, handshake_time = self.connect(user, host)
+        except ConnectionError as e:
+            self.record(user, host, command, None, label, kind, args, error=str(e))
+            raise
+        result = CommandResult(user=user, host=host, command=command, handshake_time=handshake_time,
+                               reused=reused)
+        start = time.perf_counter()
+
+        def on_close():
+            self.release(user, host)
+            result.exec_time = time.perf_counter() - start
+            result.exit_status = stream.exit_status
+            self.record(user, host, command, result, label, kind, args)
+
+        # A quiet stream (e.g. a follow with no new lines) must not look idle to evict_idle.
+        self.hold(user, host)
+        try:
+            stream = RemoteStream(self.command_argv(user, host, command), buffer_lines=buffer_lines,
+                                  cancel_event=cancel_event, on_close=on_close)
+        except BaseException:
+            self.release(user, host)
+            raise
+        stream.reused, stream.handshake_time = reused, handshake_time
+        return stream
+
+    def touch(self, user: str, host: str) -> None:
+        """Mark the master of ``user@host`` as just used."""
+        with self._lock:
+            conn = self._connections.get((user, host))
+            if conn:
+                conn.last_used = time.monotonic()
+
+    def hold(self, user: str, host: str) -> None:
+        """
+        Keep the master of ``user@host`` from being evicted until :meth:`release`.
+
+        Long-lived users of a master (streams, forwarded sockets) hold it for
+        their whole lifetime, since they may not touch it for minutes.
+        Holds are counted, so every call needs a matching release.
+        """
+        with self._lock:
+            self._holds[(user, host)] = self._holds.get((user, host), 0) + 1
+
+    def release(self, user: str, host: str) -> None:
+        """Drop one :meth:`hold`; the idle clock restarts now."""
+        with self._lock:
+            count = self._holds.pop((user, host), 0) - 1
+            if count > 0:
+                self._holds[(user, host)] = count
+        self.touch(user, host)
+
+
+class RemoteStream:
+    """
+    Incremental output of a running remote command.
+
+    Iterating yields ``("stdout" | "stderr", line)`` tuples as soon as the remote
+    side produces them. Two reader threads feed a queue of at most
+    ``buffer_lines`` entries; once it is full they stop reading, the pipe fills
+    up and ssh applies backpressure, so memory stays bounded no matter how
+    chatty the command is.
+
+    Call :meth:`cancel` (from any thread), set ``cancel_event``, or simply stop
+    iterating to terminate the remote command.
+    """
+
+    _EOF = object()
+
+    def __init__(self, argv: list[str], buffer_lines: int = DEFAULT_STREAM_BUFFER,
+                 cancel_event: threading.Event | None = None, on_close=None):
+        self.cancel_event = cancel_event or threading.Event()
+        self.exit_status: int | None = None
+        self.reused = False
+        self.handshake_time = 0.0
+        self._on_close = on_close
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, buffer_lines))
+        self._proc = subprocess.Popen(
+            argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, errors="replace", bufsize=1,
+        )
+        self._readers = [
+            threading.Thread(target=self._pump, args=(name, pipe), daemon=True)
+            for name, pipe in (("stdout", self._proc.stdout), ("stderr", self._proc.stderr))
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def _pump(self, name: str, pipe) -> None:
+        try:
+            for line in pipe:
+                while not self.cancel_event.is_set():
+                    try:
+                        self._queue.put((name, line.rstrip("\n")), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if self.cancel_event.is_set():
+                    return
+        finally:
+            # Always deliver the EOF marker so the consumer can finish.
+            while True:
+                try:
+                    self._queue.put(self._EOF, timeout=0.1)
+                    return
+                except queue.Full:
+                    if self.cancel_event.is_set():
+                        return
+
+    def __iter__(self):
+        finished = 0
+        try:
+            while finished < len(self._readers) and not self.cancel_event.is_set():
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is self._EOF:
+                    finished += 1
+                    continue
+                yield item
+        finally:
+            if finished < len(self._readers):
+                # Abandoned or cancelled mid-way: unblock the readers too.
+                self.cancel_event.set()
+            self.close()
+
+    def cancel(self) -> None:
+        """Stop the remote command; iteration ends at the next line."""
+        self.cancel_event.set()
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            if self.cancel_event.is_set():
+                self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+        self.exit_status = self._proc.returncode
+        if self._on_close:
+            self._on_close()
+            self._on_close = None
+
+
+# Shared pool used by bash_runner and the rest of the dashboard.
+POOL = SSHPool(journal=JOURNAL)
@@ -0,0 +1,75 @@
+import time
+from dataclasses import dataclass
+
+from core.linux_tools.bash_runner import COMMANDS
+from core.linux_tools.cache import TTLCache
+from core.linux_tools.parsers import PARSERS
+from core.linux_tools.ssh_pool import POOL, CommandResult
+
+DEFAULT_INFO_TTL = 30  # seconds
+
+# (user, host, choice) -> SystemInfo
+INFO_CACHE = TTLCache(ttl=DEFAULT_INFO_TTL)
+
+
+@dataclass
+class SystemInfo:
+    """Parsed output of a read-only system-info command."""
+    choice: str
+    records: list
+    result: CommandResult
+    fetched_at: float  # time.time() of the SSH round trip
+
+
+def is_parseable(choice: str) -> bool:
+    return choice in PARSERS
+
+
+def get_system_info(choice: str, user: str, ip: str, refresh: bool = False,
+                    ttl: float | None = None) -> tuple[SystemInfo, bool]:
+    """
+    Fetch and parse a system-info command, serving repeated calls from the cache.
+
+    Only successful results are cached, so a failing host is retried on the
+    next call.
+
+    Args:
+        choice (str): A key of ``bash_runner.COMMANDS`` that has a parser in ``PARSERS``
+        user (str): SSH username
+        ip (str): Hostname or IP address
+        refresh (bool): Skip the cache and always contact the host
+        ttl (float, optional): Cache lifetime for this result; defaults to ``INFO_CACHE.ttl``
+
+    Returns:
+        tuple: ``(info, cached)`` where ``cached`` is True if no SSH round trip was made
+
+    Raises:
+        KeyError: If ``choice`` has no parser.
+        ConnectionError: If the host could not be reached.
+    """
+    parser = PARSERS[choice]
+    key = (user, ip, choice)
+    if not refresh:
+        info = INFO_CACHE.get(key)
+        if info is not None:
+            return info, True
+
+    result = POOL.run(user, ip, COMMANDS[choice], label=choice, kind="linux")
+    info = SystemInfo(choice, parser(result.stdout) if result.ok else [], result, time.time())
+    if result.ok:
+        INFO_CACHE.set(key, info, ttl)
+    return info, False
+
+
+def invalidate(user: str | None = None, ip: str | None = None, choice: str | None = None) -> int:
+    """
+    Drop cached system info; omitted arguments match everything.
+
+    Returns:
+        int: Number of cache entries removed
+    """
+    return INFO_CACHE.invalidate(predicate=lambda key: (
+        (user is None or key[0] == user)
+        and (ip is None or key[1] == ip)
+        and (choice is None or key[2] == choice)
+    ))
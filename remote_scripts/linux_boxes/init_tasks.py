@@ -0,0 +1,308 @@
+"""Idempotent bootstrap runner for Linux boxes.
+
+Gathers host facts once, caches them locally under a fingerprint, and only
+applies the init steps whose preconditions are not already satisfied, so
+re-running the bootstrap against a configured fleet is mostly a no-op.
+
+Run from the project root:
+
+    python -m remote_scripts.linux_boxes.init_tasks root@10.0.0.5 root@10.0.0.6 --dry-run
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+import shlex
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+from core.linux_tools.async_runner import EXECUTOR, run_sync
+from core.linux_tools.bash_runner import build_batch_script, split_batch_output
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_FACTS_PATH = os.path.join(PROJECT_ROOT, "data", "host_facts.json")
+DEFAULT_TIMEOUT = 600  # seconds per apply command (package installs can be slow)
+
+# Cheap probe whose hash changes whenever the facts below may have changed:
+# reboot, package database writes, or a change in running/enabled services.
+FINGERPRINT_COMMAND = (
+    "cat /proc/sys/kernel/random/boot_id 2>/dev/null; "
+    "stat -c '%n %Y' /var/lib/dpkg/status /var/lib/rpm /var/lib/pacman/local 2>/dev/null; "
+    "systemctl list-units --type=service --state=running --no-legend --plain 2>/dev/null | cut -d' ' -f1; "
+    "systemctl list-unit-files --type=service --state=enabled --no-legend 2>/dev/null | cut -d' ' -f1"
+)
+
+# Installed package names. dpkg also lists removed packages whose config files
+# remain (status "rc"), so only fully installed ("ii") entries are kept.
+PACKAGES_COMMAND = (
+    "({ command -v dpkg-query >/dev/null && dpkg-query -W -f='${db:Status-Abbrev} ${Package}\\n' 2>/dev/null "
+    "| awk '$1 == \"ii\" { print $2 }'; } || rpm -qa --qf '%{NAME}\\n' 2>/dev/null "
+    "|| pacman -Qq 2>/dev/null) | sort -u"
+)
+
+# Full fact gathering, sections separated by "---" lines.
+FACTS_COMMAND = (
+    ". /etc/os-release 2>/dev/null; echo \"$ID $VERSION_ID\"; echo ---; "
+    "for pm in apt-get dnf yum zypper pacman; do command -v $pm >/dev/null && { echo $pm; break; }; done; echo ---; "
+    f"{PACKAGES_COMMAND}; echo ---; "
+    "systemctl list-units --type=service --state=running --no-legend --plain 2>/dev/null | cut -d' ' -f1; echo ---; "
+    "systemctl list-unit-files --type=service --state=enabled --no-legend 2>/dev/null | cut -d' ' -f1; echo ---; "
+    "id -u"
+)
+
+INSTALL_COMMANDS = {
+    "apt-get": "DEBIAN_FRONTEND=noninteractive apt-get install -y",
+    "dnf": "dnf install -y",
+    "yum": "yum install -y",
+    "zypper": "zypper --non-interactive install",
+    "pacman": "pacman -S --noconfirm --needed",
+}
+
+
+@dataclass
+class HostFacts:
+    os: str
+    package_manager: str
+    packages: list[str]
+    running_services: list[str]
+    enabled_services: list[str]
+    is_root: bool
+    fingerprint: str = ""
+    gathered_at: float = 0.0
+
+
+@dataclass
+class InitStep:
+    """
+    One bootstrap step.
+
+    A step is satisfied, and skipped, when all of its preconditions hold:
+    ``packages`` are installed, ``services`` are enabled and running, and the
+    optional ``check`` shell command exits 0. Package and service steps need
+    no ``apply`` command; it is derived from the facts.
+    """
+    name: str
+    packages: list[str] = field(default_factory=list)
+    services: list[str] = field(default_factory=list)
+    check: str | None = None
+    apply: str | None = None
+
+
+@dataclass
+class StepResult:
+    host: str
+    step: str
+    status: str        # "satisfied", "applied", "failed", "pending" (dry run) or "blocked"
+    duration: float = 0.0
+    output: str = ""
+
+
+DEFAULT_STEPS = [
+    InitStep("base packages", packages=["curl", "git", "htop"]),
+    InitStep("workspace directory", check="test -d /opt/commandhub", apply="mkdir -p /opt/commandhub"),
+    InitStep("utc timezone", check='[ "$(date +%Z)" = UTC ]', apply="timedatectl set-timezone UTC"),
+]
+
+
+class FactCache:
+    """Host facts persisted as JSON, keyed by ``user@host``."""
+
+    def __init__(self, path: str = DEFAULT_FACTS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._facts: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._facts = json.load(f)
+
+    def get(self, key: str) -> HostFacts | None:
+        with self._lock:
+            raw = self._facts.get(key)
+        return HostFacts(**raw) if raw else None
+
+    def set(self, key: str, facts: HostFacts) -> None:
+        with self._lock:
+            self._facts[key] = asdict(facts)
+            self._save()
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if self._facts.pop(key, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        # Caller holds the lock.
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._facts, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def parse_facts(output: str) -> HostFacts:
+    sections = [section.strip() for section in output.split("---\n")]
+    if len(sections) < 6:
+        raise ValueError("incomplete facts output")
+    return HostFacts(
+        os=sections[0],
+        package_manager=sections[1],
+        packages=sections[2].split(),
+        running_services=sections[3].split(),
+        enabled_services=sections[4].split(),
+        is_root=sections[5] == "0",
+        gathered_at=time.time(),
+    )
+
+
+async def gather_facts(user: str, host: str, cache: FactCache, refresh: bool = False) -> tuple[HostFacts, bool]:
+    """
+    Return the facts of ``user@host``, from the cache when its fingerprint still matches.
+
+    Returns:
+        tuple: ``(facts, cached)``
+
+    Raises:
+        ConnectionError: If the host cannot be reached or fact gathering fails.
+    """
+    key = f"{user}@{host}"
+    probe = await EXECUTOR.run(user, host, FINGERPRINT_COMMAND, label="init: fingerprint")
+    if probe.exit_status is None or probe.exit_status == 255:
+        raise ConnectionError(probe.stderr.strip() or f"cannot reach {key}")
+    fingerprint = hashlib.sha256(probe.stdout.encode()).hexdigest()
+
+    cached = cache.get(key)
+    if cached and cached.fingerprint == fingerprint and not refresh:
+        return cached, True
+
+    result = await EXECUTOR.run(user, host, FACTS_COMMAND, label="init: facts")
+    if not result.ok:
+        raise ConnectionError(result.stderr.strip() or f"fact gathering failed on {key}")
+    facts = parse_facts(result.stdout)
+    facts.fingerprint = fingerprint
+    cache.set(key, facts)
+    return facts, False
+
+
+def _services_ok(step: InitStep, facts: HostFacts) -> bool:
+    return all(s in facts.running_services and s in facts.enabled_services for s in step.services)
+
+
+def _apply_command(step: InitStep, facts: HostFacts) -> str:
+    commands = []
+    missing = [p for p in step.packages if p not in facts.packages]
+    if missing:
+        install = INSTALL_COMMANDS.get(facts.package_manager)
+        if not install:
+            raise ValueError(f"no supported package manager for {', '.join(missing)}")
+        commands.append(f"{install} {' '.join(shlex.quote(p) for p in missing)}")
+    for service in step.services:
+        if not _services_ok(InitStep(step.name, services=[service]), facts):
+            commands.append(f"systemctl enable --now {shlex.quote(service)}")
+    if step.apply:
+        commands.append(step.apply)
+    command = " && ".join(commands)
+    if not facts.is_root:
+        command = f"sudo -n sh -c {shlex.quote(command)}"
+    return command
+
+
+async def bootstrap_host(user: str, host: str, steps: list[InitStep], cache: FactCache,
+                         dry_run: bool = False, refresh_facts: bool = False) -> list[StepResult]:
+    """
+    Bring one host in line with ``steps``, skipping everything already in place.
+
+    Preconditions that can be answered from the facts cost nothing; all
+    remaining ``check`` commands are evaluated together in a single round trip.
+    Steps are applied in order and the first failure blocks the rest.
+    """
+    key = f"{user}@{host}"
+    try:
+        facts, _ = await gather_facts(user, host, cache, refresh=refresh_facts)
+    except ConnectionError as e:
+        return [StepResult(key, step.name, "failed" if i == 0 else "blocked", output=str(e))
+                for i, step in enumerate(steps)]
+
+    satisfied = [
+        all(p in facts.packages for p in step.packages) and _services_ok(step, facts)
+        for step in steps
+    ]
+    to_check = [i for i, step in enumerate(steps) if satisfied[i] and step.check]
+    if to_check:
+        nonce = secrets.token_hex(8)
+        script = build_batch_script([steps[i].check for i in to_check], nonce)
+        checks = await EXECUTOR.run(user, host, "sh -s", input=script, label="init: checks")
+        for i, (_, exit_status) in zip(to_check, split_batch_output(checks.stdout, len(to_check), nonce)):
+            satisfied[i] = exit_status == 0
+
+    results = []
+    changed = blocked = False
+    for step, ok in zip(steps, satisfied):
+        if ok:
+            results.append(StepResult(key, step.name, "satisfied"))
+        elif blocked:
+            results.append(StepResult(key, step.name, "blocked"))
+        elif dry_run:
+            results.append(StepResult(key, step.name, "pending"))
+        else:
+            try:
+                command = _apply_command(step, facts)
+            except ValueError as e:
+                results.append(StepResult(key, step.name, "failed", output=str(e)))
+                blocked = True
+                continue
+            applied = await EXECUTOR.run(user, host, command, timeout=DEFAULT_TIMEOUT, label=f"init: {step.name}")
+            changed = True
+            results.append(StepResult(key, step.name, "applied" if applied.ok else "failed",
+                                      applied.exec_time, applied.stdout + applied.stderr))
+            blocked = not applied.ok
+
+    if changed:
+        # Packages/services may have changed; gather afresh next time.
+        cache.invalidate(key)
+    return results
+
+
+def bootstrap_fleet(inventory: list[tuple[str, str]], steps: list[InitStep] = DEFAULT_STEPS,
+                    dry_run: bool = False, facts_path: str = DEFAULT_FACTS_PATH,
+                    refresh_facts: bool = False) -> list[StepResult]:
+    """
+    Run :func:`bootstrap_host` on every host concurrently.
+
+    Returns:
+        list: StepResults of all hosts, grouped by host in inventory order
+    """
+    cache = FactCache(facts_path)
+
+    async def run_all():
+        per_host = await asyncio.gather(*(
+            bootstrap_host(user, host, steps, cache, dry_run=dry_run, refresh_facts=refresh_facts)
+            for user, host in inventory
+        ))
+        return [result for results in per_host for result in results]
+
+    return run_sync(run_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Idempotently bootstrap Linux boxes over SSH.")
+    parser.add_argument("hosts", nargs="+", help="Targets as user@host")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which steps would run")
+    parser.add_argument("--refresh-facts", action="store_true", help="Ignore cached host facts")
+    parser.add_argument("--facts", default=DEFAULT_FACTS_PATH, help="Path of the fact cache")
+    args = parser.parse_args()
+
+    inventory = [tuple(target.rsplit("@", 1)) for target in args.hosts]
+    start = time.perf_counter()
+    for result in bootstrap_fleet(inventory, dry_run=args.dry_run, facts_path=args.facts,
+                                  refresh_facts=args.refresh_facts):
+        print(f"{result.host:30} {result.step:25} {result.status:10} {result.duration:6.1f}s")
+        if result.status == "failed" and result.output:
+            print(f"    {result.output.strip()}")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.linux_tools import async_runner
+from core.linux_tools.async_runner import AsyncSSHExecutor, run_sync
+
+
+class FakePool:
+    """Stands in for SSHPool: connect() is slow and must run once per host, under the pool's host lock."""
+
+    def __init__(self):
+        self.connected: set[tuple[str, str]] = set()
+        self.connect_threads: list[str] = []
+        self.host_lock = threading.Lock()
+
+    def is_fresh(self, user, host):
+        return (user, host) in self.connected
+
+    def connect(self, user, host):
+        with self.host_lock:
+            self.connect_threads.append(threading.current_thread().name)
+            time.sleep(0.05)
+            self.connected.add((user, host))
+            return False, 0.05
+
+
+@pytest.fixture(autouse=True)
+def multiplexing(monkeypatch):
+    monkeypatch.setattr(async_runner, "MULTIPLEXING_SUPPORTED", True)
+
+
+def test_connect_goes_through_the_pool_once_per_host():
+    pool = FakePool()
+    executor = AsyncSSHExecutor(pool=pool)
+
+    async def connect_many():
+        return await asyncio.gather(*(executor.connect("root", "web1") for _ in range(20)))
+
+    outcomes = run_sync(connect_many())
+
+    assert len(pool.connect_threads) == 1
+    assert threading.main_thread().name not in pool.connect_threads    # the event loop is not blocked
+    assert outcomes.count((False, 0.05)) == 1 and outcomes.count((True, 0.0)) == 19
+
+
+def test_connect_reuses_a_fresh_master():
+    pool = FakePool()
+    pool.connected.add(("root", "web1"))
+
+    assert run_sync(AsyncSSHExecutor(pool=pool).connect("root", "web1")) == (True, 0.0)
+    assert pool.connect_threads == []
+
+
+def test_run_sync_inside_a_running_loop():
+    async def outer():
+        return run_sync(asyncio.sleep(0, result="inner"))
+
+    assert run_sync(outer()) == "inner"
@@ -0,0 +1,45 @@
+import shutil
+import subprocess
+
+import pytest
+
+from core.linux_tools.bash_runner import build_batch_script, format_result, split_batch_output
+from core.linux_tools.ssh_pool import CommandResult
+
+NONCE = "0123456789abcdef"
+
+
+@pytest.mark.skipif(shutil.which("sh") is None, reason="needs a POSIX shell")
+def test_batch_script_round_trip_through_sh():
+    commands = ["echo one; echo two", "echo oops >&2; false", "printf 'no newline'", "cat", "(exit 3)"]
+
+    output = subprocess.run(["sh", "-s"], input=build_batch_script(commands, NONCE),
+                            capture_output=True, text=True).stdout
+
+    assert split_batch_output(output, len(commands), NONCE) == [
+        ("one\ntwo\n", 0),
+        ("oops\n", 1),
+        ("no newline", 0),
+        ("", 0),            # stdin is /dev/null, so cat does not eat the rest of the script
+        ("", 3),
+    ]
+
+
+def test_split_batch_output_of_a_truncated_batch():
+    output = (f"__CH_{NONCE}_BEGIN_0__\nfirst\n\n__CH_{NONCE}_END_0__ 0\n"
+              f"__CH_{NONCE}_BEGIN_1__\npartial output")
+
+    assert split_batch_output(output, 3, NONCE) == [("first\n", 0), ("partial output", None), ("", None)]
+
+
+def test_split_batch_output_ignores_markers_with_another_nonce():
+    output = "__CH_ffffffffffffffff_BEGIN_0__\nspoofed\n\n__CH_ffffffffffffffff_END_0__ 0\n"
+
+    assert split_batch_output(output, 1, NONCE) == [("", None)]
+
+
+def test_format_result():
+    result = CommandResult("root", "web1", "uptime", stdout="up 3 days\n", exit_status=0)
+    assert format_result(result) == "up 3 days\n"
+    result.exit_status = 2
+    assert format_result(result).startswith("❌ Command failed with status 2")
@@ -0,0 +1,85 @@
+import pytest
+
+from core.docker_automation.bulk_ops import container_name, parse_label_selector, run_bulk, select_containers
+from core.docker_automation.docker_api import DockerAPIError
+
+CONTAINERS = [
+    {"Id": "a" * 64, "Names": ["/web-1"], "State": "running", "Labels": {"app": "web", "tier": "front"}},
+    {"Id": "b" * 64, "Names": ["/web-2"], "State": "exited", "Labels": {"app": "web"}},
+    {"Id": "c" * 64, "Names": ["/db"], "State": "running", "Labels": {"app": "db", "tier": "back"}},
+    {"Id": "d" * 64, "Names": [], "State": "created", "Labels": None},
+]
+
+
+def _names(containers):
+    return [container_name(c) for c in containers]
+
+
+def test_select_by_names_glob_and_labels():
+    assert _names(select_containers(CONTAINERS, names=["db", "web-2", "missing"])) == ["web-2", "db"]
+    assert _names(select_containers(CONTAINERS, pattern="web-*")) == ["web-1", "web-2"]
+    assert _names(select_containers(CONTAINERS, pattern="WEB-*")) == []        # case-sensitive
+    assert _names(select_containers(CONTAINERS, labels=["tier"])) == ["web-1", "db"]
+    assert _names(select_containers(CONTAINERS, labels=["app=web", "tier=front"])) == ["web-1"]
+    assert _names(select_containers(CONTAINERS, labels=["app=we"])) == []
+    assert _names(select_containers(CONTAINERS, names=[])) == []
+    assert _names(select_containers(CONTAINERS)) == ["web-1", "web-2", "db", "d" * 12]
+
+
+def test_all_criteria_must_match():
+    assert _names(select_containers(CONTAINERS, pattern="web-*", labels=["tier"])) == ["web-1"]
+    assert _names(select_containers(CONTAINERS, names=["db"], pattern="web-*")) == []
+
+
+def test_parse_label_selector():
+    assert parse_label_selector(" app=web, tier ,,") == ["app=web", "tier"]
+    assert parse_label_selector("") == []
+    with pytest.raises(ValueError):
+        parse_label_selector("=web")
+
+
+class FakeClient:
+    def __init__(self, failing: set[str] = frozenset()):
+        self.calls = []
+        self.failing = failing
+
+    def _call(self, action, container_id):
+        self.calls.append((action, container_id[0]))
+        if container_id[0] in self.failing:
+            raise DockerAPIError(409, "conflict")
+
+    def start(self, container_id):
+        self._call("start", container_id)
+
+    def stop(self, container_id, timeout=None):
+        self._call("stop", container_id)
+
+    def restart(self, container_id, timeout=None):
+        self._call("restart", container_id)
+
+    def remove(self, container_id, force=False):
+        self._call("remove", container_id)
+
+
+@pytest.mark.parametrize("action, skipped, called", [
+    ("start", {"web-1", "db"}, {"b", "d"}),
+    ("stop", {"web-2", "d" * 12}, {"a", "c"}),
+    ("restart", set(), {"a", "b", "c", "d"}),
+    ("remove", set(), {"a", "b", "c", "d"}),
+])
+def test_containers_already_in_the_target_state_are_skipped(action, skipped, called):
+    client = FakeClient()
+
+    outcomes = {o.container: o for o in run_bulk(client, action, CONTAINERS)}
+
+    assert {name for name, o in outcomes.items() if o.status == "skipped"} == skipped
+    assert {container for _, container in client.calls} == called
+
+
+def test_failures_are_reported_per_container():
+    outcomes = {o.container: o for o in run_bulk(FakeClient(failing={"b"}), "start", CONTAINERS)}
+
+    assert outcomes["web-2"].status == "failed" and "conflict" in outcomes["web-2"].error
+    assert outcomes["d" * 12].status == "ok"
+    with pytest.raises(ValueError):
+        list(run_bulk(FakeClient(), "pause", CONTAINERS))
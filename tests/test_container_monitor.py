@@ -0,0 +1,91 @@
+import time
+
+from core.docker_automation import container_monitor
+from core.docker_automation.container_monitor import ContainerMonitor, ContainerSample, parse_stats
+
+GIB = 1 << 30
+
+
+def stats_frame(cpu_total: int, system_total: int, mem_usage: int = GIB, cache: int = 0) -> dict:
+    """A /containers/{id}/stats document; precpu is the previous second at zero usage."""
+    return {
+        "cpu_stats": {"cpu_usage": {"total_usage": cpu_total}, "system_cpu_usage": system_total, "online_cpus": 4},
+        "precpu_stats": {"cpu_usage": {"total_usage": 0}, "system_cpu_usage": 0},
+        "memory_stats": {"usage": mem_usage, "limit": 4 * GIB, "stats": {"inactive_file": cache}},
+        "networks": {"eth0": {"rx_bytes": 100, "tx_bytes": 50}, "eth1": {"rx_bytes": 1, "tx_bytes": 2}},
+        "blkio_stats": {"io_service_bytes_recursive": [{"op": "Read", "value": 7}, {"op": "write", "value": 3}]},
+    }
+
+
+def sample(cpu_percent: float, ts: float | None = None) -> ContainerSample:
+    return ContainerSample(ts if ts is not None else time.time(), cpu_percent, 0, 0, 0.0, 0, 0, 0, 0)
+
+
+def test_parse_stats_matches_docker_stats():
+    parsed = parse_stats(stats_frame(cpu_total=50, system_total=100, mem_usage=2 * GIB, cache=GIB), ts=1.0)
+
+    assert parsed.cpu_percent == 200.0          # half of the host's CPU time on 4 CPUs
+    assert (parsed.mem_bytes, parsed.mem_percent) == (GIB, 25.0)
+    assert (parsed.net_rx_bytes, parsed.net_tx_bytes) == (101, 52)
+    assert (parsed.blk_read_bytes, parsed.blk_write_bytes) == (7, 3)
+    assert parse_stats(stats_frame(cpu_total=0, system_total=0)).cpu_percent == 0.0
+
+
+def test_sustained_average_opens_and_resolves_one_alert():
+    monitor = ContainerMonitor([("root", "web1")], thresholds={"cpu_percent": 50.0}, alert_window=60)
+
+    monitor.record("web1", "api", sample(90.0))
+    monitor.record("web1", "api", sample(90.0))     # still firing: no second alert
+    monitor.record("web1", "api", sample(0.0))      # average 60: still firing
+    assert [(a.value, a.resolved) for a in monitor.alerts] == [(90.0, False)]
+    assert monitor.summary()[0]["alert"] is True
+
+    monitor.record("web1", "api", sample(0.0))      # average 45: resolved
+    assert [(a.value, a.resolved) for a in monitor.alerts] == [(90.0, False), (45.0, True)]
+    assert monitor.summary()[0]["alert"] is False
+
+
+def test_samples_outside_the_window_do_not_keep_an_alert_open():
+    monitor = ContainerMonitor([("root", "web1")], thresholds={"cpu_percent": 50.0}, alert_window=10)
+
+    monitor.record("web1", "api", sample(95.0, ts=time.time() - 30))
+    assert list(monitor.alerts) == []               # the only sample is older than the window
+    monitor.record("web1", "api", sample(95.0))
+    monitor.record("web1", "api", sample(10.0))
+    assert [a.resolved for a in monitor.alerts] == [False]
+    assert monitor.rolling("web1", "api", "cpu_percent", 10) == {"avg": 52.5, "peak": 95.0, "last": 10.0,
+                                                                 "count": 2}
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakeClient:
+    """Streams one stats frame per engine second, advancing the fake clock as it goes."""
+
+    def __init__(self, clock: FakeClock, frames: list[dict]):
+        self.clock = clock
+        self.frames = frames
+
+    def stream(self, path, params=None, timeout=None):
+        for frame in self.frames:
+            yield frame
+            self.clock.now += 1
+
+
+def test_stream_keeps_one_sample_per_interval(monkeypatch):
+    clock = FakeClock(1000.0)
+    monkeypatch.setattr(container_monitor.time, "time", clock.time)
+    monitor = ContainerMonitor([("root", "web1")], capacity=3, sample_interval=2, thresholds={})
+    frames = [stats_frame(cpu_total=i, system_total=100) for i in range(1, 10)]
+
+    monitor._stream_container(FakeClient(clock, frames), "web1", "api", "c" * 64)
+
+    kept = monitor.samples("web1", "api")
+    assert [s.ts for s in kept] == [1004.0, 1006.0, 1008.0]      # every other frame, capacity 3
+    assert [round(s.cpu_percent) for s in kept] == [20, 28, 36]
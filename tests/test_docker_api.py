@@ -0,0 +1,32 @@
+import io
+
+from core.docker_automation.docker_api import DockerAPIClient, DockerTunnel
+from core.linux_tools.ssh_pool import SSHPool
+
+
+class FakeConnection:
+    def close(self):
+        pass
+
+
+class FakeResponse:
+    def __init__(self, lines: list[bytes]):
+        self._body = io.BytesIO(b"".join(lines))
+
+    def readline(self):
+        return self._body.readline()
+
+
+def test_stream_holds_the_master_until_closed(tmp_path, monkeypatch):
+    pool = SSHPool(control_dir=str(tmp_path))
+    client = DockerAPIClient("root", "web1")
+    client.tunnel = DockerTunnel("root", "web1", pool=pool)
+    monkeypatch.setattr(client, "_open_stream", lambda *args: (
+        FakeConnection(), FakeResponse([b'{"Action": "start"}\n', b'{"Action": "die"}\n'])))
+
+    events = client.stream("/events")
+    assert next(events) == {"Action": "start"}
+    assert pool._holds == {("root", "web1"): 1}
+
+    events.close()
+    assert pool._holds == {}
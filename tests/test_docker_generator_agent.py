@@ -0,0 +1,75 @@
+import pytest
+
+from core.agents_gradio.docker_generator_agent import (
+    _source_file, detect_project, generate_dockerfile, generate_dockerignore,
+)
+
+
+def write(root, name, content=""):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_requirements_project_installs_deps_before_source(tmp_path):
+    write(tmp_path, "requirements.txt", "streamlit==1.32.0\n")
+    write(tmp_path, "app.py")
+
+    profile = detect_project(str(tmp_path))
+    dockerfile = generate_dockerfile(profile)
+
+    assert profile.command[:3] == ["streamlit", "run", "app.py"] and profile.port == 8501
+    assert dockerfile.index("COPY requirements.txt ./") < dockerfile.index("RUN pip install -r requirements.txt") \
+        < dockerfile.index("COPY --chown=app:app . .")
+    assert "__pycache__" in generate_dockerignore(profile)
+
+
+def test_pyproject_dependencies_are_installed_before_the_source_is_copied(tmp_path):
+    write(tmp_path, "pyproject.toml", '[project]\nname = "x"\ndependencies = ["flask"]\n')
+    write(tmp_path, "main.py")
+
+    lines = generate_dockerfile(detect_project(str(tmp_path))).splitlines()
+
+    install = next(i for i, line in enumerate(lines) if "pip install -r /tmp/requirements.txt" in line)
+    assert lines.index("COPY pyproject.toml ./") < install < lines.index("COPY . .") \
+        < lines.index("RUN pip install --no-deps .")
+
+
+def test_python_project_without_entry_point_is_rejected(tmp_path):
+    write(tmp_path, "requirements.txt", "requests\n")
+    write(tmp_path, "src/job.py")
+
+    with pytest.raises(ValueError, match="entry point"):
+        detect_project(str(tmp_path))
+    profile = detect_project(str(tmp_path), entry="src/job.py")
+    assert profile.command == ["python", "src/job.py"]
+    with pytest.raises(ValueError, match="not found"):
+        detect_project(str(tmp_path), entry="missing.py")
+
+
+def test_node_and_go_projects(tmp_path):
+    node, go = tmp_path / "node", tmp_path / "go"
+    write(node, "package.json", '{"scripts": {"start": "node server.js", "build": "tsc"}, "engines": {"node": ">=18"}}')
+    write(node, "yarn.lock")
+    write(go, "go.mod", "module x\n\ngo 1.21\n")
+    write(go, "main.go")
+
+    node_profile, go_profile = detect_project(str(node)), detect_project(str(go))
+
+    assert (node_profile.package_manager, node_profile.version, node_profile.build_script) == ("yarn", "18", True)
+    assert node_profile.manifests == ["package.json", "yarn.lock"]
+    assert go_profile.version == "1.21"
+    assert 'ENTRYPOINT ["/app"]' in generate_dockerfile(go_profile)
+
+
+def test_benchmark_edits_a_source_file_not_a_manifest(tmp_path):
+    write(tmp_path, "package.json", "{}")
+    write(tmp_path, "coverage/report.js")
+    write(tmp_path, "src/index.js")
+    profile = detect_project(str(tmp_path))
+    profile.entry_file = ""
+
+    assert _source_file(str(tmp_path), profile) == "src/index.js"
+    (tmp_path / "src" / "index.js").unlink()
+    (tmp_path / "coverage" / "report.js").unlink()
+    assert _source_file(str(tmp_path), profile) == ""
@@ -0,0 +1,42 @@
+from core.docker_automation import docker_inventory
+from core.docker_automation.docker_inventory import HostInventory
+
+
+class FakeClient:
+    host = "web1"
+
+    def __init__(self):
+        self.containers_calls = []
+
+    def containers(self, all=True, filters=None):
+        self.containers_calls.append(filters)
+        if filters:
+            return [{"Id": filters["id"][0], "State": "running", "Created": 3}]
+        return [{"Id": "a", "State": "exited", "Created": 1}, {"Id": "b", "State": "running", "Created": 2}]
+
+    def images(self):
+        return [{"Id": "sha256:1"}]
+
+
+def test_apply_refreshes_only_what_an_event_touched():
+    inventory = HostInventory(FakeClient())
+    inventory._seed()
+
+    inventory.apply({"Type": "container", "Action": "start", "Actor": {"ID": "c"}})
+    inventory.apply({"Type": "container", "Action": "destroy", "Actor": {"ID": "a"}})
+
+    assert [c["Id"] for c in inventory.containers()] == ["c", "b"]
+    assert [c["Id"] for c in inventory.containers(all=False)] == ["c", "b"]
+    assert inventory.client.containers_calls == [None, {"id": ["c"]}]
+    assert inventory.events_seen == 2
+
+
+def test_stop_unused_keeps_only_inventories_in_use(monkeypatch):
+    inventories = {("root", "web1"): HostInventory(FakeClient()), ("root", "web2"): HostInventory(FakeClient())}
+    monkeypatch.setattr(docker_inventory, "_INVENTORIES", dict(inventories))
+
+    docker_inventory.stop_unused([("root", "web1")])
+
+    assert list(docker_inventory._INVENTORIES) == [("root", "web1")]
+    assert inventories[("root", "web2")]._stop.is_set()
+    assert not inventories[("root", "web1")]._stop.is_set()
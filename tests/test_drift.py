@@ -0,0 +1,56 @@
+import subprocess
+
+from core.linux_tools import drift
+from core.linux_tools.drift import detect_drift, normalize_pipeline
+from core.linux_tools.ssh_pool import CommandResult
+
+
+def _sh(script: str) -> subprocess.CompletedProcess:
+    return subprocess.run(["sh", "-c", script], capture_output=True, text=True)
+
+
+def test_normalize_pipeline_strips_and_sorts():
+    result = _sh(normalize_pipeline("printf 'b  \\n\\na\\n'", sort_lines=True))
+
+    assert result.returncode == 0
+    assert result.stdout == "a\nb\n"
+
+
+def test_normalize_pipeline_keeps_the_command_failure():
+    result = _sh(f"{normalize_pipeline('echo partial; echo boom >&2; exit 3')} | sha256sum")
+
+    assert result.returncode == 3
+    assert result.stdout == ""
+    assert "boom" in result.stderr
+
+
+class FakeExecutor:
+    """Answers the hash round with canned results per host and the content round with the host name."""
+
+    hashes: dict[str, CommandResult] = {}
+
+    def __init__(self, max_concurrency=None):
+        pass
+
+    async def run_many(self, jobs, timeout=None, **journal):
+        if "sha256sum" in jobs[0][2]:
+            return [self.hashes[host] for _, host, _ in jobs]
+        return [CommandResult(user, host, command, stdout=f"{host}\n", exit_status=0) for user, host, command in jobs]
+
+
+def test_failed_hosts_are_reported_outside_the_groups(monkeypatch):
+    same, other = "a" * 64, "b" * 64
+    FakeExecutor.hashes = {
+        "web1": CommandResult("root", "web1", "", stdout=f"{same}\n", exit_status=0),
+        "web2": CommandResult("root", "web2", "", stdout=f"{same}\n", exit_status=0),
+        "web3": CommandResult("root", "web3", "", stdout=f"{other}\n", exit_status=0),
+        "web4": CommandResult("root", "web4", "", stderr="sh: 1: resolvectl: not found\n", exit_status=127),
+        "web5": CommandResult("root", "web5", "", exit_status=2),
+    }
+    monkeypatch.setattr(drift, "AsyncSSHExecutor", FakeExecutor)
+
+    report = detect_drift([("root", host) for host in FakeExecutor.hashes], "resolvectl status")
+
+    assert [group.hosts for group in report.groups] == [["root@web1", "root@web2"], ["root@web3"]]
+    assert report.groups[0].baseline and "-web1" in report.groups[1].diff and "+web3" in report.groups[1].diff
+    assert report.failed == {"root@web4": "sh: 1: resolvectl: not found", "root@web5": "exit status 2"}
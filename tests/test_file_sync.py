@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+
+from core.linux_tools.file_sync import (
+    REMOTE_APPLY_SCRIPT, REMOTE_HASH_SCRIPT, FileDelta, FileManifest, _payload, build_manifest, plan_transfer,
+)
+
+CHUNK = 4
+
+
+def test_plan_transfer_sends_only_changed_blocks():
+    local = {
+        "same.txt": FileManifest(8, 0o644, ["a", "b"]),
+        "edited.txt": FileManifest(12, 0o644, ["a", "x", "c"]),
+        "grown.txt": FileManifest(12, 0o644, ["a", "b", "c"]),
+        "shrunk.txt": FileManifest(4, 0o644, ["a"]),
+        "chmod.sh": FileManifest(4, 0o755, ["a"]),
+        "new.txt": FileManifest(8, 0o644, ["a", "b"]),
+    }
+    remote = {
+        "same.txt": FileManifest(8, 0o644, ["a", "b"]),
+        "edited.txt": FileManifest(12, 0o644, ["a", "b", "c"]),
+        "grown.txt": FileManifest(8, 0o644, ["a", "b"]),
+        "shrunk.txt": FileManifest(8, 0o644, ["a", "b"]),
+        "chmod.sh": FileManifest(4, 0o644, ["a"]),
+        "extra.txt": FileManifest(1, 0o644, ["z"]),
+    }
+
+    assert {d.path: d.changed_blocks for d in plan_transfer(local, remote)} == {
+        "edited.txt": [1],
+        "grown.txt": [2],
+        "shrunk.txt": [],       # only truncated
+        "chmod.sh": [],         # only the mode changes
+        "new.txt": [0, 1],
+    }
+
+
+def _remote(script: str, root, stdin: bytes, *args: str) -> bytes:
+    return subprocess.run([sys.executable, "-c", script, str(root), *args], input=stdin,
+                          capture_output=True, check=True).stdout
+
+
+def test_hash_and_apply_scripts_sync_a_tree(tmp_path):
+    local, remote = tmp_path / "local", tmp_path / "remote"
+    (local / "sub").mkdir(parents=True)
+    (remote / "sub").mkdir(parents=True)
+    (local / "a.txt").write_bytes(b"aaaabbbbcccc")
+    (local / "sub" / "b.txt").write_bytes(b"new file")
+    (remote / "a.txt").write_bytes(b"aaaaXXXXccccdddd")
+    (remote / "keep.txt").write_bytes(b"untouched")
+
+    manifest = build_manifest(str(local), CHUNK)
+    theirs = {rel: FileManifest(**info) for rel, info in json.loads(
+        _remote(REMOTE_HASH_SCRIPT, remote, json.dumps(list(manifest)).encode(), str(CHUNK))).items()}
+    deltas = plan_transfer(manifest, theirs)
+
+    assert {d.path: d.changed_blocks for d in deltas} == {"a.txt": [1], "sub/b.txt": [0, 1]}
+    payload = b"".join(piece for piece, _ in _payload(str(local), deltas, CHUNK))
+    assert _remote(REMOTE_APPLY_SCRIPT, remote, payload).strip() == b"2"
+    assert (remote / "a.txt").read_bytes() == b"aaaabbbbcccc"
+    assert (remote / "sub" / "b.txt").read_bytes() == b"new file"
+    assert (remote / "keep.txt").read_bytes() == b"untouched"
+    assert not [name for name in os.listdir(remote) if name.endswith(".tmp")]
+    assert plan_transfer(build_manifest(str(local), CHUNK), build_manifest(str(remote), CHUNK)) == []
+
+
+def test_payload_reports_raw_bytes_for_progress(tmp_path):
+    (tmp_path / "f").write_bytes(b"0123456789")
+
+    pieces = list(_payload(str(tmp_path), [FileDelta("f", 10, 0o644, [0, 2])], CHUNK))
+
+    assert json.loads(pieces[0][0])["chunks"][1][0] == 2
+    assert [raw for _, raw in pieces] == [0, 4, 2]
@@ -0,0 +1,46 @@
+import pytest
+
+from core.linux_tools.fleet import HostResult, _host_result, parse_inventory, summarize
+from core.linux_tools.ssh_pool import CommandResult
+
+
+def test_parse_inventory_applies_the_default_user_and_skips_comments():
+    text = """
+    # web tier
+    deploy@10.0.0.1
+    10.0.0.2            # uses the default user
+
+    deploy@10.0.0.1
+    admin@jump@10.0.0.3
+    """
+
+    assert parse_inventory(text, default_user="root") == [
+        ("deploy", "10.0.0.1"), ("root", "10.0.0.2"), ("admin@jump", "10.0.0.3"),
+    ]
+    assert parse_inventory("\n  \n# nothing\n") == []
+
+
+@pytest.mark.parametrize("text, message", [
+    ("deploy@10.0.0.1\n10.0.0.2", "Line 2: no user given"),
+    ("@10.0.0.1", "Line 1: malformed"),
+    ("deploy@", "Line 1: malformed"),
+    ("deploy@web 1", "Line 1: malformed"),
+])
+def test_parse_inventory_rejects_malformed_lines(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_inventory(text)
+
+
+def test_host_result_status_and_summary():
+    results = [
+        _host_result(CommandResult("root", "a", "uptime", stdout="up", exit_status=0, exec_time=0.2)),
+        _host_result(CommandResult("root", "b", "uptime", stderr="boom", exit_status=1)),
+        _host_result(CommandResult("root", "c", "uptime", timed_out=True)),
+        _host_result(CommandResult("root", "d", "uptime", exit_status=0)),
+    ]
+
+    assert [r.status for r in results] == ["ok", "failed", "timeout", "ok"]
+    assert results[1].output == "boom"
+    assert summarize(results) == {"ok": 2, "failed": 1, "timeout": 1}
+    assert summarize([]) == {"ok": 0, "failed": 0, "timeout": 0}
+    assert summarize([HostResult("root", "e", "skipped", 0.0)])["skipped"] == 1
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from core.docker_automation import docker_runner
+from core.linux_tools import bash_runner, history, ssh_pool
+from core.linux_tools.history import CommandJournal, HistoryEntry, percentile, replay
+from core.linux_tools.ssh_pool import CommandResult, SSHPool
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = CommandJournal(str(tmp_path / "history.db"))
+    yield journal
+    journal.close()
+
+
+def _result(exec_time: float, exit_status: int = 0) -> CommandResult:
+    return CommandResult("root", "web1", "uptime", stdout="up", exit_status=exit_status, exec_time=exec_time)
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 21)]
+
+    assert percentile(values, 0.50) == 10
+    assert percentile(values, 0.95) == 19
+    assert percentile(values, 1.0) == 20
+    assert percentile([3.0], 0.95) == 3
+    assert percentile([], 0.5) == 0.0
+
+
+def test_latency_stats_groups_and_orders_by_p95(journal):
+    for exec_time in (0.1, 0.2, 0.3, 0.4):
+        journal.record("linux", "System Uptime", "root", "web1", "uptime", _result(exec_time))
+    journal.record("linux", "System Uptime", "root", "web2", "uptime", _result(2.0, exit_status=1))
+    journal.record("linux", "Disk Usage", "root", "web1", "df -h", _result(0.05))
+
+    by_both = journal.latency_stats()
+    assert [(s.label, s.host, s.count) for s in by_both] == [
+        ("System Uptime", "web2", 1), ("System Uptime", "web1", 4), ("Disk Usage", "web1", 1),
+    ]
+    assert (by_both[1].p50, by_both[1].p95, by_both[1].max) == (0.2, 0.4, 0.4)
+
+    by_label = {s.label: s for s in journal.latency_stats(by="label")}
+    assert by_label["System Uptime"].count == 5 and by_label["System Uptime"].failures == 1
+    assert by_label["System Uptime"].host == "*"
+    assert [s.host for s in journal.latency_stats(by="host")] == ["web2", "web1"]
+    assert journal.latency_stats(since=time.time() + 60) == []
+
+
+def test_replay_dispatches_on_kind(monkeypatch):
+    calls = []
+    monkeypatch.setattr(bash_runner, "execute_linux_task",
+                        lambda choice, user, host, timeout=None: calls.append(("linux", choice)) or "linux")
+    monkeypatch.setattr(docker_runner, "execute_docker_command",
+                        lambda label, args, user, host, timeout=None: calls.append(("docker", label, args)) or "docker")
+    monkeypatch.setattr(ssh_pool.POOL, "run",
+                        lambda user, host, command, **kwargs: calls.append(("shell", command)) or "shell")
+
+    def entry(kind, label, command, args=None):
+        return HistoryEntry(time.time(), kind, label, "root", "web1", command, args or {})
+
+    assert replay(entry("linux", "System Uptime", "uptime")) == "linux"
+    assert replay(entry("docker", "Start Container", "docker start web", {"name": "web"})) == "docker"
+    assert replay(entry("shell", "plan: deploy", "systemctl restart app")) == "shell"
+    assert replay(entry("shell", "batch: Date", "sh -s", {"stdin": True})) is None
+    assert calls == [("linux", "System Uptime"), ("docker", "Start Container", {"name": "web"}),
+                     ("shell", "systemctl restart app")]
+
+
+class FakeRun:
+    def __init__(self, returncode: int):
+        self.returncode = returncode
+
+    def __call__(self, argv, **kwargs):
+        return type("Completed", (), {"returncode": self.returncode, "stdout": "ok\n", "stderr": ""})()
+
+
+def test_pool_journals_runs_and_connection_failures(tmp_path, journal, monkeypatch):
+    pool = SSHPool(control_dir=str(tmp_path / "ssh"), journal=journal)
+    monkeypatch.setattr(ssh_pool, "MULTIPLEXING_SUPPORTED", False)
+    monkeypatch.setattr(ssh_pool.subprocess, "run", FakeRun(0))
+
+    pool.run("root", "web1", "uptime", label="System Uptime", kind="linux")
+    pool.run("root", "web1", "sh -s", input="date\n")
+
+    monkeypatch.setattr(ssh_pool, "MULTIPLEXING_SUPPORTED", True)
+    monkeypatch.setattr(ssh_pool.subprocess, "run", FakeRun(255))
+    with pytest.raises(ConnectionError):
+        pool.run("root", "web2", "uptime")
+
+    failed, batch, uptime = journal.recent()
+    assert (uptime.kind, uptime.label, uptime.exit_status, uptime.stdout_bytes) == ("linux", "System Uptime", 0, 3)
+    assert (batch.kind, batch.label, batch.args) == ("shell", "sh -s", {"stdin": True})
+    assert (failed.host, failed.exit_status, failed.error) == ("web2", None, "ssh exited with status 255")
+
+
+def test_module_pool_journals_to_the_shared_journal():
+    assert ssh_pool.POOL.journal is history.JOURNAL
+
+
+def test_pool_journals_streams_when_they_close(tmp_path, journal, monkeypatch):
+    pool = SSHPool(control_dir=str(tmp_path / "ssh"), journal=journal)
+    monkeypatch.setattr(ssh_pool, "MULTIPLEXING_SUPPORTED", False)
+    monkeypatch.setattr(pool, "command_argv", lambda user, host, command: ["sh", "-c", command])
+
+    stream = pool.stream("root", "web1", "echo one; echo two", label="View Logs", kind="docker", args={"name": "web"})
+    assert journal.recent() == []
+    assert [line for _, line in stream] == ["one", "two"]
+
+    [entry] = journal.recent()
+    assert (entry.kind, entry.label, entry.args, entry.exit_status) == ("docker", "View Logs", {"name": "web"}, 0)
+    assert pool._holds == {}
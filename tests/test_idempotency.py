@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from core.linux_tools.idempotency import IdempotencyGuard, action_key
+from core.linux_tools.ssh_pool import CommandResult
+
+
+def test_action_key_ignores_dict_order():
+    assert action_key("docker", {"name": "web", "image": "nginx"}) == \
+        action_key("docker", {"image": "nginx", "name": "web"})
+    assert action_key("docker", "Start", "web") != action_key("docker", "Stop", "web")
+
+
+def test_identical_action_within_window_runs_once():
+    guard = IdempotencyGuard(window=60)
+    calls = []
+
+    assert guard.run("k", lambda: calls.append(1) or "first") == ("first", False)
+    assert guard.run("k", lambda: calls.append(1) or "second") == ("first", True)
+    assert len(calls) == 1
+    assert guard.age("k") is not None
+
+    guard.forget("k")
+    assert guard.run("k", lambda: "third") == ("third", False)
+
+
+def test_concurrent_duplicate_shares_the_in_flight_result():
+    guard = IdempotencyGuard(window=60)
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    owner = threading.Thread(target=lambda: results.append(guard.run("k", slow)))
+    owner.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(guard.run("k", lambda: "not called")))
+    waiter.start()
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert sorted(results) == [("done", False), ("done", True)]
+
+
+def test_failures_are_not_stored():
+    guard = IdempotencyGuard(window=60)
+
+    def fail():
+        raise ConnectionError("unreachable")
+
+    with pytest.raises(ConnectionError):
+        guard.run("k", fail)
+    assert guard.run("k", lambda: "retried") == ("retried", False)
+
+
+def test_other_action_on_same_target_resets_the_guard():
+    guard = IdempotencyGuard(window=60)
+    container = action_key("root", "10.0.0.1", "web")
+    runs = []
+
+    def action(name):
+        return lambda: runs.append(name) or name
+
+    guard.run(action_key("Start", "web"), action("start"), target=container)
+    guard.run(action_key("Stop", "web"), action("stop"), target=container)
+    result = guard.run(action_key("Start", "web"), action("start again"), target=container)
+
+    assert result == ("start again", False)
+    assert runs == ["start", "stop", "start again"]
+    # A double click on the last one is still absorbed.
+    assert guard.run(action_key("Start", "web"), action("double click"), target=container) == ("start again", True)
+
+
+def test_failed_results_are_not_stored():
+    guard = IdempotencyGuard(window=60)
+    failed = CommandResult(user="root", host="10.0.0.1", command="docker system prune -f",
+                           stderr="daemon not running", exit_status=1)
+    ok = CommandResult(user="root", host="10.0.0.1", command="docker system prune -f", exit_status=0)
+
+    assert guard.run("k", lambda: failed) == (failed, False)
+    assert guard.run("k", lambda: ok) == (ok, False)
+    assert guard.run("k", lambda: "not called") == (ok, True)
+
+
+def test_should_store_overrides_the_default():
+    guard = IdempotencyGuard(window=60)
+
+    guard.run("k", lambda: "error: busy", should_store=lambda result: not result.startswith("error"))
+    assert guard.run("k", lambda: "done") == ("done", False)
@@ -0,0 +1,77 @@
+import hashlib
+
+from core.docker_automation.image_analyzer import _layer_steps, analyze_host, chain_ids, instruction
+
+BASE, APP, OTHER = "sha256:" + "1" * 64, "sha256:" + "2" * 64, "sha256:" + "3" * 64
+
+
+def test_chain_ids_hash_each_layer_with_the_stack_below_it():
+    chains = chain_ids([BASE, APP, OTHER])
+
+    assert chains[0] == BASE
+    assert chains[1] == "sha256:" + hashlib.sha256(f"{BASE} {APP}".encode()).hexdigest()
+    assert chains[2] == "sha256:" + hashlib.sha256(f"{chains[1]} {OTHER}".encode()).hexdigest()
+    # Same content on a different base is a different stored layer.
+    assert chain_ids([OTHER, APP])[1] != chains[1]
+    assert chain_ids([]) == []
+
+
+def test_instruction_normalizes_history_entries():
+    assert instruction("/bin/sh -c #(nop)  COPY dir:ab in /app ") == "COPY dir:ab in /app"
+    assert instruction("/bin/sh -c apt-get update") == "RUN apt-get update"
+    assert instruction("RUN |2 A=1 B=2 /bin/sh -c make # buildkit") == "RUN make"
+    assert instruction("WORKDIR /app") == "WORKDIR /app"
+
+
+def test_layer_steps_skip_metadata_instructions():
+    history = [
+        {"CreatedBy": "/bin/sh -c #(nop) ADD file:abc in / ", "Size": 80},
+        {"CreatedBy": '/bin/sh -c #(nop)  CMD ["bash"]', "Size": 0},
+        {"CreatedBy": "WORKDIR /app", "Size": 0},
+        {"CreatedBy": "ENV A=1", "Size": 0},
+        {"CreatedBy": "RUN /bin/sh -c pip install flask # buildkit", "Size": 20},
+    ]
+
+    steps = _layer_steps(history, 3)
+
+    assert [instruction(step["CreatedBy"]) for step in steps] == [
+        "ADD file:abc in /", "WORKDIR /app", "RUN pip install flask"]
+
+
+class FakeClient:
+    host = "web1"
+
+    def __init__(self, images):
+        self._images = images
+
+    def images(self):
+        return [{"Id": image_id, "RepoTags": [name]} for image_id, (name, _, _) in self._images.items()]
+
+    def inspect_image(self, image_id):
+        return {"RootFS": {"Layers": self._images[image_id][1]}}
+
+    def image_history(self, image_id):
+        return list(reversed(self._images[image_id][2]))     # newest first, like the engine
+
+
+def test_analyze_host_counts_shared_layers_once():
+    base_step = {"CreatedBy": "/bin/sh -c #(nop) ADD file:abc in / ", "Size": 300_000_000}
+    client = FakeClient({
+        "sha256:a": ("app:1", [BASE, APP], [base_step, {"CreatedBy": "/bin/sh -c apt-get install -y curl",
+                                                        "Size": 60_000_000}]),
+        "sha256:b": ("worker:1", [BASE, OTHER], [base_step, {"CreatedBy": "/bin/sh -c pip install celery",
+                                                             "Size": 10_000_000}]),
+    })
+
+    report = analyze_host(client, max_concurrency=2)
+
+    assert report.apparent_size == 670_000_000
+    assert report.stored_size == 370_000_000
+    assert report.shared_savings == 300_000_000
+    assert report.layers[BASE].images == ["app:1", "worker:1"]
+    app = next(image for image in report.images if image.name == "app:1")
+    assert (app.size, app.unique_size) == (360_000_000, 60_000_000)
+    hints = {row["hint"].split(":")[0] for row in report.hints()}
+    assert hints == {"apt package lists stay in the layer", "pip keeps its download cache",
+                     "large base image"}
+    assert report.instruction_totals()[0] == {"instruction": "ADD", "size_mb": 300.0, "layers": 1}
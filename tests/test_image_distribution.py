@@ -0,0 +1,67 @@
+import base64
+import json
+
+import pytest
+
+from core.docker_automation.docker_api import DockerAPIError
+from core.docker_automation.image_distribution import HostTransfer, LayerProgress, parse_reference, registry_auth
+
+DIGEST = "sha256:" + "ab" * 32
+
+
+@pytest.mark.parametrize("image, expected", [
+    ("nginx", ("nginx", "latest", "")),
+    ("nginx:1.25", ("nginx", "1.25", "")),
+    ("registry:5000/team/app", ("registry:5000/team/app", "latest", "")),
+    ("registry:5000/team/app:1.2", ("registry:5000/team/app", "1.2", "")),
+    (f"registry:5000/app:1.2@{DIGEST}", ("registry:5000/app", "1.2", DIGEST)),
+    (f"app@{DIGEST}", ("app", "", DIGEST)),
+])
+def test_parse_reference(image, expected):
+    assert parse_reference(image) == expected
+
+
+def test_registry_auth_is_url_safe_base64_json():
+    header = registry_auth({"username": "ci", "password": "s3cret"})
+
+    assert json.loads(base64.urlsafe_b64decode(header)) == {"username": "ci", "password": "s3cret"}
+    assert json.loads(base64.urlsafe_b64decode(registry_auth())) == {}
+
+
+def test_layer_progress_never_goes_backwards_between_download_and_extract():
+    layer = LayerProgress("l1", total=100)
+    fractions = []
+    for status, current in [("Downloading", 50), ("Downloading", 100), ("Download complete", 0),
+                            ("Extracting", 40), ("Extracting", 100), ("Pull complete", 0)]:
+        layer.status, layer.current = status, current
+        fractions.append(layer.fraction)
+
+    assert fractions == [0.25, 0.5, 0.5, 0.7, 1.0, 1.0]
+    assert fractions == sorted(fractions)
+
+
+def test_host_transfer_folds_pull_messages_per_layer():
+    transfer = HostTransfer("root", "web1", state="pulling")
+    for message in [
+        {"status": "Pulling from library/nginx", "id": "1.25"},
+        {"status": "Pulling fs layer", "id": "l1"},
+        {"status": "Already exists", "id": "l2"},
+        {"status": "Downloading", "id": "l1", "progressDetail": {"current": 50, "total": 100}},
+        {"status": "Status: Downloaded newer image for nginx:1.25"},
+    ]:
+        transfer.apply(message)
+
+    assert set(transfer.layers) == {"l1", "l2"}
+    assert transfer.progress == pytest.approx((0.25 + 1.0) / 2)
+    assert transfer.note == "Status: Downloaded newer image for nginx:1.25"
+    assert transfer.as_row()["layers_done"] == 1
+    with pytest.raises(DockerAPIError):
+        transfer.apply({"error": "manifest unknown"})
+
+
+def test_peer_transfer_progress_counts_bytes():
+    transfer = HostTransfer("root", "web2", state="sending", bytes_sent=25, bytes_total=100)
+
+    assert transfer.progress == 0.25
+    transfer.apply({"stream": "Loaded image: app:1.2\n"})
+    assert transfer.note == "Loaded image: app:1.2"
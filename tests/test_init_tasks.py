@@ -0,0 +1,43 @@
+import os
+import subprocess
+
+from remote_scripts.linux_boxes.init_tasks import PACKAGES_COMMAND, FactCache, HostFacts
+
+
+def _facts(**overrides) -> HostFacts:
+    facts = HostFacts(os="debian 12", package_manager="apt-get", packages=["curl"],
+                      running_services=[], enabled_services=[], is_root=True, fingerprint="f")
+    for name, value in overrides.items():
+        setattr(facts, name, value)
+    return facts
+
+
+def test_packages_command_skips_removed_dpkg_packages(tmp_path):
+    fake = tmp_path / "dpkg-query"
+    fake.write_text("#!/bin/sh\nprintf 'ii  curl\\nrc  git\\nii  htop\\n'\n")
+    fake.chmod(0o755)
+    env = {**os.environ, "PATH": f"{tmp_path}{os.pathsep}{os.environ['PATH']}"}
+
+    result = subprocess.run(["sh", "-c", PACKAGES_COMMAND], env=env, capture_output=True, text=True)
+
+    assert result.stdout.split() == ["curl", "htop"]
+
+
+def test_fact_cache_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / "facts" / "host_facts.json")
+    FactCache(path).set("root@a", _facts())
+
+    assert FactCache(path).get("root@a") == _facts()
+
+
+def test_fact_cache_invalidate_is_persisted(tmp_path):
+    path = str(tmp_path / "host_facts.json")
+    cache = FactCache(path)
+    cache.set("root@a", _facts())
+    cache.set("root@b", _facts(os="fedora 40"))
+
+    cache.invalidate("root@a")
+
+    reloaded = FactCache(path)
+    assert reloaded.get("root@a") is None
+    assert reloaded.get("root@b").os == "fedora 40"
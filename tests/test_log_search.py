@@ -0,0 +1,85 @@
+from core.linux_tools import log_search
+from core.linux_tools.log_search import LogCursor, LogSearch, build_journal_command
+
+JOURNALS = {
+    "web1": ["100.0 web1 nginx: start", "103.0 web1 nginx: reload", "105.0 web1 app: traceback",
+             "  File \"app.py\", line 1"],
+    "web2": ["-- No entries --"],
+    "db1": ["101.0 db1 postgres: checkpoint", "104.0 db1 postgres: vacuum", "-- Boot 1a2b --",
+            "106.0 db1 postgres: ready"],
+}
+
+
+class FakeStream:
+    def __init__(self, lines):
+        self.lines = lines
+        self.cancelled = False
+
+    def __iter__(self):
+        for line in self.lines:
+            yield "stdout", line
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakePool:
+    def __init__(self):
+        self.commands = []
+        self.streams = []
+
+    def stream(self, user, host, command, buffer_lines=None, **journal):
+        self.commands.append(command)
+        self.streams.append(FakeStream(JOURNALS[host]))
+        return self.streams[-1]
+
+
+def _search(monkeypatch, **kwargs) -> tuple[LogSearch, FakePool]:
+    pool = FakePool()
+    monkeypatch.setattr(log_search, "POOL", pool)
+    monkeypatch.setattr(LogSearch, "_connect_all", lambda self: None)
+    return LogSearch([("root", "web1"), ("root", "web2"), ("root", "db1")], **kwargs), pool
+
+
+def test_build_journal_command_filters_on_the_host():
+    command = build_journal_command("error|fail", unit="nginx", since="1 hour ago", until=123.9, per_host_limit=50)
+
+    assert command == ("journalctl --no-pager -o short-unix -u nginx --since '1 hour ago' --until @123"
+                       " | grep -E -i -e 'error|fail' | tail -n 50")
+    assert build_journal_command(since=None, per_host_limit=10) == "journalctl --no-pager -o short-unix -n 10"
+
+
+def test_entries_are_merged_by_time_across_hosts(monkeypatch):
+    search, pool = _search(monkeypatch)
+
+    entries = list(search.iter_entries())
+
+    assert [(e.ts, e.host) for e in entries] == [
+        (100.0, "web1"), (101.0, "db1"), (103.0, "web1"), (104.0, "db1"),
+        (105.0, "web1"), (105.0, "web1"), (106.0, "db1"),
+    ]
+    # The continuation line stays with its entry; journalctl markers are dropped.
+    assert entries[5].message == '  File "app.py", line 1'
+    assert all(not e.message.startswith("-- ") for e in entries)
+    assert all(stream.cancelled for stream in pool.streams)
+
+
+def test_page_pins_until_and_pages_through_results(monkeypatch):
+    search, pool = _search(monkeypatch)
+
+    first, cursor, has_more = search.page(LogCursor(), limit=3)
+    assert [e.ts for e in first] == [100.0, 101.0, 103.0]
+    assert has_more and cursor.until is not None
+
+    second, next_cursor, has_more = search.page(cursor.next(3), limit=3)
+    assert [e.ts for e in second] == [104.0, 105.0, 105.0]
+    assert next_cursor.until == cursor.until and has_more
+    assert f"--until @{int(cursor.until)}" in pool.commands[-1]
+
+    last, last_cursor, has_more = search.page(next_cursor.next(3), limit=3)
+    assert [e.ts for e in last] == [106.0] and not has_more
+    assert last_cursor.previous(3) == next_cursor
+
+
+def test_cursor_previous_stops_at_zero():
+    assert LogCursor(2, 10.0).previous(5) == LogCursor(0, 10.0)
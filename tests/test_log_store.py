@@ -0,0 +1,62 @@
+import struct
+
+import pytest
+
+from core.docker_automation import log_store
+from core.docker_automation.log_store import (
+    ContainerLogStore, LogLine, format_since, parse_log_lines, parse_timestamp,
+)
+
+T0 = 1714557600 * 10**9    # 2024-05-01T10:00:00Z
+
+
+def frame(stream_id: int, payload: str) -> bytes:
+    data = payload.encode()
+    return struct.pack(">BxxxL", stream_id, len(data)) + data
+
+
+def test_parse_timestamp_keeps_nanoseconds():
+    assert parse_timestamp("2024-05-01T10:00:00.123456789Z") == T0 + 123456789
+    assert parse_timestamp("2024-05-01T12:00:00.5+02:00") == T0 + 500_000_000
+    assert format_since(T0 + 5) == "1714557600.000000005"
+    with pytest.raises(ValueError):
+        parse_timestamp("not a timestamp")
+
+
+def test_parse_log_lines_demultiplexes_and_orders_streams():
+    body = (frame(1, "2024-05-01T10:00:00.000000001Z hello\n2024-05-01T10:00:00.000000003Z wor")
+            + frame(2, "2024-05-01T10:00:00.000000002Z oops\r\n")
+            + frame(1, "ld\n"))
+
+    assert parse_log_lines(body) == [
+        LogLine(T0 + 1, "o", "hello"),
+        LogLine(T0 + 2, "e", "oops"),
+        LogLine(T0 + 3, "o", "world"),
+    ]
+
+
+def test_parse_log_lines_reads_raw_tty_output():
+    body = b"2024-05-01T10:00:00.000000001Z tty line\nno timestamp here\n"
+
+    assert parse_log_lines(body) == [LogLine(T0 + 1, "o", "tty line")]
+
+
+def test_store_appends_only_new_lines_and_searches_locally(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_store, "CHUNK_LINES", 2)
+    store = ContainerLogStore("10.0.0.1", "web", root=str(tmp_path))
+    lines = [LogLine(T0 + i * 10**9, "o", f"request {i}" + (" ERROR" if i % 2 else "")) for i in range(5)]
+
+    assert store.append(lines[:3], container_id="abc") == 3
+    assert store.append(lines) == 2     # overlapping fetch: the first three are already stored
+    assert store.stats()["lines"] == 5 and store.stats()["chunks"] == 3
+
+    reopened = ContainerLogStore("10.0.0.1", "web", root=str(tmp_path))
+    assert reopened.last_ns == lines[-1].ts_ns and reopened.container_id == "abc"
+    assert [line.text for line in reopened.search("error")] == ["request 1 ERROR", "request 3 ERROR"]
+    assert [line.text for line in reopened.search(r"request [0-2]$", regex=True)] == ["request 0", "request 2"]
+    assert [line.text for line in reopened.lines(since=T0 / 1e9 + 2, until=T0 / 1e9 + 3)] == [
+        "request 2", "request 3 ERROR"]
+    assert [line.text for line in reopened.tail(2)] == ["request 3 ERROR", "request 4"]
+
+    reopened.clear()
+    assert reopened.last_ns == 0 and reopened.tail() == []
@@ -0,0 +1,118 @@
+import pytest
+
+from core.linux_tools.metrics_collector import MetricsCollector, RingBuffer, downsample, parse_sample
+from core.linux_tools.ssh_pool import CommandResult
+
+OUTPUT = """0.50 0.40 0.30 1/200 1234
+---
+MemTotal:        8000 kB
+MemAvailable:    2000 kB
+---
+/dev/sda1 100000 60000 40000 60% /
+---
+Inter-|   Receive                            |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:  500 5 0 0 0 0 0 0  500 5 0 0 0 0 0 0
+  eth0: 1000 10 0 0 0 0 0 0 2000 20 0 0 0 0 0 0
+---
+cpu  100 0 100 700 100 0 0 0 0 0
+"""
+
+
+def test_parse_sample_reads_every_section():
+    sample = parse_sample("web1", OUTPUT, ts=100.0)
+
+    assert (sample.load1, sample.load5, sample.load15) == (0.5, 0.4, 0.3)
+    assert sample.mem_total == 8000 * 1024
+    assert sample.mem_used_pct == pytest.approx(75.0)
+    assert sample.disk_used_pct == 60.0
+    assert (sample.net_rx_bytes, sample.net_tx_bytes) == (1000, 2000)    # loopback excluded
+    assert (sample.cpu_total, sample.cpu_idle) == (1000, 800)
+    assert sample.cpu_pct is None and sample.net_rx_rate is None
+
+
+def test_parse_sample_computes_rates_against_previous():
+    previous = parse_sample("web1", OUTPUT, ts=100.0)
+    later = (OUTPUT.replace("eth0: 1000", "eth0: 3000")
+             .replace("cpu  100 0 100 700 100", "cpu  200 0 200 1400 200"))
+
+    sample = parse_sample("web1", later, previous=previous, ts=110.0)
+
+    assert sample.cpu_pct == pytest.approx(20.0)
+    assert sample.net_rx_rate == pytest.approx(200.0)
+    assert sample.net_tx_rate == 0.0
+
+
+def test_parse_sample_skips_rates_after_counter_reset():
+    previous = parse_sample("web1", OUTPUT.replace("eth0: 1000", "eth0: 9000"), ts=100.0)
+
+    assert parse_sample("web1", OUTPUT, previous=previous, ts=110.0).net_rx_rate is None
+
+
+def test_parse_sample_rejects_incomplete_output():
+    with pytest.raises(ValueError):
+        parse_sample("web1", "0.5 0.4 0.3\n---\n")
+
+
+def test_ring_buffer_overwrites_oldest_and_reports_evictions():
+    evicted = []
+    buffer = RingBuffer(3, on_evict=evicted.append)
+    for i in range(5):
+        buffer.append(i)
+
+    assert buffer.items() == [2, 3, 4]
+    assert buffer.last() == 4
+    assert len(buffer) == 3
+    assert evicted == [0, 1]
+
+
+def test_ring_buffer_empty():
+    buffer = RingBuffer(2)
+
+    assert buffer.items() == [] and buffer.last() is None and len(buffer) == 0
+
+
+def test_downsample_averages_equal_time_slices():
+    samples = [parse_sample("web1", OUTPUT, ts=float(ts)) for ts in range(10)]
+    for i, sample in enumerate(samples):
+        sample.load1 = float(i)
+
+    assert downsample(samples, "load1", buckets=20) == [(float(i), float(i)) for i in range(10)]
+    points = downsample(samples, "load1", buckets=2)
+    assert [value for _, value in points] == [2.0, 7.0]
+
+
+def test_downsample_skips_missing_values():
+    samples = [parse_sample("web1", OUTPUT, ts=float(ts)) for ts in range(3)]
+
+    assert downsample(samples, "cpu_pct") == []
+
+
+def _fake_collector(monkeypatch, **kwargs) -> MetricsCollector:
+    collector = MetricsCollector([("root", "web1")], **kwargs)
+
+    async def run_many(jobs, timeout=None, **journal):
+        return [CommandResult(user, host, command, stdout=OUTPUT, exit_status=0) for user, host, command in jobs]
+
+    monkeypatch.setattr(collector._executor, "run_many", run_many)
+    return collector
+
+
+def test_collector_without_spill_keeps_memory_constant(monkeypatch):
+    collector = _fake_collector(monkeypatch, capacity=3)
+    for _ in range(10):
+        collector.collect_once()
+
+    assert len(collector.samples("web1")) == 3
+    assert collector._evicted == []
+
+
+def test_collector_spills_evicted_samples(monkeypatch, tmp_path):
+    collector = _fake_collector(monkeypatch, capacity=3, spill_path=str(tmp_path / "metrics.db"))
+    for _ in range(10):
+        collector.collect_once()
+
+    assert collector._evicted == []
+    assert len(collector.spill.read("web1")) == 7
+    assert len(collector.samples("web1", include_spilled=True)) == 10
+    collector.stop()
@@ -0,0 +1,74 @@
+from core.linux_tools.parsers import (
+    PARSERS, CPUInfo, as_rows, parse_df, parse_free, parse_lscpu, parse_size, parse_ss,
+)
+
+DF = """Filesystem      Size  Used Avail Use% Mounted on
+/dev/sda1        20G  8.5G   11G  44% /
+tmpfs           3.9G     0  3.9G   0% /dev/shm
+/dev/sdb1       100G   10G   90G   -  /mnt/my data
+"""
+
+FREE = """               total        used        free      shared  buff/cache   available
+Mem:           7.7Gi       2.1Gi       3.0Gi       150Mi       2.6Gi       5.3Gi
+Swap:          2.0Gi          0B       2.0Gi
+"""
+
+SS = """Netid State  Recv-Q Send-Q  Local Address:Port   Peer Address:Port Process
+tcp   LISTEN 0      128           0.0.0.0:22          0.0.0.0:*     users:(("sshd",pid=712,fd=3))
+tcp   ESTAB  0      36         10.0.0.5:22        10.0.0.9:51234
+udp   UNCONN 0      0                [::1]:323            [::]:*
+"""
+
+LSCPU = """Architecture:            x86_64
+CPU(s):                  8
+Model name:              Intel(R) Xeon(R) CPU
+Thread(s) per core:      2
+Core(s) per socket:      4
+Socket(s):               1
+CPU max MHz:             3500.0000
+"""
+
+
+def test_parse_size():
+    assert parse_size("512") == 512
+    assert parse_size("20G") == 20 * 1024 ** 3
+    assert parse_size("1.5Gi") == int(1.5 * 1024 ** 3)
+    assert parse_size("0B") == 0
+    assert parse_size("-") is None
+
+
+def test_parse_df_keeps_spaces_in_mount_points():
+    disks = parse_df(DF)
+
+    assert [d.mounted_on for d in disks] == ["/", "/dev/shm", "/mnt/my data"]
+    assert disks[0].use_percent == 44 and disks[0].size_bytes == 20 * 1024 ** 3
+    assert disks[2].use_percent is None
+
+
+def test_parse_free_reads_mem_and_swap_rows():
+    mem, swap = parse_free(FREE)
+
+    assert (mem.kind, mem.total, mem.available) == ("Mem", "7.7Gi", "5.3Gi")
+    assert (swap.kind, swap.used_bytes, swap.buff_cache) == ("Swap", 0, None)
+
+
+def test_parse_ss_splits_endpoints_and_process():
+    listen, established, udp = parse_ss(SS)
+
+    assert (listen.netid, listen.state, listen.local_port, listen.peer_port) == ("tcp", "LISTEN", "22", "*")
+    assert listen.process.startswith("users:((\"sshd\"")
+    assert (established.send_q, established.peer_address, established.process) == (36, "10.0.0.9", "")
+    assert (udp.local_address, udp.peer_address) == ("::1", "::")
+
+
+def test_parse_lscpu():
+    [cpu] = parse_lscpu(LSCPU)
+
+    assert cpu == CPUInfo(architecture="x86_64", model_name="Intel(R) Xeon(R) CPU", cpus=8, threads_per_core=2,
+                          cores_per_socket=4, sockets=1, max_mhz=3500.0, fields=cpu.fields)
+    assert parse_lscpu("") == []
+
+
+def test_registry_and_rows():
+    assert PARSERS["Disk Usage"] is parse_df
+    assert "fields" not in as_rows(parse_lscpu(LSCPU))[0]
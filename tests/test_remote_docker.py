@@ -0,0 +1,85 @@
+import pytest
+
+from core.docker_automation import remote_docker
+from core.docker_automation.remote_docker import LOAD_CACHE, DockerFleet, HostLoad
+from core.linux_tools.ssh_pool import CommandResult
+
+GIB = 1 << 30
+
+
+class FakeFleet(DockerFleet):
+    """A fleet whose hosts report canned loads instead of being measured over the Docker API."""
+
+    def __init__(self, loads: list[HostLoad]):
+        super().__init__([(load.user, load.host) for load in loads])
+        self.canned = {(load.user, load.host): load for load in loads}
+        self.measured_hosts = []
+
+    def _measure(self, user, host):
+        self.measured_hosts.append(host)
+        return self.canned[(user, host)]
+
+
+@pytest.fixture(autouse=True)
+def empty_load_cache():
+    LOAD_CACHE.invalidate()
+    yield
+    LOAD_CACHE.invalidate()
+
+
+def test_scarcest_resource_decides_the_score():
+    load = HostLoad("root", "a", cpus=4, mem_total=8 * GIB, cpu_percent=100.0, mem_bytes=6 * GIB)
+
+    assert (load.cpu_share, load.mem_share, load.score) == (0.25, 0.75, 0.75)
+    assert HostLoad("root", "b").score == 0.0 and not HostLoad("root", "b").measured
+
+
+def test_pick_host_prefers_the_least_loaded_reachable_host():
+    fleet = FakeFleet([
+        HostLoad("root", "busy", cpus=4, mem_total=8 * GIB, cpu_percent=300.0, running=6),
+        HostLoad("root", "quiet", cpus=4, mem_total=8 * GIB, cpu_percent=40.0, mem_bytes=GIB, running=2),
+        HostLoad("root", "down", error="Docker API on down unreachable"),
+    ])
+
+    assert fleet.pick_host().host == "quiet"
+
+
+def test_ties_go_to_fewer_running_containers():
+    fleet = FakeFleet([
+        HostLoad("root", "a", cpus=2, mem_total=4 * GIB, cpu_percent=50.0, running=5),
+        HostLoad("root", "b", cpus=4, mem_total=8 * GIB, cpu_percent=100.0, running=1),
+    ])
+
+    assert fleet.pick_host().host == "b"
+
+
+def test_hosts_without_capacity_stats_are_the_last_resort():
+    unknown = HostLoad("root", "unknown", cpu_percent=900.0, running=12)
+    fleet = FakeFleet([unknown, HostLoad("root", "known", cpus=2, mem_total=4 * GIB, cpu_percent=180.0)])
+
+    assert fleet.pick_host().host == "known"
+    assert FakeFleet([unknown]).pick_host() is unknown
+    assert FakeFleet([HostLoad("root", "down", error="refused")]).pick_host() is None
+
+
+def test_loads_are_cached_until_a_launch_lands_on_the_host(monkeypatch):
+    fleet = FakeFleet([
+        HostLoad("root", "a", cpus=4, mem_total=8 * GIB, cpu_percent=10.0),
+        HostLoad("root", "b", cpus=4, mem_total=8 * GIB, cpu_percent=200.0),
+    ])
+    launched = []
+
+    def execute(label, args, user, host):
+        launched.append(host)
+        return CommandResult(user, host, "docker run", exit_status=0)
+
+    monkeypatch.setattr(remote_docker, "execute_docker_command", execute)
+
+    fleet.pick_host()
+    fleet.pick_host()
+    assert sorted(fleet.measured_hosts) == ["a", "b"]
+
+    load, result = fleet.launch({"name": "web", "image": "nginx"})
+    assert (load.host, result.ok, launched) == ("a", True, ["a"])
+    fleet.pick_host()
+    assert sorted(fleet.measured_hosts) == ["a", "a", "b"]
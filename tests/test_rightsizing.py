@@ -0,0 +1,73 @@
+from core.docker_automation.container_monitor import ContainerSample
+from core.docker_automation.rightsizing import (
+    MIB, MIN_CPUS, MIN_MEMORY, format_memory, recommend, recommend_all, usage_profile,
+)
+
+
+def sample(ts: float, cpu: float, mem_mb: float) -> ContainerSample:
+    return ContainerSample(ts=ts, cpu_percent=cpu, mem_bytes=int(mem_mb * MIB), mem_limit=2048 * MIB,
+                           mem_percent=0.0, net_rx_bytes=0, net_tx_bytes=0, blk_read_bytes=0, blk_write_bytes=0)
+
+
+class FakeMonitor:
+    def __init__(self, samples: dict[tuple[str, str], list[ContainerSample]]):
+        self._samples = samples
+
+    def containers(self):
+        return list(self._samples)
+
+    def samples(self, host, container, since=None):
+        return [s for s in self._samples[(host, container)] if since is None or s.ts >= since]
+
+
+def test_usage_profile_percentiles():
+    usage = usage_profile("web1", "api", [sample(float(i), cpu=float(i), mem_mb=100 + i) for i in range(101)])
+
+    assert usage.samples == 101 and usage.span == 100.0
+    assert usage.cpu_p50 == 50.0 and usage.cpu_p95 == 95.0 and usage.cpu_max == 100.0
+    assert usage.mem_max == 200 * MIB
+    assert usage_profile("web1", "api", []) is None
+
+
+def test_recommend_sizes_cpu_on_p95_and_memory_on_peak():
+    usage = usage_profile("web1", "api", [sample(float(i), cpu=float(i), mem_mb=100 + i) for i in range(101)])
+
+    rec = recommend(usage)
+
+    assert rec.cpus == 1.2                   # 95% x 1.25 = 1.1875, rounded up to a 0.05 step
+    assert rec.memory == 260 * MIB           # 200 MiB x 1.3
+    assert rec.docker_flags == "--cpus 1.2 --memory 260m"
+    assert rec.confident
+
+
+def test_recommend_does_not_add_a_step_for_float_noise():
+    usage = usage_profile("web1", "api", [sample(0.0, cpu=40.0, mem_mb=100)])
+
+    assert recommend(usage, cpu_headroom=1.25).cpus == 0.5
+
+
+def test_recommend_applies_floors():
+    usage = usage_profile("web1", "idle", [sample(0.0, cpu=0.1, mem_mb=1)])
+
+    rec = recommend(usage)
+
+    assert rec.cpus == MIN_CPUS and rec.memory == MIN_MEMORY
+    assert not rec.confident
+
+
+def test_format_memory_rounds_up_to_mib():
+    assert format_memory(MIB) == "1m"
+    assert format_memory(MIB + 1) == "2m"
+
+
+def test_recommend_all_skips_containers_without_samples_in_window():
+    monitor = FakeMonitor({
+        ("web2", "db"): [sample(950.0, cpu=10.0, mem_mb=300)],
+        ("web1", "api"): [sample(900.0, cpu=20.0, mem_mb=100), sample(990.0, cpu=30.0, mem_mb=120)],
+        ("web1", "stopped"): [sample(100.0, cpu=50.0, mem_mb=500)],
+    })
+
+    recs = recommend_all(monitor, window=120, now=1000.0)
+
+    assert [(r.usage.host, r.usage.container) for r in recs] == [("web1", "api"), ("web2", "db")]
+    assert recommend_all(monitor, window=5, now=1000.0) == []
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from core.linux_tools.ssh_orchestrator import EXAMPLE_PLAN, Orchestrator, Task, TaskRun, load_plan
+from core.linux_tools.ssh_pool import CommandResult
+
+INVENTORY = [("root", "web1"), ("root", "web2"), ("root", "web3")]
+
+
+def script(name, spec="true", **kwargs) -> Task:
+    return Task(name=name, kind="script", spec=spec, **kwargs)
+
+
+def test_load_plan_parses_the_example():
+    tasks = load_plan(EXAMPLE_PLAN)
+
+    assert [task.name for task in tasks] == ["pull", "stop", "start", "verify", "uptime"]
+    assert tasks[1].command() == "docker stop web" and tasks[1].batch_size == 2
+    assert load_plan('[{"name": "a", "kind": "script", "spec": "true", "hosts": ["deploy@10.0.0.1"]}]')[0].hosts \
+        == [("deploy", "10.0.0.1")]
+    with pytest.raises(ValueError):
+        load_plan('{"name": "a"}')
+
+
+@pytest.mark.parametrize("text, message", [
+    ('["uptime"]', "Task #1 must be a JSON object"),
+    ('[{"name": "a", "kind": "script", "spec": "true", "hosts": ["web1"]}]', "Invalid task a: hosts must be"),
+    ('[{"name": "a", "kind": "script", "spec": "true", "hosts": ["@web1"]}]', "hosts must be 'user@host'"),
+    ('[{"name": "a", "kind": "script", "spec": "true", "hosts": "root@web1"}]', "'hosts' must be a list"),
+    ('[{"name": "a", "kind": "script", "spec": "true", "depends_on": [1]}]', "list of strings"),
+    ('[{"name": "a", "kind": "script", "spec": "true", "args": []}]', "'args' must be an object"),
+    ('[{"name": "a", "kind": "script", "spec": "true", "timeout": "10"}]', "'timeout' must be a number"),
+    ('[{"name": "a", "kind": "script", "spec": "true", "retries": 3}]', "Invalid task a: .*retries"),
+])
+def test_malformed_plan_entries_raise_value_error(text, message):
+    with pytest.raises(ValueError, match=message):
+        load_plan(text)
+
+
+@pytest.mark.parametrize("tasks, message", [
+    ([script("a", depends_on=["b"]), script("b", depends_on=["a"])], "cycle"),
+    ([script("a", depends_on=["missing"])], "unknown task"),
+    ([Task("a", "command", "No Such Command")], "unknown command"),
+    ([Task("a", "shell", "true")], "kind"),
+    ([script("a"), script("a")], "unique"),
+    ([script("a", batch_size=0)], "batch_size"),
+])
+def test_invalid_plans_are_rejected(tasks, message):
+    with pytest.raises(ValueError, match=message):
+        Orchestrator(tasks, INVENTORY)
+
+
+def test_critical_path_follows_the_longest_dependent_chain():
+    orchestrator = Orchestrator([
+        script("build"), script("lint"),
+        script("test", depends_on=["build"]),
+        script("package", depends_on=["build", "lint"]),
+        script("deploy", depends_on=["test", "package"]),
+    ], INVENTORY)
+    durations = {"build": 5.0, "lint": 8.0, "test": 10.0, "package": 1.0, "deploy": 2.0}
+    orchestrator.runs = {name: TaskRun(name, "ok", 100.0, 100.0 + seconds) for name, seconds in durations.items()}
+
+    path, total = orchestrator.critical_path()
+
+    assert path == ["build", "test", "deploy"]
+    assert total == pytest.approx(17.0)
+
+
+def _fake_run(failing_hosts=(), failing_specs=()):
+    calls = []
+
+    async def run(user, host, command, timeout=None, **journal):
+        calls.append((host, command))
+        await asyncio.sleep(0)
+        failed = host in failing_hosts or command in failing_specs
+        return CommandResult(user, host, command, stdout="out", exit_status=1 if failed else 0)
+
+    return run, calls
+
+
+def test_failed_task_skips_its_dependents_but_not_other_branches():
+    orchestrator = Orchestrator([
+        script("broken", spec="false"), script("after", depends_on=["broken"]), script("independent"),
+    ], INVENTORY)
+    orchestrator.executor.run, calls = _fake_run(failing_specs=("false",))
+
+    runs = orchestrator.run()
+
+    assert {name: run.status for name, run in runs.items()} == {
+        "broken": "failed", "after": "skipped", "independent": "ok"}
+    assert len(calls) == 2 * len(INVENTORY)     # "after" never ran
+    assert [row["task"] for row in orchestrator.report()] == ["broken", "after", "independent"]
+
+
+def test_rolling_task_stops_after_a_failed_batch():
+    orchestrator = Orchestrator([script("roll", batch_size=1)], INVENTORY)
+    orchestrator.executor.run, calls = _fake_run(failing_hosts=("web2",))
+
+    run = orchestrator.run()["roll"]
+
+    assert [(node.host, node.status) for node in run.nodes] == [
+        ("root@web1", "ok"), ("root@web2", "failed"), ("root@web3", "skipped")]
+    assert [host for host, _ in calls] == ["web1", "web2"]
+    assert run.status == "failed"
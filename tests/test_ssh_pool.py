@@ -0,0 +1,158 @@
+import os
+import time
+
+import pytest
+
+from core.linux_tools import ssh_pool
+from core.linux_tools.ssh_pool import SSHPool
+
+
+class FakeRun:
+    """Records every subprocess.run argv instead of spawning ssh."""
+
+    def __init__(self, returncode=0, stdout="", error=b""):
+        self.calls: list[list[str]] = []
+        self.returncode = returncode
+        self.stdout = stdout
+        self.error = error
+
+    def __call__(self, argv, **kwargs):
+        self.calls.append(list(argv))
+        if self.error and hasattr(kwargs.get("stderr"), "write"):
+            kwargs["stderr"].write(self.error)     # the master's stderr goes to a temp file
+        return type("Completed", (), {"returncode": self.returncode, "stdout": self.stdout, "stderr": ""})()
+
+
+@pytest.fixture
+def fake_run(monkeypatch):
+    fake = FakeRun()
+    monkeypatch.setattr(ssh_pool.subprocess, "run", fake)
+    monkeypatch.setattr(ssh_pool, "MULTIPLEXING_SUPPORTED", True)
+    return fake
+
+
+def _pool(tmp_path, *targets, idle_timeout=300) -> SSHPool:
+    pool = SSHPool(idle_timeout=idle_timeout, control_dir=str(tmp_path))
+    for user, host in targets:
+        pool.register(user, host)
+        open(pool._socket_path(user, host), "w").close()
+    return pool
+
+
+def _age(pool: SSHPool, user: str, host: str, seconds: float) -> None:
+    pool._connections[(user, host)].last_used = time.monotonic() - seconds
+
+
+def test_held_master_is_never_evicted(tmp_path, fake_run):
+    pool = _pool(tmp_path, ("root", "a"), ("root", "b"))
+    _age(pool, "root", "a", 600)
+    _age(pool, "root", "b", 600)
+    pool.hold("root", "a")
+    pool.hold("root", "a")
+
+    assert pool.evict_idle() == [("root", "b")]
+    assert pool.is_fresh("root", "a")
+
+    pool.release("root", "a")
+    _age(pool, "root", "a", 600)
+    assert pool.evict_idle() == []      # still one hold left
+
+    pool.release("root", "a")
+    assert pool.evict_idle() == []      # release restarts the idle clock
+    _age(pool, "root", "a", 600)
+    assert pool.evict_idle() == [("root", "a")]
+    assert [argv[3:5] for argv in fake_run.calls] == [["-O", "exit"], ["-O", "exit"]]
+
+
+def test_is_fresh_expires_after_idle_timeout(tmp_path, fake_run):
+    pool = _pool(tmp_path, ("root", "a"), idle_timeout=60)
+
+    assert pool.is_fresh("root", "a")
+    _age(pool, "root", "a", 59)
+    assert pool.is_fresh("root", "a")      # and marks it used again
+    assert pool.stats()[0]["idle_s"] < 1
+    _age(pool, "root", "a", 61)
+    assert not pool.is_fresh("root", "a")
+    assert not pool.is_fresh("root", "unknown")
+    assert fake_run.calls == []            # never spawns a process
+
+
+def test_is_fresh_needs_the_socket(tmp_path, fake_run):
+    pool = _pool(tmp_path, ("root", "a"))
+    os.remove(pool._socket_path("root", "a"))
+
+    assert not pool.is_fresh("root", "a")
+
+
+def test_evict_idle_closes_only_expired_masters(tmp_path, fake_run):
+    pool = _pool(tmp_path, ("root", "old"), ("root", "new"), idle_timeout=60)
+    _age(pool, "root", "old", 61)
+
+    assert pool.evict_idle() == [("root", "old")]
+    assert fake_run.calls == [["ssh", "-S", pool._socket_path("root", "old"), "-O", "exit", "root@old"]]
+    assert [row["host"] for row in pool.stats()] == ["new"]
+
+
+def test_command_argv_multiplexes_over_the_master(tmp_path, fake_run):
+    pool = _pool(tmp_path)
+    argv = pool.command_argv("deploy", "10.0.0.5", "uptime")
+
+    assert argv[:len(ssh_pool.SSH_OPTIONS) + 1] == ["ssh", *ssh_pool.SSH_OPTIONS]
+    assert argv[-5:] == ["ControlMaster=no", "-S", pool._socket_path("deploy", "10.0.0.5"), "deploy@10.0.0.5",
+                         "uptime"]
+    assert pool.command_argv("deploy", "10.0.0.5")[-1] == "deploy@10.0.0.5"
+
+
+def test_forward_argv_adds_and_cancels_on_the_master(tmp_path):
+    pool = _pool(tmp_path)
+    socket_path = pool._socket_path("root", "a")
+
+    assert pool.forward_argv("root", "a", "/tmp/docker.sock", "/var/run/docker.sock") == \
+        ["ssh", "-S", socket_path, "-O", "forward", "-L", "/tmp/docker.sock:/var/run/docker.sock", "root@a"]
+    assert pool.forward_argv("root", "a", "/tmp/docker.sock", "/var/run/docker.sock", cancel=True)[3:5] == \
+        ["-O", "cancel"]
+
+
+def test_connect_opens_a_master_once_and_reports_the_handshake(tmp_path, fake_run):
+    pool = _pool(tmp_path)
+
+    reused, handshake_time = pool.connect("root", "a")
+    assert not reused and handshake_time >= 0
+    assert fake_run.calls == [pool.master_argv("root", "a")]
+
+    open(pool._socket_path("root", "a"), "w").close()     # the backgrounded master created its socket
+    assert pool.connect("root", "a") == (True, 0.0)
+    assert len(fake_run.calls) == 1
+
+
+def test_connect_adopts_a_live_master_left_by_another_process(tmp_path, fake_run):
+    pool = _pool(tmp_path)
+    open(pool._socket_path("root", "a"), "w").close()
+
+    assert pool.connect("root", "a") == (True, 0.0)
+    assert fake_run.calls == [pool.check_argv("root", "a")]
+
+
+def test_connect_failure_raises_with_ssh_stderr(tmp_path, monkeypatch):
+    monkeypatch.setattr(ssh_pool, "MULTIPLEXING_SUPPORTED", True)
+    monkeypatch.setattr(ssh_pool.subprocess, "run", FakeRun(255, error=b"Permission denied (publickey).\n"))
+    pool = _pool(tmp_path)
+
+    with pytest.raises(ConnectionError, match="Permission denied"):
+        pool.connect("root", "a")
+    assert pool.stats() == []
+
+
+def test_without_multiplexing_every_command_connects_directly(tmp_path, monkeypatch):
+    fake = FakeRun(0, stdout="up 3 days\n")
+    monkeypatch.setattr(ssh_pool.subprocess, "run", fake)
+    monkeypatch.setattr(ssh_pool, "MULTIPLEXING_SUPPORTED", False)
+    pool = _pool(tmp_path)
+
+    assert pool.connect("root", "a") == (False, 0.0)
+    result = pool.run("root", "a", "uptime")
+
+    assert result.ok and result.stdout == "up 3 days\n" and not result.reused
+    [argv] = fake.calls
+    assert "-S" not in argv and "ControlMaster=no" not in argv
+    assert argv[-2:] == ["root@a", "uptime"]